@@ -0,0 +1,14 @@
+"""
+Пакет аналитики цен.
+
+Содержит модуль price_stats для векторной статистики цен всего каталога.
+"""
+
+from analytics.price_stats import (
+    BookStats,
+    CatalogStats,
+    CatalogSummary,
+    PriceSanityGuard,
+    compute_catalog_stats,
+    load_catalog_stats,
+)
\ No newline at end of file
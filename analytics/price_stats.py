@@ -0,0 +1,455 @@
+"""
+Модуль price_stats.py
+
+Векторная статистика цен всего каталога.
+
+История цен и текущие цены загружаются одним запросом в виде массивов
+(database.database.get_price_arrays) и обрабатываются NumPy без цикла
+по книгам: история отсортирована по book_id и времени, поэтому каждая
+книга - непрерывный отрезок массива, и агрегаты по книгам считаются
+через границы отрезков (reduceat, накопленные суммы).
+
+Для каждой книги вычисляются:
+    - перцентили цены p10/p50/p90 по истории;
+    - исторический минимум и максимум;
+    - отклонение текущей цены от исторического минимума (drawdown);
+    - волатильность - стандартное отклонение логарифмических изменений цены;
+    - признак подозрительного скачка: текущая цена отличается от медианы
+      больше чем в jump_factor раз.
+
+Цены в результатах - в рублях.
+
+PriceSanityGuard отбраковывает подозрительные цены перед публикацией:
+такая цена попадает в карантин и принимается, если повторяется несколько
+проверок подряд, поэтому настоящее резкое изменение цены не блокируется
+навсегда. Статистика перезагружается периодически.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+import numpy as np
+
+from config import (
+    PRICE_JUMP_FACTOR,
+    PRICE_QUARANTINE_CONFIRMATIONS,
+    PRICE_STATS_MIN_SAMPLES,
+    PRICE_STATS_REFRESH,
+)
+from database.database import (
+    get_price_arrays,
+    get_quarantined_books,
+    quarantine_prices,
+    release_quarantine,
+)
+from database.queries import PriceArrays
+
+
+logger = logging.getLogger("wb_check_price_bot.analytics.price_stats")
+
+
+class BookStats(NamedTuple):
+    """
+    Статистика цены одной книги (NaN - нет данных).
+    """
+
+    book_id: int
+    current: float
+    samples: int
+    p10: float
+    p50: float
+    p90: float
+    all_time_min: float
+    all_time_max: float
+    drawdown: float
+    volatility: float
+    suspicious: bool
+
+
+class CatalogSummary(NamedTuple):
+    """
+    Сводка статистики каталога.
+    """
+
+    books: int
+    with_history: int
+    median_volatility: float
+    suspicious: List[int]
+    near_minimum: List[int]
+
+
+class CatalogStats:
+    """
+    Статистика цен каталога: по массиву на каждый показатель,
+    строки упорядочены по book_id.
+    """
+
+    def __init__(
+        self,
+        book_ids: np.ndarray,
+        current: np.ndarray,
+        samples: np.ndarray,
+        percentiles: np.ndarray,
+        all_time_min: np.ndarray,
+        all_time_max: np.ndarray,
+        volatility: np.ndarray,
+        jump_factor: float = PRICE_JUMP_FACTOR,
+        min_samples: int = PRICE_STATS_MIN_SAMPLES,
+    ):
+        """
+        Args:
+            book_ids (np.ndarray): Артикулы по возрастанию.
+            current (np.ndarray): Текущие цены (NaN - нет в наличии).
+            samples (np.ndarray): Количество точек истории.
+            percentiles (np.ndarray): Перцентили p10, p50, p90, форма (3, n).
+            all_time_min (np.ndarray): Исторические минимумы.
+            all_time_max (np.ndarray): Исторические максимумы.
+            volatility (np.ndarray): Волатильность.
+            jump_factor (float): Кратность отклонения от медианы, считающаяся скачком.
+            min_samples (int): Минимальное количество точек истории для проверки скачков.
+        """
+        self.book_ids = book_ids
+        self.current = current
+        self.samples = samples
+        self.p10, self.p50, self.p90 = percentiles
+        self.all_time_min = all_time_min
+        self.all_time_max = all_time_max
+        self.volatility = volatility
+        self.jump_factor = jump_factor
+        self.min_samples = min_samples
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.drawdown = (current - all_time_min) / all_time_min
+        self.suspicious = ~self.check_prices(book_ids, current) & ~np.isnan(current)
+
+    def __len__(self) -> int:
+        return len(self.book_ids)
+
+    def check_prices(self, book_ids: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """
+        Проверяет правдоподобность цен для нескольких книг сразу.
+
+        Цена неправдоподобна, если она не положительна или отличается от
+        медианы истории книги больше чем в jump_factor раз. Книги без
+        достаточной истории проверяются только на положительность.
+
+        Args:
+            book_ids (np.ndarray): Артикулы.
+            prices (np.ndarray): Цены в рублях (NaN не проверяются).
+
+        Returns:
+            np.ndarray: Маска правдоподобных цен.
+        """
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+
+        median = np.full(len(book_ids), np.nan)
+        if len(self.book_ids):
+            pos = np.minimum(np.searchsorted(self.book_ids, book_ids), len(self.book_ids) - 1)
+            known = (self.book_ids[pos] == book_ids) & (self.samples[pos] >= self.min_samples)
+            median[known] = self.p50[pos[known]]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.abs(np.log(prices / median))
+        jump = ratio > np.log(self.jump_factor)
+
+        return np.isnan(prices) | ((prices > 0) & ~jump)
+
+    def is_plausible(self, book_id: int, price: Optional[float]) -> bool:
+        """
+        Проверяет правдоподобность цены одной книги (None - нет в наличии - всегда допустимо).
+        """
+        if price is None:
+            return True
+        return bool(self.check_prices(np.array([int(book_id)]), np.array([price]))[0])
+
+    def get(self, book_id: int) -> Optional[BookStats]:
+        """
+        Возвращает статистику одной книги или None, если ее нет в каталоге.
+        """
+        pos = int(np.searchsorted(self.book_ids, book_id))
+        if pos >= len(self.book_ids) or self.book_ids[pos] != book_id:
+            return None
+        return BookStats(
+            book_id=int(self.book_ids[pos]),
+            current=float(self.current[pos]),
+            samples=int(self.samples[pos]),
+            p10=float(self.p10[pos]),
+            p50=float(self.p50[pos]),
+            p90=float(self.p90[pos]),
+            all_time_min=float(self.all_time_min[pos]),
+            all_time_max=float(self.all_time_max[pos]),
+            drawdown=float(self.drawdown[pos]),
+            volatility=float(self.volatility[pos]),
+            suspicious=bool(self.suspicious[pos]),
+        )
+
+    def summary(self, limit: int = 5) -> CatalogSummary:
+        """
+        Сводка по каталогу: подозрительные цены и книги, текущая цена которых
+        ближе всего к историческому минимуму.
+
+        Args:
+            limit (int): Максимальное количество книг в каждом списке.
+        """
+        with_history = self.samples > 1
+        volatility = self.volatility[with_history & ~np.isnan(self.volatility)]
+
+        # NaN (нет в наличии или нет истории) сортируются в конец
+        near_minimum = np.argsort(self.drawdown, kind="stable")[:limit]
+        near_minimum = near_minimum[~np.isnan(self.drawdown[near_minimum])]
+
+        return CatalogSummary(
+            books=len(self),
+            with_history=int(np.count_nonzero(with_history)),
+            median_volatility=float(np.median(volatility)) if len(volatility) else float("nan"),
+            suspicious=self.book_ids[self.suspicious][:limit].tolist(),
+            near_minimum=self.book_ids[near_minimum].tolist(),
+        )
+
+
+def compute_catalog_stats(
+    arrays: PriceArrays,
+    jump_factor: float = PRICE_JUMP_FACTOR,
+    min_samples: int = PRICE_STATS_MIN_SAMPLES,
+) -> CatalogStats:
+    """
+    Вычисляет статистику каталога по массивам истории и текущих цен.
+
+    Args:
+        arrays (PriceArrays): История (по book_id и времени) и текущие цены (по book_id).
+        jump_factor (float): Кратность отклонения от медианы, считающаяся скачком.
+        min_samples (int): Минимальное количество точек истории для проверки скачков.
+
+    Returns:
+        CatalogStats: Статистика каталога.
+    """
+    book_ids = np.asarray(arrays.current_book_ids or [], dtype=np.int64)
+    in_stock = np.asarray(arrays.current_in_stock or [], dtype=bool)
+    current = np.asarray(arrays.current_prices or [], dtype=np.float64) / 100
+    current[~in_stock] = np.nan
+    n = len(book_ids)
+
+    history_ids = np.asarray(arrays.history_book_ids or [], dtype=np.int64)
+    history_prices = np.asarray(arrays.history_prices or [], dtype=np.float64) / 100
+
+    # История книг, удаленных из каталога, не учитывается
+    keep = np.isin(history_ids, book_ids)
+    history_ids, history_prices = history_ids[keep], history_prices[keep]
+
+    samples = np.zeros(n, dtype=np.int64)
+    percentiles = np.full((3, n), np.nan)
+    all_time_min = np.full(n, np.nan)
+    all_time_max = np.full(n, np.nan)
+    volatility = np.full(n, np.nan)
+
+    if len(history_ids):
+        # Отрезки книг в истории, отсортированной по book_id
+        group_ids, starts, counts = np.unique(history_ids, return_index=True, return_counts=True)
+        rows = np.searchsorted(book_ids, group_ids)
+        samples[rows] = counts
+
+        all_time_min[rows] = np.minimum.reduceat(history_prices, starts)
+        all_time_max[rows] = np.maximum.reduceat(history_prices, starts)
+
+        # Перцентили с линейной интерполяцией по ценам, упорядоченным внутри отрезков
+        sorted_prices = history_prices[np.lexsort((history_prices, history_ids))]
+        for i, q in enumerate((0.1, 0.5, 0.9)):
+            position = starts + q * (counts - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            fraction = position - lower
+            percentiles[i, rows] = (
+                sorted_prices[lower] + (sorted_prices[upper] - sorted_prices[lower]) * fraction
+            )
+
+        # Логарифмические изменения цены; изменения на стыке книг обнуляются
+        returns = np.diff(np.log(np.maximum(history_prices, 0.01)))
+        returns[history_ids[1:] != history_ids[:-1]] = 0.0
+        cum_returns = np.concatenate(([0.0], np.cumsum(returns)))
+        cum_squares = np.concatenate(([0.0], np.cumsum(returns ** 2)))
+        ends = starts + counts - 1
+        steps = counts - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (cum_returns[ends] - cum_returns[starts]) / steps
+            variance = (cum_squares[ends] - cum_squares[starts]) / steps - mean ** 2
+        volatility[rows] = np.where(steps > 0, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+    return CatalogStats(
+        book_ids=book_ids,
+        current=current,
+        samples=samples,
+        percentiles=percentiles,
+        all_time_min=all_time_min,
+        all_time_max=all_time_max,
+        volatility=volatility,
+        jump_factor=jump_factor,
+        min_samples=min_samples,
+    )
+
+
+async def load_catalog_stats() -> Optional[CatalogStats]:
+    """
+    Загружает цены из БД одним запросом и вычисляет статистику каталога.
+
+    Returns:
+        Optional[CatalogStats]: Статистика или None в случае ошибки БД.
+    """
+    arrays = await get_price_arrays()
+    if arrays is None:
+        logger.error("Не удалось загрузить цены для статистики")
+        return None
+
+    stats = compute_catalog_stats(arrays)
+    logger.info(
+        "Статистика цен: книг %d, с историей %d, подозрительных цен %d",
+        len(stats), int(np.count_nonzero(stats.samples)), int(np.count_nonzero(stats.suspicious))
+    )
+    return stats
+
+
+# Цены, отличающиеся не больше чем на эту долю, считаются одним уровнем цены
+QUARANTINE_TOLERANCE = 0.05
+
+
+def same_level(level: Optional[float], price: float) -> bool:
+    """
+    Проверяет, что цена находится на уровне level (в пределах QUARANTINE_TOLERANCE).
+    """
+    if level is None or level <= 0 or price <= 0:
+        return False
+    return abs(math.log(price / level)) <= math.log1p(QUARANTINE_TOLERANCE)
+
+
+class PriceSanityGuard:
+    """
+    Проверка цен перед публикацией по статистике каталога с карантином.
+
+    Цена правдоподобна, если она близка к медиане истории книги или к ее
+    текущей цене в БД (не дальше чем в jump_factor раз). Остальные цены не
+    публикуются, а попадают в карантин (таблица price_quarantine, общая для
+    всех процессов и запусков). Если цена того же уровня получена
+    confirmations раз подряд, она принимается: пока медиана истории не
+    сдвинулась, настоящее изменение цены иначе отбрасывалось бы всегда.
+    После публикации принятая цена становится текущей, и цены рядом с ней
+    больше не задерживаются.
+
+    Статистика перезагружается в фоне не реже раза в refresh секунд;
+    пока она не загружена, цены не проверяются.
+    """
+
+    def __init__(
+        self,
+        confirmations: int = PRICE_QUARANTINE_CONFIRMATIONS,
+        refresh: float = PRICE_STATS_REFRESH,
+    ):
+        """
+        Args:
+            confirmations (int): Сколько раз подряд должна быть получена цена из карантина.
+            refresh (float): Период перезагрузки статистики, сек. (0 - не перезагружать).
+        """
+        self.confirmations = max(1, confirmations)
+        self.refresh = refresh
+        self.stats: Optional[CatalogStats] = None
+        self._loaded_at: Optional[float] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        # Книги в карантине (по данным последней загрузки и своих проверок)
+        self._quarantined: Set[int] = set()
+        # Цены, принятые после карантина, до перезагрузки статистики
+        self._confirmed: Dict[int, float] = {}
+
+    async def load(self) -> None:
+        """
+        Загружает статистику каталога и список книг в карантине;
+        при ошибке остаются прежние.
+        """
+        stats = await load_catalog_stats()
+        quarantined = await get_quarantined_books()
+        self._loaded_at = time.monotonic()
+        if stats is not None:
+            self.stats = stats
+            self._confirmed = {}
+        if quarantined is not None:
+            self._quarantined = quarantined
+
+    def _schedule_reload(self) -> None:
+        if not self.refresh or (self._reload_task is not None and not self._reload_task.done()):
+            return
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh:
+            return
+        self._reload_task = asyncio.ensure_future(self.load())
+
+    def _plausible(self, codes: List[str], prices: np.ndarray) -> np.ndarray:
+        book_ids = np.array([int(code) for code in codes], dtype=np.int64)
+        plausible = self.stats.check_prices(book_ids, prices)
+
+        # Цена рядом с текущей ценой книги тоже допустима
+        current = np.full(len(book_ids), np.nan)
+        if len(self.stats.book_ids):
+            pos = np.minimum(np.searchsorted(self.stats.book_ids, book_ids), len(self.stats.book_ids) - 1)
+            known = self.stats.book_ids[pos] == book_ids
+            current[known] = self.stats.current[pos[known]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            near_current = np.abs(np.log(prices / current)) <= np.log(self.stats.jump_factor)
+        return plausible | near_current
+
+    async def check(self, prices: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        """
+        Отбирает цены, которые можно публиковать.
+
+        Args:
+            prices (Dict[str, Optional[float]]): Цена по строковому артикулу (None - нет в наличии).
+
+        Returns:
+            Dict[str, Optional[float]]: Правдоподобные цены и цены, подтвержденные в карантине.
+        """
+        self._schedule_reload()
+        if self.stats is None or not prices:
+            return prices
+
+        codes = list(prices)
+        values = np.array(
+            [np.nan if prices[code] is None else prices[code] for code in codes], dtype=np.float64
+        )
+        plausible = self._plausible(codes, values)
+
+        accepted: Dict[str, Optional[float]] = {}
+        suspects: Dict[str, float] = {}
+        for code, ok in zip(codes, plausible):
+            price = prices[code]
+            if price is not None and price <= 0:
+                logger.warning("Неположительная цена отброшена: %s = %s", code, price)
+            elif price is None or ok or same_level(self._confirmed.get(int(code)), price):
+                accepted[code] = price
+            else:
+                suspects[code] = price
+
+        if suspects:
+            seen = await quarantine_prices(
+                [int(code) for code in suspects],
+                [round(price * 100) for price in suspects.values()],
+                QUARANTINE_TOLERANCE,
+            ) or {}
+            held = {}
+            for code, price in suspects.items():
+                count = seen.get(int(code), 0)
+                if count >= self.confirmations:
+                    accepted[code] = price
+                    self._confirmed[int(code)] = price
+                    logger.info(
+                        "Цена артикула %s = %s получена %d раз подряд и принята", code, price, count
+                    )
+                else:
+                    self._quarantined.add(int(code))
+                    held[code] = f"{price} ({count}/{self.confirmations})"
+            if held:
+                logger.warning("Неправдоподобные цены задержаны в карантине: %s", held)
+
+        # Принятые цены выводят книги из карантина
+        released = [int(code) for code in accepted if int(code) in self._quarantined]
+        if released and await release_quarantine(released):
+            self._quarantined.difference_update(released)
+        return accepted
@@ -7,10 +7,91 @@
     TOKEN (str): Токен Telegram-бота.
     PROJECT_PATH (str): Путь к корневой директории проекта.
     DB_CONN (list): Данные для подключения к БД.
+    DB_CURSOR_PREFETCH (int): Размер порции строк курсора БД.
+    DB_POOL_MIN_SIZE (int): Минимальное количество соединений в пуле БД.
+    DB_POOL_MAX_SIZE (int): Максимальное количество соединений в пуле БД.
+    DB_STATEMENT_CACHE_SIZE (int): Размер кэша подготовленных запросов соединения.
+    DB_POOL_MAX_INACTIVE_LIFETIME (float): Время жизни простаивающего соединения, сек.
+    DB_POOL_MAX_QUERIES (int): Количество запросов, после которого соединение пересоздается.
+    CATALOG_NOTIFY_CHANNEL (str): Канал NOTIFY с изменениями таблицы books.
+    DB_LISTENER_RECONNECT_DELAY (float): Пауза перед повторным подключением слушателя изменений, сек.
+    DB_LISTENER_KEEPALIVE (float): Период проверки соединения слушателя изменений, сек.
+    CATALOG_PAGE_SIZE (int): Количество книг на странице клавиатуры каталога.
+    CATALOG_SEARCH_LIMIT (int): Максимальное количество книг в результатах поиска.
+    INLINE_RESULTS_LIMIT (int): Максимальное количество результатов inline-запроса.
+    INLINE_CACHE_TIME (int): Время кэширования результатов inline-запроса в Telegram, сек.
     DEST (int): ID пункта выдачи заказов.
     CURRENCY (str): Обозначение валюты, в которой отображена стоимость книги.
+    PRICE_FETCH_BACKEND (str): Способ получения цен ("aiohttp" или "selenium").
+    WB_CARD_URL (str): Адрес API карточек товаров WB.
+    HTTP_FETCH_TIMEOUT (float): Таймаут HTTP-запроса к API карточек, сек.
+    HTTP_CONNECTION_LIMIT (int): Лимит одновременных HTTP-соединений.
+    PRICE_BATCH_SIZE (int): Количество артикулов в одном запросе к API карточек.
+    SELENIUM_POOL_SIZE (int): Размер пула драйверов Selenium.
+    SELENIUM_MAX_PAGES_PER_DRIVER (int): Страниц на драйвер до пересоздания.
+    SELENIUM_MAX_MEMORY_MB (int): Лимит памяти драйвера до пересоздания, МБ.
+    SELENIUM_PAGE_TIMEOUT (float): Ожидание загрузки страницы Selenium, сек.
+    SCHEDULER_MAX_CONCURRENCY (int): Максимум одновременных запросов к API.
+    SCHEDULER_MIN_CONCURRENCY (int): Минимум одновременных запросов при троттлинге.
+    SCHEDULER_RATE_PER_HOST (float): Лимит запросов в секунду к одному хосту.
+    SCHEDULER_BURST (int): Допустимый всплеск запросов к одному хосту.
+    SCHEDULER_MAX_RETRIES (int): Повторы запроса после ответа 429/5xx.
+    SCHEDULER_BACKOFF_BASE (float): Базовая пауза перед повтором, сек.
+    FETCH_MAX_ATTEMPTS (int): Число попыток запроса при сетевых ошибках.
+    FETCH_BACKOFF_BASE (float): Базовая пауза между попытками, сек.
+    FETCH_BACKOFF_MAX (float): Максимальная пауза между попытками, сек.
+    FETCH_HEDGE_ENABLED (bool): Отправлять дублирующий запрос после p95 ожидания.
+    CIRCUIT_FAILURE_THRESHOLD (int): Ошибок подряд до размыкания circuit breaker.
+    CIRCUIT_RESET_TIMEOUT (float): Время до пробного запроса после размыкания, сек.
+    RESPONSE_CACHE_MODE (str): Режим кэша ответов API ("off", "on", "record", "replay").
+    RESPONSE_CACHE_DIR (str): Каталог кэша ответов API.
+    RESPONSE_CACHE_TTL (float): Время жизни записи кэша, сек.
+    RESPONSE_CACHE_MAX_BYTES (int): Максимальный размер кэша, байт.
+    DAEMON_INITIAL_INTERVAL (float): Начальный интервал проверки книги демоном, сек.
+    DAEMON_MIN_INTERVAL (float): Минимальный интервал проверки книги, сек.
+    DAEMON_MAX_INTERVAL (float): Максимальный интервал проверки книги, сек.
+    DAEMON_CHECKS_PER_HOUR (float): Бюджет проверок товаров в час.
+    DAEMON_CATALOG_REFRESH (float): Период перечитывания каталога из БД, сек.
+    PRICE_HEARTBEAT_SECONDS (float): Период принудительной публикации неизменной цены, сек.
     RABBIT_LOGIN(str): Логин для брокера сообщений.
     RABBIT_PASSWORD(str): Пароль для брокера сообщений.
+    PRICE_UPDATES_QUEUE(str): Очередь обновлений цен.
+    RABBIT_CHANNEL_POOL_SIZE(int): Размер пула каналов producer.
+    RABBIT_CONFIRM_WINDOW(int): Максимальное количество неподтвержденных сообщений.
+    RABBIT_CONFIRM_TIMEOUT(float): Время ожидания подтверждения брокера, сек.
+    RABBIT_OUTBOX_PATH(str): Файл outbox недоставленных сообщений.
+    RABBIT_RECONNECT_DELAY(float): Пауза между попытками подключения к брокеру, сек.
+    PRICE_WIRE_FORMAT(str): Формат сообщений об обновлении цен ("binary", "json").
+    PRICE_SOURCE_ID(int): Идентификатор источника обновлений цен.
+    CONSUMER_BATCH_SIZE(int): Максимальное количество сообщений в пачке consumer.
+    CONSUMER_BATCH_TIMEOUT_MS(float): Максимальное время накопления пачки consumer, мс.
+    CONSUMER_RETRY_DELAY(float): Начальная пауза перед возвратом незаписанной пачки в очередь, сек.
+    CONSUMER_RETRY_MAX_DELAY(float): Максимальная пауза перед возвратом пачки в очередь, сек.
+    CONSUMER_MAX_ATTEMPTS(int): Количество попыток записи сообщения до переноса в очередь ошибок.
+    PRICE_UPDATES_DEAD_LETTER_QUEUE(str): Очередь сообщений, не записанных consumer.
+    PRICE_HISTORY_RETENTION_MONTHS(int): Срок хранения истории цен, месяцев.
+    PRICE_HISTORY_MAINTENANCE_INTERVAL(float): Период обслуживания секций истории цен, сек.
+    PRICE_JUMP_FACTOR(float): Кратность отклонения цены от медианы истории, считающаяся скачком.
+    PRICE_STATS_MIN_SAMPLES(int): Минимальное количество точек истории для проверки цены на скачок.
+    PRICE_QUARANTINE_CONFIRMATIONS(int): Количество повторений отбракованной цены для ее принятия.
+    PRICE_STATS_REFRESH(float): Период перезагрузки статистики цен, сек.
+    ROLLUP_MIN_BUCKETS(int): Минимальное количество интервалов при выборе разрешения агрегатов.
+    BOT_MODE(str): Режим получения обновлений ботом (polling или webhook).
+    WEBHOOK_URL(str): Внешний адрес бота для регистрации вебхука.
+    WEBHOOK_PATH(str): Путь приема обновлений сервером вебхука.
+    WEBHOOK_HOST(str): Адрес сервера вебхука.
+    WEBHOOK_PORT(int): Порт сервера вебхука.
+    WEBHOOK_SECRET(str): Секретный токен вебхука.
+    WEBHOOK_WORKERS(int): Количество процессов сервера вебхука.
+    WEBHOOK_RECORD_PATH(str): Файл записи входящих обновлений.
+    TELEGRAM_API_URL(str): Адрес сервера Bot API.
+    PRICE_TASKS_QUEUE(str): Очередь заданий на проверку цен.
+    SHARD_WORKER_PREFETCH(int): Количество заданий, одновременно выдаваемых обработчику.
+    SHARD_WORKER_SHUTDOWN_TIMEOUT(float): Время ожидания заданий при остановке обработчика, сек.
+    PRICE_TASKS_DONE_QUEUE(str): Очередь отметок о завершенных заданиях.
+    SHARD_TASK_MAX_ATTEMPTS(int): Количество попыток задания с неполученными ценами.
+    PRICE_CYCLE_STATE_PATH(str): Файл состояния цикла координатора.
+    PRICE_CYCLE_TIMEOUT(float): Время, после которого незавершенный цикл не блокирует новый.
     CONFIG_FILE_PATH(str): Путь к файлу конфигурации.
     LOG_FILE_PATH(str): Путь к файлу сохранения общих логов.
     CONSUMER_LOG_FILE_PATH(str): Путь к файлу сохранения логов rabbitmq/consumer.py.
@@ -22,10 +103,91 @@ from config.constants import (
     TOKEN, 
     PROJECT_PATH,
     DB_CONN,
+    DB_CURSOR_PREFETCH,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_POOL_MAX_INACTIVE_LIFETIME,
+    DB_POOL_MAX_QUERIES,
+    CATALOG_NOTIFY_CHANNEL,
+    DB_LISTENER_RECONNECT_DELAY,
+    DB_LISTENER_KEEPALIVE,
+    CATALOG_PAGE_SIZE,
+    CATALOG_SEARCH_LIMIT,
+    INLINE_RESULTS_LIMIT,
+    INLINE_CACHE_TIME,
     DEST,
     CURRENCY,
+    PRICE_FETCH_BACKEND,
+    WB_CARD_URL,
+    HTTP_FETCH_TIMEOUT,
+    HTTP_CONNECTION_LIMIT,
+    PRICE_BATCH_SIZE,
+    SELENIUM_POOL_SIZE,
+    SELENIUM_MAX_PAGES_PER_DRIVER,
+    SELENIUM_MAX_MEMORY_MB,
+    SELENIUM_PAGE_TIMEOUT,
+    SCHEDULER_MAX_CONCURRENCY,
+    SCHEDULER_MIN_CONCURRENCY,
+    SCHEDULER_RATE_PER_HOST,
+    SCHEDULER_BURST,
+    SCHEDULER_MAX_RETRIES,
+    SCHEDULER_BACKOFF_BASE,
+    FETCH_MAX_ATTEMPTS,
+    FETCH_BACKOFF_BASE,
+    FETCH_BACKOFF_MAX,
+    FETCH_HEDGE_ENABLED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    RESPONSE_CACHE_MODE,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_BYTES,
+    DAEMON_INITIAL_INTERVAL,
+    DAEMON_MIN_INTERVAL,
+    DAEMON_MAX_INTERVAL,
+    DAEMON_CHECKS_PER_HOUR,
+    DAEMON_CATALOG_REFRESH,
+    PRICE_HEARTBEAT_SECONDS,
     RABBIT_LOGIN,
     RABBIT_PASSWORD,
+    PRICE_UPDATES_QUEUE,
+    RABBIT_CHANNEL_POOL_SIZE,
+    RABBIT_CONFIRM_WINDOW,
+    RABBIT_CONFIRM_TIMEOUT,
+    RABBIT_OUTBOX_PATH,
+    RABBIT_RECONNECT_DELAY,
+    PRICE_WIRE_FORMAT,
+    PRICE_SOURCE_ID,
+    CONSUMER_BATCH_SIZE,
+    CONSUMER_BATCH_TIMEOUT_MS,
+    CONSUMER_RETRY_DELAY,
+    CONSUMER_RETRY_MAX_DELAY,
+    CONSUMER_MAX_ATTEMPTS,
+    PRICE_UPDATES_DEAD_LETTER_QUEUE,
+    PRICE_HISTORY_RETENTION_MONTHS,
+    PRICE_HISTORY_MAINTENANCE_INTERVAL,
+    PRICE_JUMP_FACTOR,
+    PRICE_STATS_MIN_SAMPLES,
+    PRICE_QUARANTINE_CONFIRMATIONS,
+    PRICE_STATS_REFRESH,
+    ROLLUP_MIN_BUCKETS,
+    BOT_MODE,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_WORKERS,
+    WEBHOOK_RECORD_PATH,
+    TELEGRAM_API_URL,
+    PRICE_TASKS_QUEUE,
+    SHARD_WORKER_PREFETCH,
+    SHARD_WORKER_SHUTDOWN_TIMEOUT,
+    PRICE_TASKS_DONE_QUEUE,
+    SHARD_TASK_MAX_ATTEMPTS,
+    PRICE_CYCLE_STATE_PATH,
+    PRICE_CYCLE_TIMEOUT,
     CONFIG_FILE_PATH,
     LOG_FILE_PATH,
     CONSUMER_LOG_FILE_PATH,
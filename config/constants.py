@@ -26,15 +26,185 @@ TOKEN = get_bot_token()
 # Получение данных подключения к базе данных из переменной окружения или файла конфигурации (см. utils.py).
 DB_CONN = get_db_connection_params()
 
+# Количество строк, которые курсор БД получает за один запрос к серверу
+DB_CURSOR_PREFETCH = int(os.environ.get("DB_CURSOR_PREFETCH", "1000"))
+
+# Минимальное и максимальное количество соединений в пуле БД
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+# Количество подготовленных запросов, кэшируемых на одно соединение
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "100"))
+# Простаивающее соединение закрывается через указанное время, сек.
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.environ.get("DB_POOL_MAX_INACTIVE_LIFETIME", "300"))
+# Соединение пересоздается после указанного количества запросов
+DB_POOL_MAX_QUERIES = int(os.environ.get("DB_POOL_MAX_QUERIES", "50000"))
+# Канал NOTIFY, в который триггер таблицы books отправляет измененные book_id
+CATALOG_NOTIFY_CHANNEL = os.environ.get("CATALOG_NOTIFY_CHANNEL", "books_changed")
+# Пауза перед повторным подключением слушателя изменений каталога, сек.
+DB_LISTENER_RECONNECT_DELAY = float(os.environ.get("DB_LISTENER_RECONNECT_DELAY", "5"))
+# Период проверки соединения слушателя изменений каталога, сек.
+DB_LISTENER_KEEPALIVE = float(os.environ.get("DB_LISTENER_KEEPALIVE", "30"))
+# Количество книг на одной странице клавиатуры каталога
+CATALOG_PAGE_SIZE = int(os.environ.get("CATALOG_PAGE_SIZE", "10"))
+# Максимальное количество книг в результатах поиска по названию
+CATALOG_SEARCH_LIMIT = int(os.environ.get("CATALOG_SEARCH_LIMIT", "10"))
+# Максимальное количество результатов inline-запроса (не больше 50)
+INLINE_RESULTS_LIMIT = int(os.environ.get("INLINE_RESULTS_LIMIT", "20"))
+# Время кэширования результатов inline-запроса на стороне Telegram, сек.
+INLINE_CACHE_TIME = int(os.environ.get("INLINE_CACHE_TIME", "60"))
+
 # Валюта, для получения стоимости
 CURRENCY = 'rub'
 # Код пункта выдачи заказа
 DEST = '-1255942'
 
+# Способ получения цен: "aiohttp" (прямой HTTP-запрос к API карточек) или "selenium" (резервный)
+PRICE_FETCH_BACKEND = os.environ.get("PRICE_FETCH_BACKEND", "aiohttp")
+# Адрес API карточек WB. Переопределяется для запуска на локальной заглушке (см. parser/bench_fetch.py)
+WB_CARD_URL = os.environ.get("WB_CARD_URL", "https://card.wb.ru/cards/v4/detail")
+# Таймаут HTTP-запроса к API карточек, сек.
+HTTP_FETCH_TIMEOUT = float(os.environ.get("HTTP_FETCH_TIMEOUT", "10"))
+# Максимальное число одновременных HTTP-соединений aiohttp-сессии
+HTTP_CONNECTION_LIMIT = int(os.environ.get("HTTP_CONNECTION_LIMIT", "20"))
+# Количество артикулов в одном запросе к API карточек (параметр nm через ";")
+PRICE_BATCH_SIZE = int(os.environ.get("PRICE_BATCH_SIZE", "100"))
+
+# Пул драйверов Selenium: количество одновременно запущенных браузеров
+SELENIUM_POOL_SIZE = int(os.environ.get("SELENIUM_POOL_SIZE", "2"))
+# Количество загруженных страниц, после которого драйвер пересоздается
+SELENIUM_MAX_PAGES_PER_DRIVER = int(os.environ.get("SELENIUM_MAX_PAGES_PER_DRIVER", "50"))
+# Лимит памяти драйвера вместе с дочерними процессами Chrome, МБ
+SELENIUM_MAX_MEMORY_MB = int(os.environ.get("SELENIUM_MAX_MEMORY_MB", "800"))
+# Максимальное ожидание загрузки страницы с ответом API, сек.
+SELENIUM_PAGE_TIMEOUT = float(os.environ.get("SELENIUM_PAGE_TIMEOUT", "10"))
+
+# Планировщик запросов: верхняя и нижняя граница числа одновременных запросов (AIMD)
+SCHEDULER_MAX_CONCURRENCY = int(os.environ.get("SCHEDULER_MAX_CONCURRENCY", "8"))
+SCHEDULER_MIN_CONCURRENCY = int(os.environ.get("SCHEDULER_MIN_CONCURRENCY", "1"))
+# Ограничение частоты запросов к одному хосту (token bucket): запросов в секунду и размер всплеска
+SCHEDULER_RATE_PER_HOST = float(os.environ.get("SCHEDULER_RATE_PER_HOST", "5"))
+SCHEDULER_BURST = int(os.environ.get("SCHEDULER_BURST", "10"))
+# Повторы запроса после ответа 429/5xx и базовая пауза перед повтором, сек.
+SCHEDULER_MAX_RETRIES = int(os.environ.get("SCHEDULER_MAX_RETRIES", "3"))
+SCHEDULER_BACKOFF_BASE = float(os.environ.get("SCHEDULER_BACKOFF_BASE", "1"))
+
+# Повторы запроса при сетевых ошибках: число попыток, базовая и максимальная пауза, сек.
+FETCH_MAX_ATTEMPTS = int(os.environ.get("FETCH_MAX_ATTEMPTS", "3"))
+FETCH_BACKOFF_BASE = float(os.environ.get("FETCH_BACKOFF_BASE", "0.5"))
+FETCH_BACKOFF_MAX = float(os.environ.get("FETCH_BACKOFF_MAX", "10"))
+# Дублирующий (hedged) запрос, если первый не ответил за p95 времени ответа
+FETCH_HEDGE_ENABLED = os.environ.get("FETCH_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Circuit breaker: число ошибок подряд до размыкания и время до пробного запроса, сек.
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Дисковый кэш ответов API карточек:
+# "off" - отключен, "on" - чтение и запись, "record" - только запись, "replay" - только чтение без сети
+RESPONSE_CACHE_MODE = os.environ.get("RESPONSE_CACHE_MODE", "off")
+# Каталог кэша, время жизни записи (сек.) и максимальный размер (байт)
+RESPONSE_CACHE_DIR = os.environ.get(
+    "RESPONSE_CACHE_DIR", os.path.join(PROJECT_PATH, "data", "cache", "wb_cards")
+)
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Режим демона: начальный, минимальный и максимальный интервал проверки одной книги, сек.
+DAEMON_INITIAL_INTERVAL = float(os.environ.get("DAEMON_INITIAL_INTERVAL", "3600"))
+DAEMON_MIN_INTERVAL = float(os.environ.get("DAEMON_MIN_INTERVAL", "300"))
+DAEMON_MAX_INTERVAL = float(os.environ.get("DAEMON_MAX_INTERVAL", "86400"))
+# Бюджет проверок (товаров) в час для всего каталога
+DAEMON_CHECKS_PER_HOUR = float(os.environ.get("DAEMON_CHECKS_PER_HOUR", "1000"))
+# Период перечитывания списка книг из БД, сек.
+DAEMON_CATALOG_REFRESH = float(os.environ.get("DAEMON_CATALOG_REFRESH", "600"))
+
+# Принудительная публикация неизменной цены не реже одного раза в указанный период, сек. (0 - отключено)
+PRICE_HEARTBEAT_SECONDS = float(os.environ.get("PRICE_HEARTBEAT_SECONDS", "86400"))
+
 # Данные для входа в брокер сообщений
 RABBIT_LOGIN = "guest"
 RABBIT_PASSWORD = "guest"
 
+# Очередь обновлений цен (parser -> rabbitmq/consumer.py)
+PRICE_UPDATES_QUEUE = os.environ.get("PRICE_UPDATES_QUEUE", "my_queue")
+# Количество каналов в пуле постоянного соединения producer
+RABBIT_CHANNEL_POOL_SIZE = int(os.environ.get("RABBIT_CHANNEL_POOL_SIZE", "4"))
+# Максимальное количество сообщений, ожидающих подтверждения брокера
+RABBIT_CONFIRM_WINDOW = int(os.environ.get("RABBIT_CONFIRM_WINDOW", "256"))
+# Время ожидания подтверждения сообщения брокером, сек.
+RABBIT_CONFIRM_TIMEOUT = float(os.environ.get("RABBIT_CONFIRM_TIMEOUT", "10"))
+# Файл локальной очереди сообщений, которые не удалось доставить в RabbitMQ
+RABBIT_OUTBOX_PATH = os.environ.get(
+    "RABBIT_OUTBOX_PATH", os.path.join(PROJECT_PATH, "data", "outbox", "price_updates.jsonl")
+)
+# Пауза между попытками подключения к недоступному брокеру, сек.
+RABBIT_RECONNECT_DELAY = float(os.environ.get("RABBIT_RECONNECT_DELAY", "5"))
+# Формат сообщений об обновлении цен: "binary" (rabbitmq/wire.py) или "json"
+PRICE_WIRE_FORMAT = os.environ.get("PRICE_WIRE_FORMAT", "binary")
+# Идентификатор источника обновлений цен (записывается в каждое сообщение)
+PRICE_SOURCE_ID = int(os.environ.get("PRICE_SOURCE_ID", "0"))
+# Максимальное количество сообщений в пачке, записываемой consumer в БД
+CONSUMER_BATCH_SIZE = int(os.environ.get("CONSUMER_BATCH_SIZE", "500"))
+# Максимальное время накопления пачки consumer, мс
+CONSUMER_BATCH_TIMEOUT_MS = float(os.environ.get("CONSUMER_BATCH_TIMEOUT_MS", "200"))
+# Пауза перед возвратом в очередь незаписанной пачки, сек. (удваивается при каждой ошибке подряд)
+CONSUMER_RETRY_DELAY = float(os.environ.get("CONSUMER_RETRY_DELAY", "1"))
+# Максимальная пауза перед возвратом пачки в очередь, сек.
+CONSUMER_RETRY_MAX_DELAY = float(os.environ.get("CONSUMER_RETRY_MAX_DELAY", "60"))
+# Сколько раз сообщение возвращается в очередь при доступной БД до переноса в очередь ошибок
+CONSUMER_MAX_ATTEMPTS = int(os.environ.get("CONSUMER_MAX_ATTEMPTS", "5"))
+# Очередь сообщений, которые consumer не смог записать в БД
+PRICE_UPDATES_DEAD_LETTER_QUEUE = os.environ.get("PRICE_UPDATES_DEAD_LETTER_QUEUE", "price_updates_failed")
+
+# Срок хранения истории цен, месяцев (0 - хранить всегда)
+PRICE_HISTORY_RETENTION_MONTHS = int(os.environ.get("PRICE_HISTORY_RETENTION_MONTHS", "24"))
+# Минимальное количество интервалов периода при выборе разрешения агрегатов цены
+ROLLUP_MIN_BUCKETS = int(os.environ.get("ROLLUP_MIN_BUCKETS", "24"))
+# Период обслуживания секций истории цен в consumer, сек.
+PRICE_HISTORY_MAINTENANCE_INTERVAL = float(os.environ.get("PRICE_HISTORY_MAINTENANCE_INTERVAL", "21600"))
+# Во сколько раз цена должна отличаться от медианы истории, чтобы считаться подозрительной
+PRICE_JUMP_FACTOR = float(os.environ.get("PRICE_JUMP_FACTOR", "3"))
+# Минимальное количество точек истории книги для проверки цены на скачок
+PRICE_STATS_MIN_SAMPLES = int(os.environ.get("PRICE_STATS_MIN_SAMPLES", "5"))
+# Сколько раз подряд должна повториться отбракованная цена, чтобы ее принять
+PRICE_QUARANTINE_CONFIRMATIONS = int(os.environ.get("PRICE_QUARANTINE_CONFIRMATIONS", "3"))
+# Период перезагрузки статистики цен в работающем процессе, сек.
+PRICE_STATS_REFRESH = float(os.environ.get("PRICE_STATS_REFRESH", "3600"))
+
+# Режим получения обновлений ботом: "polling" или "webhook"
+BOT_MODE = os.environ.get("BOT_MODE", "polling")
+# Внешний адрес бота для регистрации вебхука в Telegram (без пути); пустой - не регистрировать
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "")
+# Путь, по которому сервер вебхука принимает обновления
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/webhook")
+# Адрес и порт, на которых слушает сервер вебхука
+WEBHOOK_HOST = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8080"))
+# Секрет заголовка X-Telegram-Bot-Api-Secret-Token (пустой - без проверки)
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+# Количество процессов сервера вебхука на одном порту (SO_REUSEPORT)
+WEBHOOK_WORKERS = int(os.environ.get("WEBHOOK_WORKERS", "1"))
+# Файл для записи входящих обновлений (JSON lines) для воспроизведения; пустой - не записывать
+WEBHOOK_RECORD_PATH = os.environ.get("WEBHOOK_RECORD_PATH", "")
+# Адрес сервера Bot API (пустой - api.telegram.org), например локальной заглушки
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "")
+
+# Очередь заданий на проверку цен для распределенных обработчиков (parser/worker.py)
+PRICE_TASKS_QUEUE = os.environ.get("PRICE_TASKS_QUEUE", "price_check_tasks")
+# Сколько заданий один обработчик берет из очереди одновременно
+SHARD_WORKER_PREFETCH = int(os.environ.get("SHARD_WORKER_PREFETCH", "2"))
+# Сколько секунд обработчик при остановке ждет завершения взятых заданий
+SHARD_WORKER_SHUTDOWN_TIMEOUT = float(os.environ.get("SHARD_WORKER_SHUTDOWN_TIMEOUT", "60"))
+# Очередь отметок о завершенных заданиях (обработчики -> координатор)
+PRICE_TASKS_DONE_QUEUE = os.environ.get("PRICE_TASKS_DONE_QUEUE", "price_check_tasks_done")
+# Сколько раз задание с неполученными ценами возвращается в очередь
+SHARD_TASK_MAX_ATTEMPTS = int(os.environ.get("SHARD_TASK_MAX_ATTEMPTS", "3"))
+# Файл состояния текущего цикла координатора
+PRICE_CYCLE_STATE_PATH = os.environ.get(
+    "PRICE_CYCLE_STATE_PATH", os.path.join(PROJECT_PATH, "data", "coordinator", "cycle.json")
+)
+# Через сколько секунд незавершенный цикл не мешает начать новый (0 - ждать всегда)
+PRICE_CYCLE_TIMEOUT = float(os.environ.get("PRICE_CYCLE_TIMEOUT", "86400"))
+
 CONFIG_FILE_PATH = os.path.join(PROJECT_PATH, "src", "config.yaml")
 
 LOG_FILE_PATH = os.path.join(PROJECT_PATH, "logs", "bot.log")
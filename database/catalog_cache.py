@@ -0,0 +1,260 @@
+"""
+Модуль catalog_cache.py
+
+Кэш каталога книг с ценами в памяти бота.
+
+Кэш обновляется по уведомлениям слушателя изменений каталога
+(database/listener.py): перечитываются только измененные книги,
+а после (пере)подключения слушателя - весь каталог. Поэтому кэш
+не устаревает по времени и не требует TTL. Пока слушатель не подключен
+или кэш не синхронизирован, чтение идет напрямую из БД.
+
+Каждое изменение содержимого увеличивает version - по нему производные
+кэши (например, готовые клавиатуры) определяют, что их пора перестроить.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from config import CATALOG_PAGE_SIZE
+from database.database import get_book_data, get_book_price, get_catalog_entries, get_catalog_page_rows
+from database.listener import CatalogChange, CatalogListener
+from database.queries import BookDetails, BookItem, CatalogEntry
+
+
+logger = logging.getLogger("wb_check_price_bot.database.catalog_cache")
+
+
+class CatalogPage(NamedTuple):
+    """
+    Страница каталога в порядке (book_name, book_id) и book_id граничных
+    книг для перехода на соседние страницы (None - страницы нет).
+    """
+
+    books: List[BookItem]
+    prev_cursor: Optional[int]
+    next_cursor: Optional[int]
+
+
+def make_page(books: List[BookItem], has_prev: bool, has_next: bool) -> CatalogPage:
+    return CatalogPage(
+        books=books,
+        prev_cursor=books[0].book_id if books and has_prev else None,
+        next_cursor=books[-1].book_id if books and has_next else None,
+    )
+
+
+class CatalogCache:
+    """
+    Каталог книг с ценами, синхронизируемый по уведомлениям об изменениях.
+    """
+
+    def __init__(self, listener: CatalogListener):
+        """
+        Args:
+            listener (CatalogListener): Слушатель изменений каталога.
+        """
+        self.listener = listener
+        self.version = 0
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._catalog: List[BookItem] = []
+        # Ключи (book_name, book_id) по возрастанию для постраничного просмотра
+        self._keys: List[Tuple[str, int]] = []
+        # generation слушателя, при котором началась последняя успешная
+        # пересинхронизация (None - кэш не синхронизирован)
+        self._synced_generation: Optional[int] = None
+        self._subscribers: List[Callable[[CatalogChange], None]] = []
+        listener.subscribe(self.apply)
+
+    def subscribe(self, callback: Callable[[CatalogChange], None]) -> None:
+        """
+        Добавляет производный кэш, который вызывается после каждого изменения
+        содержимого с измененными book_id (None - изменился весь каталог).
+        """
+        self._subscribers.append(callback)
+
+    @property
+    def ready(self) -> bool:
+        """
+        True, если содержимое кэша гарантированно совпадает с БД: слушатель
+        подключен и кэш пересинхронизирован после последней подписки.
+        """
+        return (
+            self.listener.connected
+            and self._synced_generation is not None
+            and self._synced_generation == self.listener.generation
+        )
+
+    def catalog(self) -> List[BookItem]:
+        """
+        Каталог в порядке id.
+        """
+        return self._catalog
+
+    def entries(self) -> List[CatalogEntry]:
+        """
+        Все книги каталога с ценами.
+        """
+        return list(self._entries.values())
+
+    def entry(self, book_id: int) -> Optional[CatalogEntry]:
+        return self._entries.get(book_id)
+
+    def get(self, book_id: int) -> Optional[BookDetails]:
+        """
+        Название и цена книги или None, если ее нет в каталоге.
+        """
+        entry = self._entries.get(book_id)
+        return BookDetails(entry.book_name, entry.price) if entry else None
+
+    def page(self, direction: str, book_id: Optional[int], limit: int) -> CatalogPage:
+        """
+        Страница каталога относительно книги book_id
+        (см. database.database.get_catalog_page_rows).
+        """
+        entry = self._entries.get(book_id) if direction != "first" else None
+        if entry is None:
+            start = 0
+            end = limit
+        else:
+            key = (entry.book_name, entry.book_id)
+            if direction == "before":
+                end = bisect_left(self._keys, key)
+                start = max(0, end - limit)
+            else:
+                start = (bisect_right if direction == "after" else bisect_left)(self._keys, key)
+                end = start + limit
+
+        books = [BookItem(key_id, key_name) for key_name, key_id in self._keys[start:end]]
+        if not books and direction != "first":
+            # Перед первой книгой или после последней страницы нет
+            return self.page("first", None, limit)
+        return make_page(books, has_prev=start > 0, has_next=end < len(self._keys))
+
+    async def apply(self, change: CatalogChange) -> None:
+        """
+        Применяет изменение каталога: перечитывает измененные книги
+        или (change is None) весь каталог.
+        """
+        # Пересинхронизация, начатая до разрыва соединения или до подписки,
+        # может не учесть пропущенные уведомления
+        generation = self.listener.generation if self.listener.connected else None
+        entries = await get_catalog_entries(None if change is None else sorted(change))
+        if entries is None:
+            # Состояние кэша неизвестно до успешной пересинхронизации
+            self._synced_generation = None
+            asyncio.get_running_loop().call_later(
+                self.listener.reconnect_delay, self.listener.request_resync
+            )
+            return
+
+        if change is None:
+            self._entries = {entry.book_id: entry for entry in entries}
+            self._synced_generation = generation
+            logger.info("Кэш каталога синхронизирован: %d книг", len(self._entries))
+        else:
+            for book_id in change:
+                self._entries.pop(book_id, None)
+            self._entries.update((entry.book_id, entry) for entry in entries)
+            logger.debug("Кэш каталога обновлен: %s", sorted(change))
+
+        self._catalog = [
+            BookItem(entry.book_id, entry.book_name)
+            for entry in sorted(self._entries.values(), key=lambda entry: entry.id)
+        ]
+        self._keys = sorted((entry.book_name, entry.book_id) for entry in self._entries.values())
+        self.version += 1
+
+        for callback in self._subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error("Ошибка обновления производного кэша каталога: %s", e, exc_info=True)
+
+
+# Кэш каталога процесса бота
+_cache: Optional[CatalogCache] = None
+
+
+def start_catalog_cache() -> CatalogCache:
+    """
+    Запускает слушателя изменений и кэш каталога, если они еще не запущены.
+    """
+    global _cache
+    if _cache is None:
+        listener = CatalogListener()
+        _cache = CatalogCache(listener)
+        listener.start()
+    return _cache
+
+
+async def stop_catalog_cache() -> None:
+    """
+    Останавливает слушателя изменений каталога.
+    """
+    global _cache
+    if _cache is not None:
+        await _cache.listener.stop()
+        _cache = None
+
+
+def get_catalog_cache() -> Optional[CatalogCache]:
+    return _cache
+
+
+async def get_catalog() -> List[BookItem] | None:
+    """
+    Возвращает каталог из кэша, а если кэш не готов - из БД.
+    """
+    if _cache is not None and _cache.ready:
+        return _cache.catalog()
+    return await get_book_data()
+
+
+async def get_book_details(book_id: int) -> BookDetails | None:
+    """
+    Возвращает название и цену книги из кэша, а если кэш не готов - из БД.
+    """
+    if _cache is not None and _cache.ready:
+        return _cache.get(book_id)
+    return await get_book_price(book_id)
+
+
+async def get_books_page(
+    direction: str = "first",
+    book_id: Optional[int] = None,
+    limit: int = CATALOG_PAGE_SIZE,
+) -> CatalogPage | None:
+    """
+    Возвращает страницу каталога из кэша, а если кэш не готов - из БД
+    запросом по индексу, читающим не больше limit + 1 строк.
+
+    Args:
+        direction (str): "first" - первая страница, "after" - книги после book_id,
+            "from" - начиная с book_id, "before" - книги перед book_id.
+        book_id (Optional[int]): Граничная книга.
+        limit (int): Количество книг на странице.
+    """
+    if _cache is not None and _cache.ready:
+        return _cache.page(direction, book_id, limit)
+
+    # Лишняя строка показывает, есть ли следующая страница в направлении чтения
+    rows = await get_catalog_page_rows(direction, book_id, limit + 1)
+    if rows is None:
+        return None
+    more = len(rows) > limit
+    books = list(rows[:limit])
+
+    if not books and direction != "first":
+        # Граничная книга удалена или страница стала пустой
+        return await get_books_page("first", None, limit)
+
+    if direction == "before":
+        books.reverse()
+        return make_page(books, has_prev=more, has_next=True)
+    if direction == "from":
+        before = await get_catalog_page_rows("before", book_id, 1)
+        return make_page(books, has_prev=bool(before), has_next=more)
+    return make_page(books, has_prev=direction == "after", has_next=more)
@@ -0,0 +1,198 @@
+"""
+Модуль catalog_index.py
+
+Поисковый индекс каталога в памяти для inline-запросов бота.
+
+Индекс хранит для каждой книги нормализованное название, его триграммы
+(как pg_trgm: слова дополняются двумя пробелами слева и одним справа)
+и отсортированный список слов для поиска по префиксу. Индекс подписан на
+кэш каталога (database/catalog_cache.py) и обновляется по изменениям
+только затронутых книг; изменение одной цены не перестраивает индекс
+названий. Поиск не обращается к БД.
+
+Результаты ранжируются так: название начинается с запроса, запрос
+входит в название, последнее слово запроса - префикс слова названия,
+затем по сходству триграмм.
+"""
+
+import logging
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+from database.catalog_cache import CatalogCache
+from database.listener import CatalogChange
+from database.queries import CatalogEntry
+
+
+logger = logging.getLogger("wb_check_price_bot.database.catalog_index")
+
+# Минимальное сходство триграмм для нечеткого совпадения (порог pg_trgm по умолчанию)
+MIN_SIMILARITY = 0.3
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Приводит текст к виду для поиска: нижний регистр, "ё" -> "е",
+    слова разделены одним пробелом.
+    """
+    return " ".join(_NON_WORD.sub(" ", text.casefold().replace("ё", "е")).split())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Триграммы нормализованного текста.
+    """
+    result: Set[str] = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+class CatalogIndex:
+    """
+    Индекс названий книг с текущими ценами.
+    """
+
+    def __init__(self):
+        self._clear()
+
+    def _clear(self) -> None:
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._names: Dict[int, str] = {}
+        self._grams: Dict[int, FrozenSet[str]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        # (слово, book_id) по возрастанию для поиска по префиксу
+        self._words: List[Tuple[str, int]] = []
+        # (название, book_id) по возрастанию для пустого запроса
+        self._order: List[Tuple[str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, cache: CatalogCache) -> None:
+        """
+        Подписывает индекс на изменения кэша каталога.
+        """
+        cache.subscribe(lambda change: self.apply(cache, change))
+        if cache.ready:
+            self.apply(cache, None)
+
+    def apply(self, cache: CatalogCache, change: CatalogChange) -> None:
+        """
+        Обновляет индекс по изменению кэша каталога.
+        """
+        if change is None:
+            self.rebuild(cache.entries())
+            return
+        for book_id in change:
+            entry = cache.entry(book_id)
+            if entry is None:
+                self.remove(book_id)
+            else:
+                self.upsert(entry)
+
+    def rebuild(self, entries: List[CatalogEntry]) -> None:
+        """
+        Строит индекс заново.
+        """
+        self._clear()
+        for entry in entries:
+            self._add(entry)
+        logger.info("Индекс каталога построен: %d книг", len(self._entries))
+
+    def upsert(self, entry: CatalogEntry) -> None:
+        """
+        Добавляет книгу или обновляет ее данные.
+        """
+        current = self._entries.get(entry.book_id)
+        if current is not None and current.book_name == entry.book_name:
+            # Изменилась только цена
+            self._entries[entry.book_id] = entry
+            return
+        self.remove(entry.book_id)
+        self._add(entry)
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+        """
+        entry = self._entries.pop(book_id, None)
+        if entry is None:
+            return
+        name = self._names.pop(book_id)
+        for gram in self._grams.pop(book_id):
+            self._postings[gram].discard(book_id)
+            if not self._postings[gram]:
+                del self._postings[gram]
+        for word in set(name.split()):
+            del self._words[bisect_left(self._words, (word, book_id))]
+        del self._order[bisect_left(self._order, (entry.book_name, book_id))]
+
+    def _add(self, entry: CatalogEntry) -> None:
+        name = normalize(entry.book_name)
+        grams = trigrams(name)
+        self._entries[entry.book_id] = entry
+        self._names[entry.book_id] = name
+        self._grams[entry.book_id] = grams
+        for gram in grams:
+            self._postings[gram].add(entry.book_id)
+        for word in set(name.split()):
+            insort(self._words, (word, entry.book_id))
+        insort(self._order, (entry.book_name, entry.book_id))
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        matches = set()
+        i = bisect_left(self._words, (prefix,))
+        while i < len(self._words) and self._words[i][0].startswith(prefix):
+            matches.add(self._words[i][1])
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int) -> List[CatalogEntry]:
+        """
+        Ищет книги по названию.
+
+        Args:
+            query (str): Текст запроса; пустой запрос возвращает начало каталога.
+            limit (int): Максимальное количество результатов.
+
+        Returns:
+            List[CatalogEntry]: Книги по убыванию соответствия запросу.
+        """
+        text = normalize(query)
+        if not text:
+            return [self._entries[book_id] for _, book_id in self._order[:limit]]
+
+        query_grams = trigrams(text)
+        shared = Counter(
+            book_id for gram in query_grams for book_id in self._postings.get(gram, ())
+        )
+        prefixed = self._prefix_matches(text.split()[-1])
+
+        ranked = []
+        for book_id in shared.keys() | prefixed:
+            name = self._names[book_id]
+            common = shared.get(book_id, 0)
+            similarity = common / (len(query_grams) + len(self._grams[book_id]) - common)
+            if name.startswith(text):
+                tier = 3
+            elif text in name:
+                tier = 2
+            elif book_id in prefixed:
+                tier = 1
+            elif similarity >= MIN_SIMILARITY:
+                tier = 0
+            else:
+                continue
+            ranked.append((-tier, -similarity, self._entries[book_id].book_name, book_id))
+
+        ranked.sort()
+        return [self._entries[book_id] for *_, book_id in ranked[:limit]]
+
+
+catalog_index = CatalogIndex()
@@ -5,15 +5,116 @@
 Обеспечивает асинхронное взаимодействие с базой данных PostgreSQL
 с использованием библиотеки asyncpg.  Параметры подключения загружаются
 из переменных окружения.
+
+Соединения берутся из общего для процесса пула (init_pool/close_pool).
+Пул открывается при запуске приложения и закрывается при остановке;
+если он не был открыт явно, то создается при первом обращении к БД.
 """
 
+import asyncio
 import asyncpg
 import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
 # Настройка логирования
 logger = logging.getLogger("wb_check_price_bot.database.database")
 
-from config import DB_CONN
+from config import (
+    DB_CONN,
+    DB_CURSOR_PREFETCH,
+    DB_POOL_MAX_INACTIVE_LIFETIME,
+    DB_POOL_MAX_QUERIES,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    ROLLUP_MIN_BUCKETS,
+)
+from database.queries import (
+    SELECT_BOOK_DETAILS,
+    SELECT_BOOKS_PRICES,
+    SELECT_CATALOG,
+    SELECT_CATALOG_BY_BOOK_ID,
+    SELECT_CATALOG_ENTRIES,
+    SELECT_CATALOG_ENTRIES_BY_IDS,
+    SELECT_CATALOG_FIRST_PAGE,
+    SELECT_CATALOG_PAGE_AFTER,
+    SELECT_CATALOG_PAGE_BEFORE,
+    SELECT_CATALOG_PAGE_FROM,
+    SEARCH_BOOKS,
+    SEARCH_BOOKS_SUBSTRING,
+    SELECT_PG_TRGM_INSTALLED,
+    SELECT_IMAGE_FILE_IDS,
+    UPSERT_IMAGE_FILE_ID,
+    DELETE_IMAGE_FILE_ID,
+    SELECT_CATALOG_WITH_PRICE,
+    UPDATE_BOOK_PRICE,
+    UPDATE_BOOKS_PRICES,
+    RESOLUTIONS,
+    SELECT_PRICE_ARRAYS,
+    SELECT_PRICE_QUARANTINE,
+    UPSERT_PRICE_QUARANTINE,
+    DELETE_PRICE_QUARANTINE,
+    PriceArrays,
+    PriceCandle,
+    PriceStats,
+    Resolution,
+    BookDetails,
+    BookItem,
+    BookPrice,
+    BookPriceUpdate,
+    CatalogEntry,
+    ImageFileId,
+    Statement,
+)
+
+# Ошибки, означающие, что соединение с сервером потеряно
+CONNECTION_LOST_ERRORS = (
+    asyncpg.ConnectionDoesNotExistError,
+    asyncpg.InterfaceError,
+    ConnectionError,
+)
+
+# Общий для процесса пул соединений
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def init_pool() -> asyncpg.Pool:
+    """
+    Открывает общий пул соединений, если он еще не открыт.
+
+    Returns:
+        asyncpg.Pool: Пул соединений.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                DataBase().dsn,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+                max_queries=DB_POOL_MAX_QUERIES,
+            )
+            logger.info(
+                "Пул соединений PostgreSQL открыт: от %d до %d соединений",
+                DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE
+            )
+    return _pool
+
+
+async def close_pool() -> None:
+    """
+    Закрывает общий пул соединений, дождавшись возврата занятых соединений.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+            logger.info("Пул соединений PostgreSQL закрыт")
 
 
 class DataBase:
@@ -53,27 +154,59 @@ class DataBase:
 
     async def connect(self) -> bool:
         """
-        Устанавливает асинхронное подключение к базе данных.
+        Берет соединение из общего пула.
 
         Returns:
-            bool: True, если подключение успешно установлено, False - в противном случае.
+            bool: True, если соединение получено, False - в противном случае.
         """
         try:
-            self.connection = await asyncpg.connect(self.dsn)
-            logger.info("Успешно подключено к PostgreSQL!")
+            pool = await init_pool()
+            self.connection = await pool.acquire()
+            # Проверка без обращения к серверу: закрытое соединение заменяется новым
+            if self.connection.is_closed():
+                await self._reconnect()
+            logger.debug("Соединение с PostgreSQL получено из пула")
             return True
-        except asyncpg.PostgresConnectionError as e:
+        except (asyncpg.PostgresConnectionError, *CONNECTION_LOST_ERRORS, OSError) as e:
             logger.error(f"Ошибка подключения к PostgreSQL: {e}")
+            self.connection = None
             return False
 
-    async def execute(self, query: str, *args) -> bool:
+    async def _reconnect(self) -> None:
+        """
+        Возвращает потерянное соединение в пул (пул его закроет) и берет новое.
+        """
+        pool = await init_pool()
+        if self.connection is not None:
+            await pool.release(self.connection)
+        self.connection = None
+        self.connection = await pool.acquire()
+
+    async def _run(self, method: str, query: str | Statement, *args):
+        """
+        Выполняет запрос; если соединение оказалось потерянным
+        (например, закрыто сервером во время простоя), повторяет
+        запрос один раз на новом соединении из пула.
+        """
+        if isinstance(query, Statement):
+            query = query.sql
+        try:
+            return await getattr(self.connection, method)(query, *args)
+        except CONNECTION_LOST_ERRORS as e:
+            if self.connection.is_in_transaction():
+                raise
+            logger.warning(f"Соединение с PostgreSQL потеряно, повтор запроса: {e}")
+            await self._reconnect()
+            return await getattr(self.connection, method)(query, *args)
+
+    async def execute(self, query: str | Statement, *args) -> bool:
         """
         Выполняет асинхронный запрос к базе данных без возврата данных.
 
         Используется для выполнения операций INSERT, UPDATE, DELETE и CREATE.
 
         Args:
-            query (str): SQL-запрос для выполнения.
+            query (str | Statement): SQL-запрос или запрос из реестра database.queries.
             *args: Аргументы для подстановки в запрос.
 
         Returns:
@@ -84,22 +217,23 @@ class DataBase:
             return False
 
         try:
-            await self.connection.execute(query, *args)
+            await self._run("execute", query, *args)
             return True
         except Exception as e:
             logger.exception(f"Ошибка выполнения запроса: {e}") 
             return False
 
-    async def fetch(self, query: str, *args) -> list[asyncpg.Record] | None:
+    async def fetch(self, query: str | Statement, *args) -> list | None:
         """
         Выполняет асинхронный запрос SELECT и возвращает результаты в виде списка.
 
         Args:
-            query (str): SQL-запрос для выполнения.
+            query (str | Statement): SQL-запрос или запрос из реестра database.queries.
             *args: Аргументы для подстановки в запрос.
 
         Returns:
-            list[asyncpg.Record] | None: Список строк (asyncpg.Record),
+            list | None: Список строк (asyncpg.Record, а для запроса из реестра
+            с типом результата - именованных кортежей этого типа),
             если запрос успешно выполнен, None - в случае ошибки или отсутствия подключения.
         """
         if self.connection is None:
@@ -107,30 +241,35 @@ class DataBase:
             return None
 
         try:
-            rows = await self.connection.fetch(query, *args)
+            rows = await self._run("fetch", query, *args)
+            if isinstance(query, Statement) and query.row_type is not None:
+                return [query.row_type._make(row) for row in rows]
             return rows
         except Exception as e:
             logger.exception(f"Ошибка выполнения запроса: {e}") 
             return None
 
-    async def fetchrow(self, query: str, *args) -> asyncpg.Record | None:
+    async def fetchrow(self, query: str | Statement, *args) -> asyncpg.Record | tuple | None:
         """
         Выполняет асинхронный запрос SELECT и возвращает одну строку.
 
         Args:
-            query (str): SQL-запрос для выполнения.
+            query (str | Statement): SQL-запрос или запрос из реестра database.queries.
             *args: Аргументы для подстановки в запрос.
 
         Returns:
-            asyncpg.Record | None: Объект asyncpg.Record, представляющий строку,
-            если запрос успешно выполнен, None - в случае ошибки или отсутствия подключения.
+            asyncpg.Record | tuple | None: Строка (для запроса из реестра
+            с типом результата - именованный кортеж этого типа),
+            если запрос успешно выполнен, None - в случае ошибки, отсутствия подключения или строки.
         """
         if self.connection is None:
             logger.error("Ошибка: Нет активного подключения к базе данных.")
             return None
 
         try:
-            row = await self.connection.fetchrow(query, *args)
+            row = await self._run("fetchrow", query, *args)
+            if row is not None and isinstance(query, Statement) and query.row_type is not None:
+                return query.row_type._make(row)
             return row
         except Exception as e:
             logger.exception(f"Ошибка выполнения запроса: {e}")
@@ -138,11 +277,15 @@ class DataBase:
 
     async def close(self):
         """
-        Закрывает асинхронное соединение с базой данных.
+        Возвращает соединение в общий пул.
         """
         if self.connection:
-            await self.connection.close()
-            logger.info("Соединение с PostgreSQL закрыто.")
+            connection, self.connection = self.connection, None
+            if _pool is not None:
+                await _pool.release(connection)
+            else:
+                await connection.close()
+            logger.debug("Соединение с PostgreSQL возвращено в пул.")
         else:
             logger.warning("Нет активного соединения для закрытия.")
 
@@ -162,9 +305,7 @@ async def upd_book_data(price: int, book_id: str, ):
             return
 
         await db.execute(
-            """UPDATE books
-             SET price = $1
-             WHERE book_id = $2;""",
+            UPDATE_BOOK_PRICE,
             price,
             book_id,
         )
@@ -181,12 +322,85 @@ async def upd_book_data(price: int, book_id: str, ):
             await db.close()
 
 
-async def get_book_data() -> list[asyncpg.Record] | None:
+async def upd_books_data(updates: Sequence[BookPriceUpdate]) -> bool:
+    """
+    Обновляет цены нескольких книг одним запросом и записывает
+    изменившиеся цены в историю price_history.
+
+    Поля обновлений передаются в запрос массивами и разворачиваются
+    через unnest, поэтому на всю пачку нужен один запрос и одно подключение.
+    Тем же запросом изменившиеся цены в наличии добавляются в часовые и
+    дневные агрегаты (price_rollup_hourly, price_rollup_daily): агрегаты и
+    price_history получают одни и те же строки. Обновления не новее
+    последнего полученного для книги (price_observed) не применяются.
+    Секции price_history для меток времени должны уже существовать
+    (models.price_history.ensure_history_partitions).
+
+    Args:
+        updates (Sequence[BookPriceUpdate]): Новые цены; book_id не должны повторяться.
+
+    Returns:
+        bool: True, если цены успешно обновлены, False - в противном случае.
+    """
+    if not updates:
+        return True
+
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return False
+
+        books_id, prices_kopecks, in_stock, timestamps, prices = zip(*updates)
+
+        # Через _run: потерянное соединение заменяется, а ошибка запроса попадает в except
+        await db._run(
+            "execute",
+            UPDATE_BOOKS_PRICES,
+            list(books_id),
+            list(prices_kopecks),
+            list(in_stock),
+            list(timestamps),
+            list(prices),
+        )
+
+        logger.info("Стоимость %d книг успешно обновлена", len(updates))
+        return True
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return False
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def check_database() -> bool:
+    """
+    Проверяет, что база данных доступна и выполняет запросы.
+
+    Returns:
+        bool: True, если запрос выполнен.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            return False
+        return await db.fetch("SELECT 1;") is not None
+    except Exception as e:
+        logger.error(f"Ошибка при работе с базой данных: {e}")
+        return False
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_book_data() -> List[BookItem] | None:
     """
     Возвращает список всех book_id и book_name из базы данных.
 
     Returns:
-        list[asyncpg.Record] | None: Список всех book_id и book_name,
+        List[BookItem] | None: Список всех book_id и book_name,
         либо None в случае ошибки подключения или запроса.
     """
     db = DataBase()
@@ -195,7 +409,7 @@ async def get_book_data() -> list[asyncpg.Record] | None:
             logger.error("Не удалось подключиться к базе данных.")
             return None
 
-        books_id = await db.fetch("SELECT book_id, book_name FROM books;")
+        books_id = await db.fetch(SELECT_CATALOG)
         logger.info(
             "Запрос get_book_data успешно обработан"
         )
@@ -207,14 +421,80 @@ async def get_book_data() -> list[asyncpg.Record] | None:
     finally:
         if db.connection:
             await db.close()
+
+
+async def iter_book_data(prefetch: int = DB_CURSOR_PREFETCH) -> AsyncIterator[asyncpg.Record]:
+    """
+    Построчно выдает book_id и book_name всех книг через серверный курсор.
+
+    В отличие от get_book_data, не загружает таблицу в память целиком:
+    строки запрашиваются у сервера порциями по prefetch штук по мере чтения.
+    Порядок по первичному ключу делает группы артикулов одинаковыми от запуска
+    к запуску (это нужно для кэша ответов API).
+    Соединение и транзакция удерживаются, пока генератор не исчерпан или не закрыт.
+
+    Args:
+        prefetch (int): Количество строк в одной порции.
+
+    Yields:
+        asyncpg.Record: Строка с полями book_id и book_name.
+    """
+    db = DataBase()
+    if not await db.connect():
+        logger.error("Не удалось подключиться к базе данных.")
+        return
+
+    try:
+        # Серверные курсоры asyncpg работают только внутри транзакции
+        async with db.connection.transaction(readonly=True):
+            async for record in db.connection.cursor(
+                SELECT_CATALOG_BY_BOOK_ID.sql,
+                prefetch=prefetch,
+            ):
+                yield record
+
+        logger.info(
+            "Запрос iter_book_data успешно обработан"
+        )
+    finally:
+        await db.close()
+
+
+async def get_books_prices() -> List[BookPrice] | None:
+    """
+    Возвращает последние сохраненные цены всех книг.
+
+    Returns:
+        List[BookPrice] | None: Список book_id и price,
+        либо None в случае ошибки подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        books_prices = await db.fetch(SELECT_BOOKS_PRICES)
+        logger.info(
+            "Запрос get_books_prices успешно обработан"
+        )
+        return books_prices
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
             
             
-async def get_book_price(book_id) -> list[asyncpg.Record] | None:
+async def get_catalog_entries(book_ids: Optional[Sequence[int]] = None) -> List[CatalogEntry] | None:
     """
-    Возвращает стоимость и название книги по book_id из базы данных.
+    Возвращает книги каталога с ценами: все (по порядку id) или только
+    перечисленные в book_ids.
 
     Returns:
-        str[asyncpg.Record] | None: Стоимость и название книги по book_id,
+        List[CatalogEntry] | None: Книги каталога,
         либо None в случае ошибки подключения или запроса.
     """
     db = DataBase()
@@ -223,18 +503,418 @@ async def get_book_price(book_id) -> list[asyncpg.Record] | None:
             logger.error("Не удалось подключиться к базе данных.")
             return None
 
-        books_price = await db.fetch(
-            """SELECT book_name, price
-                    FROM books
-                    WHERE book_id = $1;""",
-                    book_id
-        )
+        if book_ids is None:
+            return await db.fetch(SELECT_CATALOG_ENTRIES)
+        return await db.fetch(SELECT_CATALOG_ENTRIES_BY_IDS, list(book_ids))
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+# Запросы страницы каталога по направлению от граничной книги
+CATALOG_PAGE_QUERIES = {
+    "after": SELECT_CATALOG_PAGE_AFTER,
+    "from": SELECT_CATALOG_PAGE_FROM,
+    "before": SELECT_CATALOG_PAGE_BEFORE,
+}
+
+
+async def get_catalog_page_rows(direction: str, book_id: int | None, limit: int) -> List[BookItem] | None:
+    """
+    Возвращает не больше limit книг каталога в порядке (book_name, book_id):
+    первые (direction == "first"), следующие за книгой book_id ("after"),
+    начиная с нее ("from") или предшествующие ей ("before", в обратном порядке).
+
+    Returns:
+        List[BookItem] | None: Книги страницы,
+        либо None в случае ошибки подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        if direction == "first":
+            return await db.fetch(SELECT_CATALOG_FIRST_PAGE, limit)
+        return await db.fetch(CATALOG_PAGE_QUERIES[direction], book_id, limit)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+# Расширение pg_trgm найдено в БД (после установки оно не пропадает,
+# поэтому запоминается только положительный результат)
+_trigram_search = False
+
+
+async def search_books(query: str, limit: int) -> List[BookItem] | None:
+    """
+    Ищет книги по подстроке или похожему названию (pg_trgm).
+    Если расширение pg_trgm не установлено, ищет только по подстроке.
+
+    Returns:
+        List[BookItem] | None: Найденные книги по убыванию сходства,
+        либо None в случае ошибки подключения или запроса.
+    """
+    # Символы шаблона LIKE во введенном тексте ищутся буквально
+    pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        global _trigram_search
+        if not _trigram_search:
+            row = await db.fetchrow(SELECT_PG_TRGM_INSTALLED)
+            _trigram_search = row is not None and row[0]
+        if not _trigram_search:
+            return await db.fetch(SEARCH_BOOKS_SUBSTRING, pattern, limit)
+        return await db.fetch(SEARCH_BOOKS, pattern, query, limit)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_quarantined_books() -> Set[int] | None:
+    """
+    Возвращает артикулы книг, цены которых находятся в карантине.
+
+    Returns:
+        Set[int] | None: Артикулы, либо None в случае ошибки подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        rows = await db.fetch(SELECT_PRICE_QUARANTINE)
+        return None if rows is None else {row["book_id"] for row in rows}
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def quarantine_prices(
+    book_ids: Sequence[int],
+    prices_kopecks: Sequence[int],
+    tolerance: float,
+) -> Dict[int, int] | None:
+    """
+    Добавляет подозрительные цены в карантин.
+
+    Args:
+        book_ids (Sequence[int]): Артикулы книг.
+        prices_kopecks (Sequence[int]): Цены в копейках.
+        tolerance (float): Доля, в пределах которой цены считаются одним уровнем.
+
+    Returns:
+        Dict[int, int] | None: Сколько раз подряд получен текущий уровень цены
+        каждой книги, либо None в случае ошибки.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        rows = await db.fetch(UPSERT_PRICE_QUARANTINE, list(book_ids), list(prices_kopecks), tolerance)
+        return None if rows is None else {row["book_id"]: row["seen"] for row in rows}
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def release_quarantine(book_ids: Sequence[int]) -> bool:
+    """
+    Удаляет книги из карантина цен.
+
+    Returns:
+        bool: True, если запрос выполнен.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return False
+
+        return await db.execute(DELETE_PRICE_QUARANTINE, list(book_ids))
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return False
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_image_file_ids() -> List[ImageFileId] | None:
+    """
+    Возвращает сохраненные идентификаторы изображений книг в Telegram.
+
+    Returns:
+        List[ImageFileId] | None: Идентификаторы изображений,
+        либо None в случае ошибки подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        return await db.fetch(SELECT_IMAGE_FILE_IDS)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def save_image_file_id(book_id: int, file_hash: str, file_id: str) -> bool:
+    """
+    Сохраняет идентификатор изображения книги в Telegram.
+
+    Returns:
+        bool: True, если запрос выполнен.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return False
+
+        return await db.execute(UPSERT_IMAGE_FILE_ID, book_id, file_hash, file_id)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return False
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def delete_image_file_id(book_id: int, file_hash: str, file_id: str) -> bool:
+    """
+    Удаляет идентификатор изображения, отклоненный Telegram. Идентификатор,
+    уже замененный другим процессом, не удаляется.
+
+    Returns:
+        bool: True, если запрос выполнен.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return False
+
+        return await db.execute(DELETE_IMAGE_FILE_ID, book_id, file_hash, file_id)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return False
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_book_price(book_id: int) -> BookDetails | None:
+    """
+    Возвращает стоимость и название книги по book_id из базы данных.
+
+    Returns:
+        BookDetails | None: Стоимость и название книги по book_id,
+        либо None, если книги нет или произошла ошибка подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        book = await db.fetchrow(SELECT_BOOK_DETAILS, book_id)
         logger.info(
             "Запрос на получение стоимости для книги %s успешно обработан",
             book_id
         )
         
-        return books_price
+        return book
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_book_page(book_id: int) -> Tuple[BookDetails | None, List[BookItem]] | None:
+    """
+    Возвращает стоимость и название выбранной книги вместе с каталогом
+    для клавиатуры одним запросом к БД.
+
+    Returns:
+        Tuple[BookDetails | None, List[BookItem]] | None: Выбранная книга
+        (None, если ее нет в каталоге) и каталог, либо None в случае ошибки
+        подключения или запроса.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        rows = await db.fetch(SELECT_CATALOG_WITH_PRICE, book_id)
+        if rows is None:
+            return None
+
+        book = None
+        catalog = []
+        for row in rows:
+            catalog.append(BookItem(row.book_id, row.book_name))
+            if row.book_id == book_id:
+                book = BookDetails(row.book_name, row.price)
+
+        logger.info(
+            "Запрос на получение стоимости и каталога для книги %s успешно обработан",
+            book_id
+        )
+        return book, catalog
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+def choose_resolution(
+    start: datetime,
+    end: datetime,
+    min_buckets: int = ROLLUP_MIN_BUCKETS,
+) -> Resolution:
+    """
+    Выбирает самое грубое разрешение, при котором период содержит
+    не меньше min_buckets интервалов. Для коротких периодов используются
+    исходные точки истории.
+    """
+    period = (end - start).total_seconds()
+    for resolution in RESOLUTIONS:
+        if resolution.seconds and period / resolution.seconds >= min_buckets:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+async def get_price_series(
+    book_id: int,
+    start: datetime,
+    end: datetime,
+    resolution: Resolution | None = None,
+) -> Tuple[Resolution, List[PriceCandle]] | None:
+    """
+    Возвращает ряд агрегатов цены книги за период [start, end).
+
+    Args:
+        book_id (int): Артикул книги.
+        start (datetime): Начало периода (с часовым поясом).
+        end (datetime): Конец периода (с часовым поясом).
+        resolution (Resolution | None): Разрешение; по умолчанию выбирается
+            choose_resolution.
+
+    Returns:
+        Tuple[Resolution, List[PriceCandle]] | None: Использованное разрешение
+        и агрегаты по возрастанию времени, либо None в случае ошибки.
+    """
+    resolution = resolution or choose_resolution(start, end)
+
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        candles = await db.fetch(resolution.select, book_id, start, end)
+        if candles is None:
+            return None
+        return resolution, candles
+
+    except Exception as e:
+        logger.exception(f"Ошибка при работе с базой данных: {e}")
+        return None
+    finally:
+        if db.connection:
+            await db.close()
+
+
+async def get_price_stats(book_id: int, start: datetime, end: datetime) -> PriceStats | None:
+    """
+    Возвращает минимум, максимум, среднее, первую и последнюю цену книги
+    за период по агрегатам подходящего разрешения.
+
+    Returns:
+        PriceStats | None: Сводка, либо None, если данных нет или произошла ошибка.
+    """
+    series = await get_price_series(book_id, start, end)
+    if not series or not series[1]:
+        return None
+
+    resolution, candles = series
+    samples = sum(candle.samples for candle in candles)
+    return PriceStats(
+        resolution=resolution.name,
+        open_kopecks=candles[0].open_kopecks,
+        high_kopecks=max(candle.high_kopecks for candle in candles),
+        low_kopecks=min(candle.low_kopecks for candle in candles),
+        close_kopecks=candles[-1].close_kopecks,
+        avg_kopecks=sum(candle.sum_kopecks for candle in candles) / samples,
+        samples=samples,
+    )
+
+
+async def get_price_arrays() -> PriceArrays | None:
+    """
+    Возвращает историю цен в наличии (по книгам и времени) и текущие цены
+    всех книг одним запросом, в виде массивов.
+
+    Returns:
+        PriceArrays | None: Массивы цен, либо None в случае ошибки.
+    """
+    db = DataBase()
+    try:
+        if not await db.connect():
+            logger.error("Не удалось подключиться к базе данных.")
+            return None
+
+        arrays = await db.fetchrow(SELECT_PRICE_ARRAYS)
+        logger.info(
+            "Запрос get_price_arrays успешно обработан"
+        )
+        return arrays
 
     except Exception as e:
         logger.exception(f"Ошибка при работе с базой данных: {e}")
@@ -242,6 +922,3 @@ async def get_book_price(book_id) -> list[asyncpg.Record] | None:
     finally:
         if db.connection:
             await db.close()
-            logger.info(
-            "Соединение с БД закрыто"
-        )
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Модуль listener.py
+
+Слушатель уведомлений об изменениях каталога (LISTEN/NOTIFY).
+
+Слушатель держит отдельное от пула соединение, подписанное на канал
+CATALOG_NOTIFY_CHANNEL (см. models/catalog_events.py), и передает
+подписчикам множества измененных book_id. Уведомления, пришедшие,
+пока подписчики заняты, объединяются в одно.
+
+Пока соединение разорвано, уведомления теряются, поэтому после каждого
+(пере)подключения подписчики получают None - сигнал полной
+пересинхронизации. Свойство connected позволяет подписчикам не доверять
+своему состоянию, пока соединения нет, а generation меняется при каждом
+разрыве и каждой новой подписке: состояние, прочитанное при другом
+значении generation, могло пропустить уведомления.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, FrozenSet, List, Optional
+
+import asyncpg
+
+from config import CATALOG_NOTIFY_CHANNEL, DB_LISTENER_KEEPALIVE, DB_LISTENER_RECONNECT_DELAY
+from database.database import CONNECTION_LOST_ERRORS, DataBase
+
+
+logger = logging.getLogger("wb_check_price_bot.database.listener")
+
+# Измененные book_id или None - изменился весь каталог
+CatalogChange = Optional[FrozenSet[int]]
+CatalogCallback = Callable[[CatalogChange], Awaitable[None]]
+
+LISTENER_ERRORS = (*CONNECTION_LOST_ERRORS, asyncpg.PostgresError, OSError, asyncio.TimeoutError)
+
+
+def parse_catalog_payload(payload: str) -> CatalogChange:
+    """
+    Разбирает полезную нагрузку уведомления: book_id через запятую,
+    пустая строка - изменился весь каталог.
+    """
+    if not payload:
+        return None
+    try:
+        return frozenset(int(book_id) for book_id in payload.split(","))
+    except ValueError:
+        logger.warning("Некорректное уведомление об изменении каталога: %r", payload[:256])
+        return None
+
+
+def merge_changes(first: CatalogChange, second: CatalogChange) -> CatalogChange:
+    """
+    Объединяет два изменения; None поглощает любое изменение.
+    """
+    if first is None or second is None:
+        return None
+    return first | second
+
+
+class CatalogListener:
+    """
+    Отдельное соединение LISTEN с автоматическим переподключением.
+    """
+
+    def __init__(
+        self,
+        channel: str = CATALOG_NOTIFY_CHANNEL,
+        reconnect_delay: float = DB_LISTENER_RECONNECT_DELAY,
+        keepalive: float = DB_LISTENER_KEEPALIVE,
+    ):
+        """
+        Args:
+            channel (str): Канал NOTIFY.
+            reconnect_delay (float): Пауза перед повторным подключением, сек.
+            keepalive (float): Период проверки соединения, сек.
+        """
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.keepalive = keepalive
+        self._callbacks: List[CatalogCallback] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Накопленное, но еще не переданное подписчикам изменение
+        self._pending: CatalogChange = frozenset()
+        self._has_pending = asyncio.Event()
+        # Номер подписки: увеличивается при разрыве соединения и после подписки
+        self.generation = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, callback: CatalogCallback) -> None:
+        """
+        Добавляет подписчика на изменения каталога.
+        """
+        self._callbacks.append(callback)
+
+    def start(self) -> None:
+        """
+        Запускает слушателя в фоне.
+        """
+        if self._task is None:
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает слушателя и закрывает его соединение.
+        """
+        for task in (self._task, self._dispatcher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._dispatcher = None
+        await self._close_connection()
+
+    def request_resync(self) -> None:
+        """
+        Запрашивает у подписчиков полную пересинхронизацию.
+        """
+        self._notify(None)
+
+    def _notify(self, change: CatalogChange) -> None:
+        self._pending = merge_changes(self._pending, change)
+        self._has_pending.set()
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._notify(parse_catalog_payload(payload))
+
+    async def _dispatch_loop(self) -> None:
+        """
+        Передает накопленные изменения подписчикам по одному.
+        """
+        while True:
+            await self._has_pending.wait()
+            change, self._pending = self._pending, frozenset()
+            self._has_pending.clear()
+
+            for callback in self._callbacks:
+                try:
+                    await callback(change)
+                except Exception as e:
+                    logger.error("Ошибка обработки изменения каталога: %s", e, exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                lost = asyncio.Event()
+                self._connection = await asyncpg.connect(DataBase().dsn)
+                self._connection.add_termination_listener(lambda connection: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notification)
+                self.generation += 1
+                logger.info("Подписка на изменения каталога (канал %s) оформлена", self.channel)
+
+                # Уведомления, отправленные без подписки, потеряны
+                self.request_resync()
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive)
+                    except asyncio.TimeoutError:
+                        # Полуоткрытое TCP-соединение обнаруживается только запросом
+                        await self._connection.fetchval("SELECT 1;", timeout=self.keepalive)
+                logger.warning("Соединение слушателя изменений каталога закрыто")
+
+            except LISTENER_ERRORS as e:
+                logger.warning("Ошибка соединения слушателя изменений каталога: %s", e)
+            finally:
+                if self._connection is not None:
+                    self.generation += 1
+                await self._close_connection()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=self.keepalive)
+            except LISTENER_ERRORS:
+                connection.terminate()
@@ -0,0 +1,464 @@
+"""
+Модуль queries.py
+
+Реестр SQL-запросов приложения и типы их результатов.
+
+Каждый запрос зарегистрирован один раз под своим именем. Текст запроса
+не меняется, поэтому asyncpg подготавливает (parse/plan) его один раз
+на каждом соединении пула и дальше берет из кэша подготовленных запросов
+соединения (DB_STATEMENT_CACHE_SIZE). Строки результата преобразуются
+в именованные кортежи, поля которых перечислены в порядке столбцов SELECT.
+"""
+
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Type
+
+
+class BookItem(NamedTuple):
+    """
+    Книга каталога.
+    """
+
+    book_id: int
+    book_name: str
+
+
+class BookPrice(NamedTuple):
+    """
+    Последняя сохраненная цена книги.
+    """
+
+    book_id: int
+    price: str
+
+
+class BookDetails(NamedTuple):
+    """
+    Название и цена книги.
+    """
+
+    book_name: str
+    price: str
+
+
+class CatalogRow(NamedTuple):
+    """
+    Книга каталога; price заполнена только у выбранной книги.
+    """
+
+    book_id: int
+    book_name: str
+    price: Optional[str]
+
+
+class CatalogEntry(NamedTuple):
+    """
+    Книга каталога с ценой и порядковым номером (id) для кэша бота.
+    """
+
+    id: int
+    book_id: int
+    book_name: str
+    price: str
+
+
+class BookPriceUpdate(NamedTuple):
+    """
+    Новая цена книги для записи в books и price_history.
+    """
+
+    book_id: int
+    price_kopecks: Optional[int]
+    in_stock: bool
+    ts: datetime
+    price: str
+
+
+class PriceCandle(NamedTuple):
+    """
+    Агрегат цены книги за интервал (цены в копейках).
+    """
+
+    bucket: datetime
+    open_kopecks: int
+    high_kopecks: int
+    low_kopecks: int
+    close_kopecks: int
+    sum_kopecks: int
+    samples: int
+
+    @property
+    def avg_kopecks(self) -> float:
+        return self.sum_kopecks / self.samples
+
+
+class PriceStats(NamedTuple):
+    """
+    Сводка цены книги за период (цены в копейках).
+    """
+
+    resolution: str
+    open_kopecks: int
+    high_kopecks: int
+    low_kopecks: int
+    close_kopecks: int
+    avg_kopecks: float
+    samples: int
+
+
+class Statement(NamedTuple):
+    """
+    Зарегистрированный запрос.
+    """
+
+    name: str
+    sql: str
+    row_type: Optional[Type[NamedTuple]] = None
+
+
+STATEMENTS: Dict[str, Statement] = {}
+
+
+def register(name: str, sql: str, row_type: Optional[Type[NamedTuple]] = None) -> Statement:
+    """
+    Регистрирует запрос в реестре.
+
+    Raises:
+        ValueError: Если запрос с таким именем уже зарегистрирован.
+    """
+    if name in STATEMENTS:
+        raise ValueError(f"Запрос {name} уже зарегистрирован")
+    statement = Statement(name, sql, row_type)
+    STATEMENTS[name] = statement
+    return statement
+
+
+UPDATE_BOOK_PRICE = register(
+    "update_book_price",
+    """UPDATE books
+     SET price = $1
+     WHERE book_id = $2;""",
+)
+
+
+def _rollup_upsert_sql(table: str, unit: str) -> str:
+    """
+    Часть запроса UPDATE_BOOKS_PRICES: изменения цен в наличии (строки
+    changed, те же, что попадают в price_history) добавляются в интервал
+    unit (по UTC), open/close выбираются по времени изменения.
+    """
+    return f"""INSERT INTO {table} AS r (
+        book_id, bucket, open_kopecks, high_kopecks, low_kopecks, close_kopecks,
+        sum_kopecks, samples, first_ts, last_ts
+     )
+     SELECT c.book_id,
+        date_trunc('{unit}', c.ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+        c.price_kopecks, c.price_kopecks, c.price_kopecks, c.price_kopecks,
+        c.price_kopecks, 1, c.ts, c.ts
+     FROM changed AS c
+     WHERE c.in_stock
+     ON CONFLICT (book_id, bucket) DO UPDATE SET
+        open_kopecks = CASE WHEN EXCLUDED.first_ts < r.first_ts
+            THEN EXCLUDED.open_kopecks ELSE r.open_kopecks END,
+        close_kopecks = CASE WHEN EXCLUDED.last_ts >= r.last_ts
+            THEN EXCLUDED.close_kopecks ELSE r.close_kopecks END,
+        high_kopecks = GREATEST(r.high_kopecks, EXCLUDED.high_kopecks),
+        low_kopecks = LEAST(r.low_kopecks, EXCLUDED.low_kopecks),
+        sum_kopecks = r.sum_kopecks + EXCLUDED.sum_kopecks,
+        samples = r.samples + EXCLUDED.samples,
+        first_ts = LEAST(r.first_ts, EXCLUDED.first_ts),
+        last_ts = GREATEST(r.last_ts, EXCLUDED.last_ts)"""
+
+
+# Обновляет цены книг и добавляет в историю и в часовые и дневные агрегаты
+# только действительно изменившиеся. Агрегаты строятся из тех же строк, что
+# и price_history, поэтому все разрешения истории согласованы: samples -
+# количество изменений цены, avg - среднее по изменениям (не по времени);
+# повторные публикации неизменной цены (heartbeat) не учитываются.
+# Обновление применяется, только если оно новее последнего полученного для
+# книги (price_observed.ts, в том числе неизменной цены): повторно
+# отправленное из outbox устаревшее сообщение не затирает более новую цену.
+UPDATE_BOOKS_PRICES = register(
+    "update_books_prices",
+    f"""WITH u AS (
+        SELECT *
+        FROM unnest($1::bigint[], $2::bigint[], $3::boolean[], $4::timestamptz[], $5::text[])
+            AS u(book_id, price_kopecks, in_stock, ts, price)
+     ),
+     fresh AS (
+        INSERT INTO price_observed AS o (book_id, ts)
+        SELECT u.book_id, u.ts FROM u JOIN books USING (book_id)
+        ON CONFLICT (book_id) DO UPDATE SET ts = EXCLUDED.ts
+            WHERE o.ts < EXCLUDED.ts
+        RETURNING o.book_id
+     ),
+     changed AS (
+        UPDATE books AS b
+        SET price = u.price, price_kopecks = u.price_kopecks, in_stock = u.in_stock
+        FROM u JOIN fresh USING (book_id)
+        WHERE b.book_id = u.book_id
+            AND (b.price_kopecks IS DISTINCT FROM u.price_kopecks
+                 OR b.in_stock IS DISTINCT FROM u.in_stock)
+        RETURNING b.book_id, u.price_kopecks, u.in_stock, u.ts
+     ),
+     history AS (
+        INSERT INTO price_history (book_id, ts, price_kopecks, in_stock)
+        SELECT book_id, ts, price_kopecks, in_stock FROM changed
+     ),
+     hourly AS (
+        {_rollup_upsert_sql("price_rollup_hourly", "hour")}
+     )
+     {_rollup_upsert_sql("price_rollup_daily", "day")};""",
+)
+
+SELECT_CATALOG = register(
+    "select_catalog",
+    "SELECT book_id, book_name FROM books ORDER BY id;",
+    BookItem,
+)
+
+# Порядок по первичному ключу нужен серверному курсору iter_book_data
+SELECT_CATALOG_BY_BOOK_ID = register(
+    "select_catalog_by_book_id",
+    "SELECT book_id, book_name FROM books ORDER BY book_id;",
+)
+
+SELECT_BOOKS_PRICES = register(
+    "select_books_prices",
+    "SELECT book_id, price FROM books;",
+    BookPrice,
+)
+
+SELECT_BOOK_DETAILS = register(
+    "select_book_details",
+    """SELECT book_name, price
+     FROM books
+     WHERE book_id = $1;""",
+    BookDetails,
+)
+
+# Каталог для клавиатуры и цена выбранной книги за один запрос
+SELECT_CATALOG_WITH_PRICE = register(
+    "select_catalog_with_price",
+    """SELECT book_id, book_name,
+        CASE WHEN book_id = $1 THEN price END AS price
+     FROM books
+     ORDER BY id;""",
+    CatalogRow,
+)
+
+
+def _catalog_page_sql(condition: str, order: str) -> str:
+    """
+    Страница каталога по ключу (book_name, book_id) относительно книги $1.
+    Ключ граничной книги берется по первичному ключу, поэтому в callback_data
+    достаточно передать ее book_id.
+    """
+    return f"""SELECT b.book_id, b.book_name
+     FROM books AS b,
+        (SELECT book_name, book_id FROM books WHERE book_id = $1) AS c
+     WHERE (b.book_name, b.book_id) {condition} (c.book_name, c.book_id)
+     ORDER BY b.book_name {order}, b.book_id {order}
+     LIMIT $2;"""
+
+
+# Постраничный просмотр каталога по индексу books (book_name, book_id)
+SELECT_CATALOG_FIRST_PAGE = register(
+    "select_catalog_first_page",
+    """SELECT book_id, book_name
+     FROM books
+     ORDER BY book_name, book_id
+     LIMIT $1;""",
+    BookItem,
+)
+
+SELECT_CATALOG_PAGE_AFTER = register(
+    "select_catalog_page_after", _catalog_page_sql(">", "ASC"), BookItem
+)
+
+SELECT_CATALOG_PAGE_FROM = register(
+    "select_catalog_page_from", _catalog_page_sql(">=", "ASC"), BookItem
+)
+
+# Книги перед граничной в обратном порядке
+SELECT_CATALOG_PAGE_BEFORE = register(
+    "select_catalog_page_before", _catalog_page_sql("<", "DESC"), BookItem
+)
+
+# Поиск по названию: подстрока или похожее название (индекс pg_trgm)
+SEARCH_BOOKS = register(
+    "search_books",
+    """SELECT book_id, book_name
+     FROM books
+     WHERE book_name ILIKE '%' || $1 || '%' OR book_name % $2
+     ORDER BY similarity(book_name, $2) DESC, book_name, book_id
+     LIMIT $3;""",
+    BookItem,
+)
+
+# Поиск только по подстроке, если расширение pg_trgm не установлено
+SEARCH_BOOKS_SUBSTRING = register(
+    "search_books_substring",
+    """SELECT book_id, book_name
+     FROM books
+     WHERE book_name ILIKE '%' || $1 || '%'
+     ORDER BY book_name, book_id
+     LIMIT $2;""",
+    BookItem,
+)
+
+# Установлено ли расширение pg_trgm
+SELECT_PG_TRGM_INSTALLED = register(
+    "select_pg_trgm_installed",
+    "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm');",
+)
+
+# Каталог с ценами для кэша бота (database/catalog_cache.py)
+SELECT_CATALOG_ENTRIES = register(
+    "select_catalog_entries",
+    "SELECT id, book_id, book_name, price FROM books ORDER BY id;",
+    CatalogEntry,
+)
+
+SELECT_CATALOG_ENTRIES_BY_IDS = register(
+    "select_catalog_entries_by_ids",
+    """SELECT id, book_id, book_name, price
+     FROM books
+     WHERE book_id = ANY($1::bigint[]);""",
+    CatalogEntry,
+)
+
+
+def _rollup_select_sql(table: str) -> str:
+    return f"""SELECT bucket, open_kopecks, high_kopecks, low_kopecks, close_kopecks,
+        sum_kopecks, samples
+     FROM {table}
+     WHERE book_id = $1 AND bucket >= $2 AND bucket < $3
+     ORDER BY bucket;"""
+
+
+SELECT_ROLLUP_HOURLY = register(
+    "select_rollup_hourly", _rollup_select_sql("price_rollup_hourly"), PriceCandle
+)
+
+SELECT_ROLLUP_DAILY = register(
+    "select_rollup_daily", _rollup_select_sql("price_rollup_daily"), PriceCandle
+)
+
+# Исходные точки истории в виде агрегатов из одного наблюдения
+SELECT_HISTORY_CANDLES = register(
+    "select_history_candles",
+    """SELECT ts, price_kopecks, price_kopecks, price_kopecks, price_kopecks,
+        price_kopecks, 1
+     FROM price_history
+     WHERE book_id = $1 AND ts >= $2 AND ts < $3 AND in_stock
+     ORDER BY ts;""",
+    PriceCandle,
+)
+
+
+class PriceArrays(NamedTuple):
+    """
+    История цен в наличии и текущие цены всех книг в виде массивов.
+    """
+
+    history_book_ids: Optional[list]
+    history_prices: Optional[list]
+    current_book_ids: Optional[list]
+    current_prices: Optional[list]
+    current_in_stock: Optional[list]
+
+
+# Вся история и текущие цены одной строкой из массивов: преобразование
+# в NumPy не требует цикла по строкам результата
+SELECT_PRICE_ARRAYS = register(
+    "select_price_arrays",
+    """SELECT
+        (SELECT array_agg(book_id ORDER BY book_id, ts)
+            FROM price_history WHERE in_stock),
+        (SELECT array_agg(price_kopecks ORDER BY book_id, ts)
+            FROM price_history WHERE in_stock),
+        (SELECT array_agg(book_id ORDER BY book_id) FROM books),
+        (SELECT array_agg(COALESCE(price_kopecks, 0) ORDER BY book_id) FROM books),
+        (SELECT array_agg(COALESCE(in_stock, false) ORDER BY book_id) FROM books);""",
+    PriceArrays,
+)
+
+
+# Карантин подозрительных цен (analytics.price_stats.PriceSanityGuard)
+SELECT_PRICE_QUARANTINE = register(
+    "select_price_quarantine",
+    "SELECT book_id FROM price_quarantine;",
+)
+
+# Считает подряд полученные цены одного уровня (в пределах доли $3);
+# цена другого уровня начинает счет заново
+UPSERT_PRICE_QUARANTINE = register(
+    "upsert_price_quarantine",
+    """INSERT INTO price_quarantine AS q (book_id, price_kopecks, seen, updated_at)
+     SELECT book_id, price_kopecks, 1, now()
+     FROM unnest($1::bigint[], $2::bigint[]) AS u(book_id, price_kopecks)
+     ON CONFLICT (book_id) DO UPDATE SET
+        seen = CASE
+            WHEN abs(ln(EXCLUDED.price_kopecks::float8 / q.price_kopecks)) <= ln(1 + $3::float8)
+            THEN q.seen + 1 ELSE 1 END,
+        price_kopecks = CASE
+            WHEN abs(ln(EXCLUDED.price_kopecks::float8 / q.price_kopecks)) <= ln(1 + $3::float8)
+            THEN q.price_kopecks ELSE EXCLUDED.price_kopecks END,
+        updated_at = EXCLUDED.updated_at
+     RETURNING book_id, seen;""",
+)
+
+DELETE_PRICE_QUARANTINE = register(
+    "delete_price_quarantine",
+    "DELETE FROM price_quarantine WHERE book_id = ANY($1::bigint[]);",
+)
+
+
+class ImageFileId(NamedTuple):
+    """
+    Идентификатор загруженного в Telegram изображения книги.
+    """
+
+    book_id: int
+    file_hash: str
+    file_id: str
+
+
+SELECT_IMAGE_FILE_IDS = register(
+    "select_image_file_ids",
+    "SELECT book_id, file_hash, file_id FROM book_images;",
+    ImageFileId,
+)
+
+UPSERT_IMAGE_FILE_ID = register(
+    "upsert_image_file_id",
+    """INSERT INTO book_images (book_id, file_hash, file_id, updated_at)
+     VALUES ($1, $2, $3, now())
+     ON CONFLICT (book_id, file_hash) DO UPDATE
+        SET file_id = EXCLUDED.file_id, updated_at = EXCLUDED.updated_at;""",
+)
+
+DELETE_IMAGE_FILE_ID = register(
+    "delete_image_file_id",
+    """DELETE FROM book_images
+     WHERE book_id = $1 AND file_hash = $2 AND file_id = $3;""",
+)
+
+
+class Resolution(NamedTuple):
+    """
+    Разрешение истории цен: длительность интервала и запрос чтения.
+    """
+
+    name: str
+    seconds: int
+    select: Statement
+
+
+# От самого грубого к самому подробному
+RESOLUTIONS = (
+    Resolution("day", 86400, SELECT_ROLLUP_DAILY),
+    Resolution("hour", 3600, SELECT_ROLLUP_HOURLY),
+    Resolution("raw", 0, SELECT_HISTORY_CANDLES),
+)
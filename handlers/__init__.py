@@ -6,5 +6,6 @@
 
 from handlers import (
     commands_handler,  # Импорт обработчика команд
+    inline_handler,  # Импорт обработчика inline-запросов
     users_handler,  # Импорт обработчика пользователЬских дейтвий
 )
\ No newline at end of file
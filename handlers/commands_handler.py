@@ -1,9 +1,12 @@
 import logging
+import math
 from aiogram import types
 from aiogram.filters.command import Command
 from aiogram import Router
 
-from resources import creating_book_kb, welcome_text
+from analytics import CatalogStats, load_catalog_stats
+from database.catalog_cache import get_catalog
+from resources import get_book_markup, welcome_text
 
 
 logger = logging.getLogger("wb_check_price_bot.handlers.commands")
@@ -21,11 +24,10 @@ async def cmd_start(message: types.Message):
         message (types.Message): Объект сообщения от пользователя.
     """
     try:
-        kb = await creating_book_kb()
-        
+        # Клавиатура каталога одна для всех пользователей и берется из кэша
         await message.answer(
             text=welcome_text,
-            reply_markup=kb.as_markup(resize_keyboard=True)
+            reply_markup=await get_book_markup()
         )
                
     except Exception as e:
@@ -35,4 +37,70 @@ async def cmd_start(message: types.Message):
             exc_info=True
         )
         
+        await message.answer("Произошла ошибка. Попробуйте позже.")
+
+
+def format_stats(stats: CatalogStats, names: dict) -> str:
+    """
+    Формирует текст ответа на команду `/stats`.
+
+    Args:
+        stats (CatalogStats): Статистика цен каталога.
+        names (dict): Названия книг по артикулам.
+    """
+    summary = stats.summary()
+    lines = [
+        f"Книг в каталоге: {summary.books}",
+        f"С историей цен: {summary.with_history}",
+    ]
+    if not math.isnan(summary.median_volatility):
+        lines.append(f"Медианная волатильность: {summary.median_volatility:.1%}")
+
+    if summary.near_minimum:
+        lines.append("\nБлиже всего к историческому минимуму:")
+        for book_id in summary.near_minimum:
+            book = stats.get(book_id)
+            lines.append(
+                f"• {names.get(book_id, book_id)}: {book.current:.2f} руб. "
+                f"(минимум {book.all_time_min:.2f}, +{book.drawdown:.0%})"
+            )
+
+    if summary.suspicious:
+        lines.append("\nПодозрительные цены:")
+        for book_id in summary.suspicious:
+            book = stats.get(book_id)
+            lines.append(
+                f"• {names.get(book_id, book_id)}: {book.current:.2f} руб. "
+                f"(медиана {book.p50:.2f})"
+            )
+
+    return "\n".join(lines)
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: types.Message):
+    """
+    Обработчик команды `/stats`.
+
+    Отправляет сводную статистику цен каталога.
+
+    Args:
+        message (types.Message): Объект сообщения от пользователя.
+    """
+    try:
+        stats = await load_catalog_stats()
+        if stats is None:
+            await message.answer("Статистика временно недоступна. Попробуйте позже.")
+            return
+
+        names = {book.book_id: book.book_name for book in await get_catalog() or []}
+        await message.answer(format_stats(stats, names))
+
+    except Exception as e:
+        logger.error(
+            "Ошибка при обработке команды /stats для пользователя %s: %s",
+            message.from_user.full_name, e,
+            exc_info=True
+        )
+
         await message.answer("Произошла ошибка. Попробуйте позже.")
\ No newline at end of file
@@ -0,0 +1,64 @@
+import html
+import logging
+from aiogram import types
+from aiogram import Router
+
+from config import INLINE_CACHE_TIME, INLINE_RESULTS_LIMIT
+from database.catalog_index import catalog_index
+from database.queries import CatalogEntry
+
+
+logger = logging.getLogger("wb_check_price_bot.handlers.inline")
+router = Router()
+
+
+def price_text(entry: CatalogEntry) -> str:
+    """
+    Текст сообщения с ценой книги (как в ответе на выбор книги).
+    """
+    if entry.price == 'Нет в наличии':
+        return f'<b>{html.escape(entry.book_name)}</b>: нет в наличии'
+    return f'Стоимость книги <b>{html.escape(entry.book_name)}</b> составляет <b>{entry.price}₽</b>'
+
+
+@router.inline_query()
+async def inline_price(inline_query: types.InlineQuery):
+    """
+    Обработчик inline-запроса `@bot название`.
+
+    Отвечает из индекса каталога в памяти без обращения к БД; Telegram
+    кэширует ответ на INLINE_CACHE_TIME секунд.
+
+    Args:
+        inline_query (types.InlineQuery): Inline-запрос пользователя.
+    """
+    try:
+        offset = int(inline_query.offset or 0)
+        limit = min(INLINE_RESULTS_LIMIT, 50)
+        entries = catalog_index.search(inline_query.query, offset + limit + 1)
+        page = entries[offset:offset + limit]
+
+        results = [
+            types.InlineQueryResultArticle(
+                id=str(entry.book_id),
+                title=entry.book_name,
+                description=entry.price if entry.price == 'Нет в наличии' else f'{entry.price}₽',
+                input_message_content=types.InputTextMessageContent(message_text=price_text(entry)),
+            )
+            for entry in page
+        ]
+
+        await inline_query.answer(
+            results,
+            # Пока индекс не построен, пустой ответ не кэшируется надолго
+            cache_time=INLINE_CACHE_TIME if len(catalog_index) else 1,
+            is_personal=False,
+            next_offset=str(offset + limit) if len(entries) > offset + limit else '',
+        )
+
+    except Exception as e:
+        logger.error(
+            "Ошибка при обработке inline-запроса %r пользователя %s: %s",
+            inline_query.query, inline_query.from_user.full_name, e,
+            exc_info=True
+        )
@@ -2,8 +2,16 @@ import logging
 from aiogram import types
 from aiogram import Router, F
 
-from database.database import get_book_price
-from resources import creating_book_kb, images
+from config import CATALOG_SEARCH_LIMIT
+from database.catalog_cache import get_book_details
+from database.database import search_books
+from resources import (
+    PAGE_CALLBACK_PREFIX,
+    get_book_markup,
+    image_registry,
+    parse_page_callback_data,
+    search_results_markup,
+)
 
 
 logger = logging.getLogger("wb_check_price_bot.handlers.users")
@@ -25,8 +33,8 @@ async def f_book_id(callback: types.CallbackQuery):
         # Извлечение ID книги из callback данных
         book_id = callback.data[8:]
         
-        # Получение данные о книге из базы данных
-        book_data = await get_book_price(int(book_id))
+        # Данные о книге из кэша каталога
+        book_data = await get_book_details(int(book_id))
         
         if not book_data:
             logger.warning("Данные о книге не найдены для book_id: %s", book_id)
@@ -34,26 +42,32 @@ async def f_book_id(callback: types.CallbackQuery):
             return
             
         # Формирование текст сообщения в зависимости от наличия книги
-        if book_data[0]['price'] == 'Нет в наличии':
+        if book_data.price == 'Нет в наличии':
             msg_text = '<b>Выбранной книги нет в наличии</b>'
             logger.info(
                 "Книга %s отсутствует в наличии (пользователь: %s)",
-                book_data[0]['book_name'], callback.from_user.full_name
+                book_data.book_name, callback.from_user.full_name
             )
         else: 
             msg_text = f"""
-            Стоимость книги <b>{book_data[0]['book_name']}</b> составляет <b>{book_data[0]['price']}₽</b>
+            Стоимость книги <b>{book_data.book_name}</b> составляет <b>{book_data.price}₽</b>
             """
 
-        img = images.get(book_id)
-        kb = await creating_book_kb()
+        # Страница каталога, начинающаяся с выбранной книги
+        kb = await get_book_markup("from", int(book_id))
         
-        # Отправка сообщения с фото и информацией о книге
-        await callback.message.answer_photo(
-            photo=img,
-            caption=msg_text,
-            reply_markup=kb.as_markup(resize_keyboard=True)
+        # Отправка сообщения с фото и информацией о книге; фото, уже загруженное
+        # в Telegram, отправляется по file_id
+        sent = await image_registry.send(
+            book_id,
+            lambda photo: callback.message.answer_photo(
+                photo=photo,
+                caption=msg_text,
+                reply_markup=kb
+            )
         )
+        if sent is None:
+            await callback.message.answer(text=msg_text, reply_markup=kb)
         
     except ValueError as e:
         logger.error(
@@ -71,4 +85,67 @@ async def f_book_id(callback: types.CallbackQuery):
             exc_info=True
         )
         await callback.message.answer("Произошла ошибка. Попробуйте позже.")
-        await callback.answer()
\ No newline at end of file
+        await callback.answer()
+
+
+@router.callback_query(F.data.startswith(PAGE_CALLBACK_PREFIX))
+async def f_catalog_page(callback: types.CallbackQuery):
+    """
+    Обработчик перехода на соседнюю страницу каталога.
+
+    Args:
+        callback (types.CallbackQuery): Callback запрос от кнопки перехода
+    """
+    try:
+        direction, book_id = parse_page_callback_data(callback.data)
+        kb = await get_book_markup(direction, book_id)
+        await callback.message.edit_reply_markup(reply_markup=kb)
+        await callback.answer()
+
+    except ValueError as e:
+        logger.error(
+            "Некорректные данные перехода по страницам: %s, данные: %s, пользователь: %s",
+            e, callback.data, callback.from_user.full_name
+        )
+        await callback.answer("Ошибка обработки запроса")
+
+    except Exception as e:
+        logger.error(
+            "Ошибка перехода по страницам каталога: %s, данные: %s, пользователь: %s",
+            e, callback.data, callback.from_user.full_name,
+            exc_info=True
+        )
+        await callback.answer("Произошла ошибка. Попробуйте позже.")
+
+
+@router.message(F.text & ~F.text.startswith('/'))
+async def f_search(message: types.Message):
+    """
+    Обработчик текстового сообщения: поиск книг по названию.
+
+    Args:
+        message (types.Message): Сообщение с частью названия книги
+    """
+    try:
+        query = message.text.strip()
+        books = await search_books(query, CATALOG_SEARCH_LIMIT) if query else []
+
+        if books is None:
+            await message.answer("Произошла ошибка. Попробуйте позже.")
+            return
+        if not books:
+            await message.answer("Книги не найдены")
+            return
+
+        await message.answer(
+            text=f"Найдено книг: {len(books)}",
+            reply_markup=search_results_markup(books)
+        )
+
+    except Exception as e:
+        logger.error(
+            "Ошибка поиска книг: %s, запрос: %s, пользователь: %s",
+            e, message.text, message.from_user.full_name,
+            exc_info=True
+        )
+        await message.answer("Произошла ошибка. Попробуйте позже.")
\ No newline at end of file
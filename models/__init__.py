@@ -1,7 +1,10 @@
 """
 Пакет функций.
 
-Содержит модуль create_models для создания таблиц.
+Содержит модуль create_models для создания таблиц, модуль price_history
+для обслуживания секций истории цен и модуль catalog_events с триггерами
+уведомлений об изменениях каталога.
 """
 
-from models.create_models import create_models
\ No newline at end of file
+from models.create_models import create_models
+from models.price_history import maintain_price_history
\ No newline at end of file
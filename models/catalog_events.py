@@ -0,0 +1,53 @@
+"""
+Модуль catalog_events.py
+
+Уведомления об изменениях таблицы books.
+
+Триггеры уровня оператора на INSERT, UPDATE и DELETE отправляют в канал
+CATALOG_NOTIFY_CHANNEL список измененных book_id через запятую. NOTIFY
+доставляется слушателям после фиксации транзакции, поэтому пачка
+обновлений цен consumer порождает одно уведомление. Полезная нагрузка
+NOTIFY ограничена 8000 байтами: если список не помещается, отправляется
+пустая строка, означающая "изменился весь каталог".
+"""
+
+from config import CATALOG_NOTIFY_CHANNEL
+from database.database import DataBase
+
+
+# Максимальная длина списка book_id в уведомлении
+MAX_PAYLOAD_LENGTH = 7900
+
+
+async def create_catalog_notify_triggers(db: DataBase) -> None:
+    """
+    Создает функцию уведомления и триггеры таблицы books.
+    """
+    await db.execute(f'''
+        CREATE OR REPLACE FUNCTION notify_books_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            ids TEXT;
+        BEGIN
+            SELECT string_agg(DISTINCT book_id::text, ',') INTO ids FROM changed_books;
+            IF ids IS NOT NULL THEN
+                PERFORM pg_notify(
+                    TG_ARGV[0],
+                    CASE WHEN length(ids) > {MAX_PAYLOAD_LENGTH} THEN '' ELSE ids END
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$;''')
+
+    # Таблицы переходов допускаются только у триггеров на одно событие
+    for event, table in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        trigger = f"books_notify_{event.lower()}"
+        await db.execute(f"DROP TRIGGER IF EXISTS {trigger} ON books;")
+        await db.execute(f'''
+            CREATE TRIGGER {trigger}
+                AFTER {event} ON books
+                REFERENCING {table} TABLE AS changed_books
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION notify_books_changed('{CATALOG_NOTIFY_CHANNEL}');''')
+
@@ -1,14 +1,49 @@
 import logging
 from database.database import DataBase
+from models.catalog_events import create_catalog_notify_triggers
+from models.price_history import (
+    create_price_history,
+    create_price_rollups,
+    ensure_history_partitions,
+)
 
 
 logger = logging.getLogger("wb_check_price_bot.handlers.users")
 
 
+async def create_trigram_search(db: DataBase) -> bool:
+    """
+    Устанавливает расширение pg_trgm и триграммный индекс по названию книг.
+
+    Расширение может быть недоступно (нет пакета contrib или прав на его
+    установку), поэтому шаг выполняется отдельно от остальной схемы: без него
+    поиск в боте работает только по подстроке (database.database.search_books).
+
+    Returns:
+        bool: True, если расширение и индекс созданы.
+    """
+    try:
+        created = (
+            await db.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            and await db.execute('''
+                CREATE INDEX IF NOT EXISTS books_book_name_trgm
+                    ON books USING GIN (book_name gin_trgm_ops);''')
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при работе с базой данных: {e}")
+        created = False
+
+    if not created:
+        logger.warning("Расширение pg_trgm недоступно, поиск книг будет только по подстроке")
+    return created
+
+
 async def create_models():
     """
     Создает таблицу books в базе данных, если она еще не существуют и заполняет ее начальными
-    данными.
+    данными. Создает таблицу истории цен price_history и ее ближайшие секции,
+    а также триггеры уведомлений об изменениях books и (если доступно
+    расширение pg_trgm) индекс для поиска похожих названий.
 
     В случае ошибки при работе с базой данных, выводит сообщение об ошибке.
     """
@@ -33,9 +68,59 @@ async def create_models():
                     (94341513, 'Идеальная работа', '0')
                     ON CONFLICT (book_id) DO NOTHING;
             ''')
+            # Цена в копейках и признак наличия (price остается текстом для отображения)
+            await db.execute('''
+                ALTER TABLE books
+                    ADD COLUMN IF NOT EXISTS price_kopecks BIGINT,
+                    ADD COLUMN IF NOT EXISTS in_stock BOOLEAN;''')
+            # Заполнение новых столбцов по сохраненным текстовым ценам
+            await db.execute('''
+                UPDATE books
+                    SET price_kopecks = CASE
+                            WHEN price ~ '^[0-9]+(\\.[0-9]+)?$' THEN round(price::numeric * 100)::bigint
+                        END,
+                        in_stock = price ~ '^[0-9]+(\\.[0-9]+)?$'
+                    WHERE in_stock IS NULL;''')
+            # История цен
+            await create_price_history(db)
+            await create_price_rollups(db)
+            # Время последнего полученного обновления цены каждой книги
+            # (устаревшие обновления из outbox не применяются)
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS price_observed (
+                    book_id BIGINT PRIMARY KEY,
+                    ts TIMESTAMPTZ NOT NULL
+                );''')
+            # Карантин подозрительных цен (analytics.price_stats.PriceSanityGuard)
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS price_quarantine (
+                    book_id BIGINT PRIMARY KEY,
+                    price_kopecks BIGINT NOT NULL,
+                    seen INTEGER NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL
+                );''')
+            # Постраничный просмотр каталога по названию
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS books_book_name_book_id
+                    ON books (book_name, book_id);''')
+            # Идентификаторы изображений книг, загруженных в Telegram
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS book_images (
+                    book_id BIGINT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL,
+                    PRIMARY KEY (book_id, file_hash)
+                );''')
+            # Уведомления об изменениях каталога для кэшей бота
+            await create_catalog_notify_triggers(db)
+            # Поиск по названию (подстрока и похожие названия)
+            await create_trigram_search(db)
 
         except Exception as e:
             logger.error(f"Ошибка при работе с базой данных: {e}")
 
         finally:
-            await db.close()
\ No newline at end of file
+            await db.close()
+
+        await ensure_history_partitions()
\ No newline at end of file
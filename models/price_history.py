@@ -0,0 +1,186 @@
+"""
+Модуль price_history.py
+
+Таблица истории цен price_history.
+
+Таблица секционирована по месяцам (RANGE по ts): секция
+price_history_yYYYYmMM хранит изменения цен за один месяц. Индекс BRIN
+по ts занимает несколько страниц и отбирает секции и блоки по времени,
+btree (book_id, ts) обслуживает запросы истории одной книги.
+
+Секции создаются заранее и по мере появления изменений с новыми датами,
+а устаревшие удаляются целиком (DROP TABLE) без построчного DELETE
+и последующего VACUUM.
+
+Таблицы price_rollup_hourly и price_rollup_daily хранят часовые и дневные
+агрегаты цены (open/high/low/close, сумма и количество изменений) по
+каждой книге. Consumer пополняет их тем же запросом и теми же изменениями
+цены, что и price_history, поэтому статистика за длинный период читается
+из нескольких сотен строк независимо от объема истории.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Set, Tuple
+
+from config import PRICE_HISTORY_RETENTION_MONTHS
+from database.database import DataBase
+
+
+logger = logging.getLogger("wb_check_price_bot.models.price_history")
+
+PARTITION_PREFIX = "price_history_y"
+
+# Месяцы, секции которых уже созданы этим процессом
+_known_partitions: Set[Tuple[int, int]] = set()
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"{PARTITION_PREFIX}{year:04d}m{month:02d}"
+
+
+def next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def shift_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    """
+    Сдвигает месяц на months месяцев (в том числе назад).
+    """
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+async def create_price_history(db: DataBase) -> None:
+    """
+    Создает секционированную таблицу истории цен и ее индексы.
+    """
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS price_history (
+            book_id BIGINT NOT NULL,
+            ts TIMESTAMPTZ NOT NULL,
+            price_kopecks BIGINT,
+            in_stock BOOLEAN NOT NULL
+        ) PARTITION BY RANGE (ts);''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS price_history_ts_brin
+            ON price_history USING BRIN (ts);''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS price_history_book_id_ts
+            ON price_history (book_id, ts);''')
+
+
+async def create_price_rollups(db: DataBase) -> None:
+    """
+    Создает таблицы часовых и дневных агрегатов цены.
+    """
+    for table in ("price_rollup_hourly", "price_rollup_daily"):
+        await db.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                book_id BIGINT NOT NULL,
+                bucket TIMESTAMPTZ NOT NULL,
+                open_kopecks BIGINT NOT NULL,
+                high_kopecks BIGINT NOT NULL,
+                low_kopecks BIGINT NOT NULL,
+                close_kopecks BIGINT NOT NULL,
+                sum_kopecks BIGINT NOT NULL,
+                samples INTEGER NOT NULL,
+                first_ts TIMESTAMPTZ NOT NULL,
+                last_ts TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (book_id, bucket)
+            );''')
+
+
+async def ensure_history_partitions(timestamps: Iterable[datetime] = ()) -> bool:
+    """
+    Создает секции для текущего и следующего месяцев, а также для месяцев
+    переданных меток времени, если их еще нет.
+
+    Returns:
+        bool: True, если все нужные секции существуют.
+    """
+    now = datetime.now(timezone.utc)
+    months = {(now.year, now.month), next_month(now.year, now.month)}
+    months.update((ts.year, ts.month) for ts in timestamps)
+    missing = months - _known_partitions
+    if not missing:
+        return True
+
+    db = DataBase()
+    if not await db.connect():
+        logger.error("Не удалось подключиться к базе данных.")
+        return False
+
+    try:
+        for year, month in sorted(missing):
+            upper = next_month(year, month)
+            created = await db.execute(
+                f'''CREATE TABLE IF NOT EXISTS {partition_name(year, month)}
+                    PARTITION OF price_history
+                    FOR VALUES FROM ('{year:04d}-{month:02d}-01 00:00+00')
+                    TO ('{upper[0]:04d}-{upper[1]:02d}-01 00:00+00');'''
+            )
+            if not created:
+                return False
+            _known_partitions.add((year, month))
+            logger.info("Секция истории цен %s готова", partition_name(year, month))
+        return True
+    finally:
+        await db.close()
+
+
+async def drop_expired_history_partitions(
+    retention_months: int = PRICE_HISTORY_RETENTION_MONTHS,
+) -> int:
+    """
+    Удаляет секции, все записи которых старше retention_months месяцев.
+
+    Returns:
+        int: Количество удаленных секций.
+    """
+    if retention_months <= 0:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    oldest_kept = shift_months(now.year, now.month, -retention_months)
+
+    db = DataBase()
+    if not await db.connect():
+        logger.error("Не удалось подключиться к базе данных.")
+        return 0
+
+    dropped = 0
+    try:
+        partitions = await db.fetch(
+            """SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'price_history';"""
+        ) or []
+
+        for partition in partitions:
+            name = partition["relname"]
+            try:
+                year, month = map(int, name[len(PARTITION_PREFIX):].split("m"))
+            except ValueError:
+                # Секции, созданные вручную под другим именем, не трогаются
+                continue
+
+            if (year, month) < oldest_kept:
+                if await db.execute(f"DROP TABLE IF EXISTS {name};"):
+                    _known_partitions.discard((year, month))
+                    dropped += 1
+                    logger.info("Секция истории цен %s удалена по сроку хранения", name)
+    finally:
+        await db.close()
+
+    return dropped
+
+
+async def maintain_price_history() -> None:
+    """
+    Обслуживание истории цен: создание будущих секций и удаление устаревших.
+    """
+    await ensure_history_partitions()
+    await drop_expired_history_partitions()
@@ -0,0 +1,157 @@
+"""
+Модуль parser.bench_fetch
+
+Замер скорости получения цен через HttpPriceFetcher на локальной заглушке
+API карточек WB (без обращения к реальному сервису, БД и RabbitMQ).
+
+Запуск:
+    python parser/bench_fetch.py --items 1000
+    python parser/bench_fetch.py --items 1000 --batch-size 1   # запрос на каждый товар
+    python parser/bench_fetch.py --items 5000 --batch-size 10 --rate 200 --throttle-rate 0.05
+    python parser/bench_fetch.py --serve --port 8081   # только заглушка
+
+Чтобы запустить parser/get_price.py на заглушке, задайте переменную окружения
+WB_CARD_URL=http://127.0.0.1:8081/cards/v4/detail.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+import zlib
+
+from aiohttp import web
+
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_PATH)
+
+from config import PRICE_BATCH_SIZE, SCHEDULER_MAX_CONCURRENCY, SCHEDULER_RATE_PER_HOST
+from parser.http_fetcher import HttpPriceFetcher
+from parser.scheduler import PriceCheckScheduler
+
+
+STUB_PATH = "/cards/v4/detail"
+
+
+def make_stub_product(vendor_code: str) -> dict:
+    """
+    Формирует карточку товара с детерминированной ценой для артикула.
+    """
+    product_price = 50000 + zlib.crc32(vendor_code.encode()) % 100000
+    return {
+        "id": int(vendor_code),
+        "sizes": [{"price": {"product": product_price, "logistics": 1500}}],
+    }
+
+
+async def stub_detail_handler(request: web.Request) -> web.Response:
+    """
+    Обработчик заглушки: отвечает карточками для всех артикулов из параметра nm.
+    """
+    delay = request.app["delay"]
+    if delay:
+        await asyncio.sleep(delay)
+
+    # Имитация троттлинга на стороне WB
+    if random.random() < request.app["throttle_rate"]:
+        return web.Response(status=429, headers={"Retry-After": "1"})
+
+    vendor_codes = [code for code in request.query.get("nm", "").split(";") if code]
+    products = [make_stub_product(code) for code in vendor_codes]
+    return web.json_response({"products": products})
+
+
+def create_stub_app(delay: float = 0.0, throttle_rate: float = 0.0) -> web.Application:
+    """
+    Создает aiohttp-приложение заглушки API карточек.
+
+    Args:
+        delay (float): Искусственная задержка ответа, сек.
+        throttle_rate (float): Доля запросов, на которые заглушка отвечает 429.
+    """
+    app = web.Application()
+    app["delay"] = delay
+    app["throttle_rate"] = throttle_rate
+    app.router.add_get(STUB_PATH, stub_detail_handler)
+    return app
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    """
+    Запрашивает цены для args.items артикулов и выводит достигнутую скорость.
+    """
+    url, items, batch_size = args.url, args.items, args.batch_size
+    runner = None
+    if url is None:
+        runner = web.AppRunner(create_stub_app(args.delay, args.throttle_rate))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}{STUB_PATH}"
+
+    vendor_codes = [str(1000000 + i) for i in range(items)]
+
+    try:
+        scheduler = PriceCheckScheduler(
+            max_concurrency=args.concurrency,
+            rate_per_host=args.rate,
+            burst=args.concurrency,
+        )
+        async with HttpPriceFetcher(
+            base_url=url, batch_size=batch_size, scheduler=scheduler
+        ) as fetcher:
+            start_time = time.perf_counter()
+            prices = await fetcher.fetch_prices(vendor_codes)
+            elapsed = time.perf_counter() - start_time
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    failed = items - sum(price is not None for price in prices.values())
+    requests_count = -(-items // max(1, batch_size))
+    print(f"Адрес: {url}")
+    print(f"Товаров: {items}, запросов: {requests_count}, ошибок: {failed}")
+    print(f"Время: {elapsed:.3f} с, {items / elapsed:.1f} товаров/с, "
+          f"{elapsed / items * 1000:.2f} мс/товар")
+    print(f"Ответов 429/5xx: {scheduler.throttled}, "
+          f"итоговый лимит параллельности: {int(scheduler.limiter.limit)}, "
+          f"дублирующих запросов: {fetcher.policy.hedged_requests}")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Замер скорости получения цен на заглушке API WB")
+    arg_parser.add_argument("--items", type=int, default=1000, help="Количество артикулов")
+    arg_parser.add_argument("--url", default=None, help="Адрес API (по умолчанию встроенная заглушка)")
+    arg_parser.add_argument("--batch-size", type=int, default=PRICE_BATCH_SIZE,
+                            help="Артикулов в одном запросе (1 - по запросу на товар)")
+    arg_parser.add_argument("--concurrency", type=int, default=SCHEDULER_MAX_CONCURRENCY,
+                            help="Максимум одновременных запросов")
+    arg_parser.add_argument("--rate", type=float, default=SCHEDULER_RATE_PER_HOST,
+                            help="Лимит запросов в секунду")
+    arg_parser.add_argument("--throttle-rate", type=float, default=0.0,
+                            help="Доля ответов 429 от заглушки")
+    arg_parser.add_argument("--delay", type=float, default=0.0, help="Задержка ответа заглушки, сек.")
+    arg_parser.add_argument("--serve", action="store_true", help="Только запустить заглушку")
+    arg_parser.add_argument("--port", type=int, default=8081, help="Порт заглушки для --serve")
+    args = arg_parser.parse_args()
+
+    # Логирование каждого товара искажает замер
+    logging.getLogger("wb_check_price_bot").setLevel(logging.WARNING)
+
+    if args.serve:
+        web.run_app(
+            create_stub_app(args.delay, args.throttle_rate),
+            host="127.0.0.1", port=args.port,
+        )
+        return
+
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Модуль parser.change_detector
+
+Отбор изменившихся цен перед публикацией в RabbitMQ. Хранит последнюю
+известную цену каждой книги (при старте загружается из БД) и пропускает
+публикацию, если цена не изменилась. Неизменная цена все равно публикуется
+не реже одного раза за период heartbeat, отсчитываемый от запуска процесса.
+"""
+
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from config import PRICE_HEARTBEAT_SECONDS
+from database.database import get_books_prices
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.change_detector")
+
+OUT_OF_STOCK = "Нет в наличии"
+
+
+def to_stored_price(price: Optional[float]) -> str:
+    """
+    Приводит цену к виду, в котором ее сохраняет consumer в колонку books.price.
+    """
+    return OUT_OF_STOCK if price is None else str(float(price))
+
+
+class PriceChangeDetector:
+    """
+    Карта последних известных цен с проверкой, нужно ли публиковать новую цену.
+    """
+
+    def __init__(self, heartbeat: float = PRICE_HEARTBEAT_SECONDS):
+        """
+        Args:
+            heartbeat (float): Период принудительной публикации неизменной цены, сек.
+                0 - неизменные цены не публикуются никогда.
+        """
+        self.heartbeat = heartbeat
+        self._last_prices: Dict[str, str] = {}
+        self._published_at: Dict[str, float] = {}
+        self.published = 0
+        self.skipped = 0
+
+    async def warm_up(self) -> None:
+        """
+        Загружает последние сохраненные цены из БД.
+
+        Время последней публикации распределяется случайно внутри периода
+        heartbeat, чтобы принудительные обновления не приходили одной волной.
+        """
+        books_prices = await get_books_prices()
+        if books_prices is None:
+            logger.warning("Не удалось загрузить цены из БД, будут опубликованы все цены")
+            return
+
+        now = time.monotonic()
+        for book in books_prices:
+            vendor_code = str(book.book_id)
+            self._last_prices[vendor_code] = self._normalize(book.price)
+            self._published_at[vendor_code] = now - random.uniform(0, self.heartbeat)
+
+        logger.info("Загружены последние цены %d книг", len(self._last_prices))
+
+    def should_publish(self, vendor_code: str, price: Optional[float]) -> bool:
+        """
+        Проверяет, изменилась ли цена или истек период heartbeat.
+        """
+        vendor_code = str(vendor_code)
+        if self._last_prices.get(vendor_code) != to_stored_price(price):
+            return True
+
+        if self.heartbeat > 0:
+            published_at = self._published_at.get(vendor_code, 0.0)
+            if time.monotonic() - published_at >= self.heartbeat:
+                return True
+
+        self.skipped += 1
+        return False
+
+    def mark_published(self, vendor_code: str, price: Optional[float]) -> None:
+        """
+        Запоминает успешно опубликованную цену.
+        """
+        vendor_code = str(vendor_code)
+        self._last_prices[vendor_code] = to_stored_price(price)
+        self._published_at[vendor_code] = time.monotonic()
+        self.published += 1
+
+    def log_stats(self) -> None:
+        """
+        Записывает в лог количество опубликованных и пропущенных цен.
+        """
+        logger.info(
+            "Опубликовано изменений цен: %d, пропущено неизменных: %d",
+            self.published, self.skipped
+        )
+
+    @staticmethod
+    def _normalize(stored_price: str) -> str:
+        """
+        Приводит сохраненную в БД цену к каноническому виду ("1234" -> "1234.0").
+        """
+        try:
+            return str(float(stored_price))
+        except (TypeError, ValueError):
+            return stored_price
@@ -0,0 +1,230 @@
+"""
+Модуль parser.coordinator
+
+Координатор распределенной проверки цен. Делит каталог книг на задания
+(группы по PRICE_BATCH_SIZE книг) и публикует их в устойчивую очередь
+RabbitMQ, откуда их разбирают обработчики parser/worker.py на любых
+машинах.
+
+Очередь работает в режиме подтверждений: задание удаляется из очереди только
+после того, как обработчик проверил все книги группы. Если обработчик
+отключается, неподтвержденные задания возвращаются в очередь и достаются
+другим обработчикам, поэтому книги не пропускаются.
+
+Новый цикл не публикуется, пока предыдущий не завершен: в очереди остаются
+его задания или не от всех групп получены отметки о завершении (очередь
+PRICE_TASKS_DONE_QUEUE). Задания, которые обработчики взяли, но еще не
+подтвердили, не видны в счетчике сообщений очереди, поэтому координатор
+сохраняет состояние цикла (PRICE_CYCLE_STATE_PATH) и сверяет его с
+отметками. Так книги не проверяются дважды за один цикл.
+
+Запуск:
+    python parser/coordinator.py                 # один цикл
+    python parser/coordinator.py --interval 3600 # цикл каждый час
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Optional
+
+import aio_pika
+from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel
+
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_PATH)
+
+from config import (
+    DB_CONN,
+    PRICE_BATCH_SIZE,
+    PRICE_CYCLE_STATE_PATH,
+    PRICE_CYCLE_TIMEOUT,
+    PRICE_TASKS_DONE_QUEUE,
+    PRICE_TASKS_QUEUE,
+    RABBIT_LOGIN,
+    RABBIT_PASSWORD,
+)
+from database.database import close_pool, init_pool, iter_book_data
+from parser.get_price import logger
+from parser.wb_api import achunked
+
+
+def load_cycle_state() -> Optional[dict]:
+    """
+    Читает состояние последнего опубликованного цикла.
+
+    Returns:
+        Optional[dict]: run_id, количество групп, завершенные группы и время
+        публикации; None, если циклов еще не было или файл поврежден.
+    """
+    try:
+        with open(PRICE_CYCLE_STATE_PATH, encoding="utf-8") as file:
+            state = json.load(file)
+        state["done"] = set(state["done"])
+        return state
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error("Не удалось прочитать состояние цикла %s: %s", PRICE_CYCLE_STATE_PATH, e)
+        return None
+
+
+def save_cycle_state(state: dict) -> None:
+    """
+    Сохраняет состояние цикла (запись во временный файл и замена).
+    """
+    os.makedirs(os.path.dirname(PRICE_CYCLE_STATE_PATH), exist_ok=True)
+    tmp_path = f"{PRICE_CYCLE_STATE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump({**state, "done": sorted(state["done"])}, file)
+    os.replace(tmp_path, PRICE_CYCLE_STATE_PATH)
+
+
+async def collect_completed(channel: AbstractChannel, state: Optional[dict]) -> None:
+    """
+    Забирает отметки о завершенных группах и добавляет группы текущего
+    цикла в state["done"]. Отметки прошлых циклов отбрасываются.
+    """
+    done_queue = await channel.declare_queue(PRICE_TASKS_DONE_QUEUE, durable=True)
+    while True:
+        message = await done_queue.get(fail=False)
+        if message is None:
+            break
+        try:
+            marker = json.loads(message.body)
+        except json.JSONDecodeError:
+            marker = {}
+        if state is not None and marker.get("run_id") == state["run_id"]:
+            state["done"].add(marker.get("shard"))
+        await message.ack()
+
+    if state is not None:
+        save_cycle_state(state)
+
+
+async def publish_tasks() -> int:
+    """
+    Публикует задания на проверку всего каталога.
+
+    Returns:
+        int: Количество опубликованных заданий (0, если предыдущий цикл не завершен).
+    """
+    connection_url = f"amqp://{RABBIT_LOGIN}:{RABBIT_PASSWORD}@{DB_CONN[0]}/"
+    connection = await aio_pika.connect_robust(connection_url)
+
+    async with connection:
+        channel = await connection.channel()
+        queue = await channel.declare_queue(PRICE_TASKS_QUEUE, durable=True)
+
+        pending = queue.declaration_result.message_count
+        if pending:
+            logger.warning(
+                "В очереди '%s' осталось %d заданий предыдущего цикла, новый цикл пропущен",
+                PRICE_TASKS_QUEUE, pending
+            )
+            return 0
+
+        # Задания, взятые обработчиками, но не подтвержденные, счетчик очереди
+        # не показывает: завершение цикла определяется по отметкам групп
+        state = load_cycle_state()
+        await collect_completed(channel, state)
+        if state is not None and len(state["done"]) < state["shards"]:
+            running = time.time() - state["published_at"]
+            if not PRICE_CYCLE_TIMEOUT or running < PRICE_CYCLE_TIMEOUT:
+                logger.warning(
+                    "Цикл %s не завершен: обработано %d из %d групп, новый цикл пропущен",
+                    state["run_id"], len(state["done"]), state["shards"]
+                )
+                return 0
+            logger.error(
+                "Цикл %s не завершен за %.0f с (обработано %d из %d групп), публикуется новый",
+                state["run_id"], running, len(state["done"]), state["shards"]
+            )
+
+        run_id = uuid.uuid4().hex
+        shard = 0
+        books_count = 0
+
+        async for books_batch in achunked(iter_book_data(), PRICE_BATCH_SIZE):
+            body = json.dumps({
+                "run_id": run_id,
+                "shard": shard,
+                "books": [
+                    {"book_id": book["book_id"], "book_name": book["book_name"]}
+                    for book in books_batch
+                ],
+            })
+            await channel.default_exchange.publish(
+                Message(
+                    body=body.encode(),
+                    content_type="application/json",
+                    delivery_mode=DeliveryMode.PERSISTENT,
+                    message_id=f"{run_id}:{shard}",
+                ),
+                routing_key=queue.name,
+            )
+            shard += 1
+            books_count += len(books_batch)
+
+        save_cycle_state({
+            "run_id": run_id, "shards": shard, "done": set(), "published_at": time.time(),
+        })
+        logger.info(
+            "Цикл %s: опубликовано %d заданий на %d книг в очередь '%s'",
+            run_id, shard, books_count, PRICE_TASKS_QUEUE
+        )
+        return shard
+
+
+async def main(interval: float) -> None:
+    """
+    Открывает пул соединений с БД на время работы и запускает публикацию заданий.
+    """
+    await init_pool()
+    try:
+        await publish_periodically(interval)
+    finally:
+        await close_pool()
+
+
+async def publish_periodically(interval: float) -> None:
+    """
+    Публикует задания один раз или периодически с заданным интервалом.
+    """
+    while True:
+        start_time = time.monotonic()
+        try:
+            await publish_tasks()
+        except Exception as e:
+            logger.error("Ошибка публикации заданий: %s", e, exc_info=True)
+            if not interval:
+                raise
+
+        if not interval:
+            return
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - start_time)))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Координатор распределенной проверки цен")
+    arg_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Период публикации заданий, сек. (0 - один цикл)",
+    )
+    args = arg_parser.parse_args()
+
+    try:
+        asyncio.run(main(args.interval))
+    except KeyboardInterrupt:
+        logger.info("Завершение работы по запросу пользователя")
+    except Exception as e:
+        logger.critical("Критическая ошибка координатора: %s", e, exc_info=True)
+        sys.exit(1)
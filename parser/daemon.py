@@ -0,0 +1,255 @@
+"""
+Модуль parser.daemon
+
+Долгоживущий режим проверки цен. Для каждой книги хранится время следующей
+проверки (min-heap). Интервал книги подстраивается под частоту реальных
+изменений цены: при изменении он сокращается, при неизменной цене растет.
+Если суммарная частота проверок превышает бюджет, все интервалы
+пропорционально растягиваются.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import (
+    DAEMON_CATALOG_REFRESH,
+    DAEMON_CHECKS_PER_HOUR,
+    DAEMON_INITIAL_INTERVAL,
+    DAEMON_MAX_INTERVAL,
+    DAEMON_MIN_INTERVAL,
+    PRICE_BATCH_SIZE,
+)
+from database.database import iter_book_data
+from parser.wb_api import chunked
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.daemon")
+
+FetchPrices = Callable[[List[str]], Awaitable[Dict[str, Optional[float]]]]
+PublishPrice = Callable[[str, Optional[float]], Awaitable[None]]
+
+# Множители интервала при изменившейся и неизменной цене
+INTERVAL_DECREASE = 0.5
+INTERVAL_INCREASE = 1.5
+
+
+class PriceCheckDaemon:
+    """
+    Планировщик периодических проверок цен с приоритетом по времени следующей проверки.
+    """
+
+    def __init__(
+        self,
+        fetch_prices: FetchPrices,
+        publish_price: PublishPrice,
+        checks_per_hour: float = DAEMON_CHECKS_PER_HOUR,
+        initial_interval: float = DAEMON_INITIAL_INTERVAL,
+        min_interval: float = DAEMON_MIN_INTERVAL,
+        max_interval: float = DAEMON_MAX_INTERVAL,
+        catalog_refresh: float = DAEMON_CATALOG_REFRESH,
+        batch_size: int = PRICE_BATCH_SIZE,
+        parallel_batches: int = 4,
+    ):
+        """
+        Args:
+            fetch_prices (FetchPrices): Функция получения цен группы артикулов.
+            publish_price (PublishPrice): Функция публикации цены одного артикула.
+            checks_per_hour (float): Бюджет проверок товаров в час.
+            initial_interval (float): Интервал проверки новой книги, сек.
+            min_interval (float): Минимальный интервал проверки, сек.
+            max_interval (float): Максимальный интервал проверки, сек.
+            catalog_refresh (float): Период перечитывания каталога из БД, сек.
+            batch_size (int): Количество артикулов в одном запросе.
+            parallel_batches (int): Сколько групп артикулов обрабатывать одновременно.
+        """
+        self._fetch_prices = fetch_prices
+        self._publish_price = publish_price
+        self.checks_per_hour = checks_per_hour
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.catalog_refresh = catalog_refresh
+        self.batch_size = batch_size
+        self.parallel_batches = parallel_batches
+
+        # Куча (время следующей проверки, артикул). Устаревшие записи
+        # отбрасываются при извлечении по несовпадению с _due_at.
+        self._heap: List[Tuple[float, str]] = []
+        self._due_at: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._last_prices: Dict[str, Optional[float]] = {}
+        # Сумма 1/interval по каталогу - требуемая частота проверок, проверок/с
+        self._demand = 0.0
+
+        self._stop_event = asyncio.Event()
+        self.checks_done = 0
+
+    def stop(self) -> None:
+        """
+        Запрашивает остановку демона после завершения текущей итерации.
+        """
+        self._stop_event.set()
+
+    @property
+    def budget_scale(self) -> float:
+        """
+        Во сколько раз нужно растянуть интервалы, чтобы уложиться в бюджет.
+        """
+        budget_per_second = self.checks_per_hour / 3600
+        if budget_per_second <= 0 or self._demand <= budget_per_second:
+            return 1.0
+        return self._demand / budget_per_second
+
+    def add_book(self, vendor_code: str, now: Optional[float] = None) -> None:
+        """
+        Добавляет книгу в расписание. Новая книга проверяется сразу.
+        """
+        if vendor_code in self._intervals:
+            return
+        self._set_interval(vendor_code, self.initial_interval)
+        self._schedule(vendor_code, now if now is not None else time.monotonic())
+
+    def remove_book(self, vendor_code: str) -> None:
+        """
+        Удаляет книгу из расписания.
+        """
+        interval = self._intervals.pop(vendor_code, None)
+        if interval is not None:
+            self._demand -= 1 / interval
+        self._due_at.pop(vendor_code, None)
+        self._last_prices.pop(vendor_code, None)
+
+    async def refresh_catalog(self) -> None:
+        """
+        Синхронизирует расписание со списком книг в БД.
+        """
+        try:
+            vendor_codes = {
+                str(book_data["book_id"]) async for book_data in iter_book_data()
+            }
+        except Exception as e:
+            logger.error("Ошибка чтения каталога: %s", e, exc_info=True)
+            vendor_codes = set()
+
+        if not vendor_codes:
+            logger.warning("Не удалось обновить каталог, используется прежний список книг")
+            return
+
+        for vendor_code in set(self._intervals) - vendor_codes:
+            self.remove_book(vendor_code)
+        now = time.monotonic()
+        for vendor_code in vendor_codes:
+            self.add_book(vendor_code, now)
+
+        logger.info(
+            "Каталог демона обновлен: %d книг, требуемая частота %.0f проверок/ч, "
+            "коэффициент бюджета %.2f",
+            len(self._intervals), self._demand * 3600, self.budget_scale
+        )
+
+    async def run(self) -> None:
+        """
+        Основной цикл демона: работает до вызова stop().
+        """
+        logger.info("Демон проверки цен запущен")
+        next_refresh = 0.0
+
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if now >= next_refresh:
+                await self.refresh_catalog()
+                next_refresh = now + self.catalog_refresh
+
+            due = self._pop_due(now, self.batch_size * self.parallel_batches)
+            if not due:
+                wake_at = min(self._heap[0][0] if self._heap else next_refresh, next_refresh)
+                await self._sleep(wake_at - now)
+                continue
+
+            await asyncio.gather(*(
+                self._check_batch(list(batch))
+                for batch in chunked(due, self.batch_size)
+            ))
+
+        logger.info("Демон проверки цен остановлен, выполнено проверок: %d", self.checks_done)
+
+    async def _check_batch(self, vendor_codes: List[str]) -> None:
+        """
+        Проверяет группу артикулов и планирует их следующие проверки.
+        """
+        try:
+            prices = await self._fetch_prices(vendor_codes)
+        except Exception as e:
+            logger.error("Ошибка проверки группы %s: %s", vendor_codes, e, exc_info=True)
+            prices = {}
+
+        now = time.monotonic()
+        for vendor_code in vendor_codes:
+            if vendor_code not in self._intervals:
+                # Книга удалена из каталога во время проверки
+                continue
+
+            if vendor_code in prices:
+                price = prices[vendor_code]
+                await self._publish_price(vendor_code, price)
+                self._adapt_interval(vendor_code, price)
+                self.checks_done += 1
+                delay = self._intervals[vendor_code] * self.budget_scale
+            else:
+                # Проверка не удалась: повтор не раньше минимального интервала
+                delay = self.min_interval
+
+            self._schedule(vendor_code, now + delay)
+
+    def _adapt_interval(self, vendor_code: str, price: Optional[float]) -> None:
+        """
+        Сокращает интервал книги при изменении цены и увеличивает при неизменной.
+        """
+        known = vendor_code in self._last_prices
+        previous = self._last_prices.get(vendor_code)
+        self._last_prices[vendor_code] = price
+        if not known:
+            return
+
+        interval = self._intervals[vendor_code]
+        if price != previous:
+            interval *= INTERVAL_DECREASE
+            logger.info(
+                "Цена артикула %s изменилась (%s -> %s), интервал %.0f с",
+                vendor_code, previous, price, max(interval, self.min_interval)
+            )
+        else:
+            interval *= INTERVAL_INCREASE
+        self._set_interval(vendor_code, interval)
+
+    def _set_interval(self, vendor_code: str, interval: float) -> None:
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        previous = self._intervals.get(vendor_code)
+        if previous is not None:
+            self._demand -= 1 / previous
+        self._intervals[vendor_code] = interval
+        self._demand += 1 / interval
+
+    def _schedule(self, vendor_code: str, due_at: float) -> None:
+        self._due_at[vendor_code] = due_at
+        heapq.heappush(self._heap, (due_at, vendor_code))
+
+    def _pop_due(self, now: float, limit: int) -> Sequence[str]:
+        due: List[str] = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            due_at, vendor_code = heapq.heappop(self._heap)
+            if self._due_at.get(vendor_code) == due_at:
+                due.append(vendor_code)
+        return due
+
+    async def _sleep(self, seconds: float) -> None:
+        """
+        Ожидает seconds секунд или сигнала остановки.
+        """
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,289 @@
+"""
+Модуль parser.driver_pool
+
+Пул "прогретых" драйверов Chrome для Selenium-варианта получения цен.
+
+Драйверы переиспользуются между вызовами из пула потоков, количество
+одновременно запущенных браузеров ограничено размером пула. Драйвер
+пересоздается, если он перестал отвечать, загрузил заданное число страниц
+или занял больше памяти, чем разрешено.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from config import SELENIUM_MAX_MEMORY_MB, SELENIUM_MAX_PAGES_PER_DRIVER, SELENIUM_POOL_SIZE
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.driver_pool")
+
+
+def create_driver() -> webdriver.Chrome:
+    """
+    Создает и настраивает экземпляр веб-драйвера Chrome для Selenium.
+    """
+    try:
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+
+        driver = webdriver.Chrome(options=chrome_options)
+        logger.debug("Создан новый Chrome driver")
+        return driver
+
+    except Exception as e:
+        logger.critical("Ошибка создания Chrome driver: %s", e, exc_info=True)
+        raise
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    """
+    Возвращает суммарный объем резидентной памяти процесса и всех его потомков, МБ.
+
+    Читает /proc, поэтому работает только в Linux; в остальных системах возвращает 0.
+    """
+    if not os.path.isdir("/proc"):
+        return 0.0
+
+    children: Dict[int, list] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status", encoding="utf-8") as status_file:
+                status = dict(
+                    line.split(":", 1) for line in status_file if ":" in line
+                )
+        except OSError:
+            continue
+        child_pid = int(entry)
+        children.setdefault(int(status.get("PPid", "0").strip()), []).append(child_pid)
+        rss_kb[child_pid] = int(status.get("VmRSS", "0 kB").split()[0])
+
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total_kb += rss_kb.get(current, 0)
+        stack.extend(children.get(current, []))
+
+    return total_kb / 1024
+
+
+class DriverPool:
+    """
+    Ограниченный пул драйверов Selenium, безопасный для использования из потоков.
+
+    Пример:
+
+        with pool.driver() as driver:
+            driver.get(url)
+    """
+
+    def __init__(
+        self,
+        size: int = SELENIUM_POOL_SIZE,
+        max_pages: int = SELENIUM_MAX_PAGES_PER_DRIVER,
+        max_memory_mb: int = SELENIUM_MAX_MEMORY_MB,
+        driver_factory: Callable[[], webdriver.Chrome] = create_driver,
+    ):
+        """
+        Args:
+            size (int): Максимальное число одновременно запущенных драйверов.
+            max_pages (int): Число страниц, после которого драйвер пересоздается.
+            max_memory_mb (int): Лимит памяти драйвера, МБ (0 - без ограничения).
+            driver_factory (Callable): Функция создания нового драйвера.
+        """
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._driver_factory = driver_factory
+
+        # LIFO: в первую очередь выдается самый "теплый" драйвер
+        self._idle: "queue.LifoQueue[webdriver.Chrome]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._pages: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Отдельный пул потоков: потоков ровно столько, сколько браузеров
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="selenium"
+        )
+
+    def warm_up(self, count: Optional[int] = None) -> None:
+        """
+        Заранее запускает драйверы, чтобы первые запросы не ждали старта Chrome.
+
+        Args:
+            count (Optional[int]): Количество драйверов (по умолчанию - размер пула).
+        """
+        count = min(self.size, count or self.size)
+        while self._idle.qsize() < count:
+            self._idle.put(self._new_driver())
+        logger.info("Пул Selenium прогрет: %d драйверов", self._idle.qsize())
+
+    def acquire(self) -> webdriver.Chrome:
+        """
+        Выдает рабочий драйвер из пула, при необходимости создавая новый.
+
+        Блокирует поток, пока все драйверы заняты.
+        """
+        if self._closed:
+            raise RuntimeError("Пул драйверов Selenium закрыт")
+
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_driver()
+
+                if self._is_healthy(driver):
+                    return driver
+
+                logger.warning("Драйвер Selenium не отвечает, пересоздание")
+                self._destroy(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver: webdriver.Chrome, broken: bool = False) -> None:
+        """
+        Возвращает драйвер в пул или закрывает его, если он подлежит пересозданию.
+
+        Args:
+            driver (webdriver.Chrome): Драйвер, полученный через acquire().
+            broken (bool): Драйвер завершился с ошибкой и не должен переиспользоваться.
+        """
+        try:
+            with self._lock:
+                pages = self._pages.get(id(driver), 0) + 1
+                self._pages[id(driver)] = pages
+
+            if self._closed or broken:
+                self._destroy(driver)
+            elif pages >= self.max_pages:
+                logger.info("Драйвер Selenium загрузил %d страниц, пересоздание", pages)
+                self._destroy(driver)
+            elif self._memory_exceeded(driver):
+                self._destroy(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        """
+        Контекстный менеджер: выдает драйвер и возвращает его в пул после использования.
+        """
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = not self._is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self) -> None:
+        """
+        Закрывает все свободные драйверы и пул потоков.
+
+        Драйверы, занятые в момент вызова, закрываются при возврате в пул.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self.executor.shutdown(wait=True)
+        while True:
+            try:
+                self._destroy(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        logger.info("Пул драйверов Selenium закрыт")
+
+    def _new_driver(self) -> webdriver.Chrome:
+        driver = self._driver_factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _destroy(self, driver: webdriver.Chrome) -> None:
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning("Ошибка при закрытии драйвера Selenium: %s", e)
+
+    @staticmethod
+    def _is_healthy(driver: webdriver.Chrome) -> bool:
+        try:
+            process = driver.service.process
+            if process is not None and process.poll() is not None:
+                return False
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _memory_exceeded(self, driver: webdriver.Chrome) -> bool:
+        if not self.max_memory_mb:
+            return False
+        try:
+            memory_mb = process_tree_rss_mb(driver.service.process.pid)
+        except Exception:
+            return False
+        if memory_mb > self.max_memory_mb:
+            logger.info(
+                "Драйвер Selenium занимает %.0f МБ (лимит %d МБ), пересоздание",
+                memory_mb, self.max_memory_mb
+            )
+            return True
+        return False
+
+
+_driver_pool: Optional[DriverPool] = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """
+    Возвращает общий для процесса пул драйверов, создавая его при первом вызове.
+
+    Пул автоматически закрывается при завершении процесса.
+    """
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+            atexit.register(close_driver_pool)
+        return _driver_pool
+
+
+def close_driver_pool() -> None:
+    """
+    Закрывает общий пул драйверов, если он был создан.
+    """
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is not None:
+            _driver_pool.close()
+            _driver_pool = None
@@ -0,0 +1,338 @@
+"""
+Модуль parser.fetch_policy
+
+Политика выполнения запросов к API карточек WB:
+
+- повторы при сетевых ошибках с экспоненциальной паузой и случайным
+  разбросом (full jitter);
+- circuit breaker на каждый адрес: после серии ошибок запросы к нему
+  временно не выполняются, затем пропускается один пробный запрос;
+- дублирующие (hedged) запросы: если ответ не пришел за p95 времени
+  ответа, отправляется второй такой же запрос и берется первый успешный.
+
+Время ответа учитывается только для сетевой части запроса: запрос
+оборачивает обращение к сети в FetchPolicy.measure. Ожидание в очереди
+планировщика и паузы после троттлинга не входят ни в статистику, ни в
+ожидание перед дублирующим запросом, поэтому дубли не отправляются,
+когда хост и так ограничивает частоту запросов.
+
+Ответы 429/5xx (ThrottledError) повторяет планировщик parser.scheduler,
+здесь они только учитываются circuit breaker'ом.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+import aiohttp
+
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    FETCH_BACKOFF_BASE,
+    FETCH_BACKOFF_MAX,
+    FETCH_HEDGE_ENABLED,
+    FETCH_MAX_ATTEMPTS,
+)
+from parser.scheduler import ThrottledError
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.fetch_policy")
+
+T = TypeVar("T")
+
+# Ошибки, после которых запрос имеет смысл повторить
+RETRYABLE_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class RequestTiming:
+    """
+    Начало сетевой части запроса, который может быть продублирован.
+    """
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.started = asyncio.Event()
+
+    def begin(self, now: float) -> None:
+        self.started_at = now
+        self.started.set()
+
+    def end(self) -> None:
+        self.started_at = None
+        self.started.clear()
+
+
+# Отметка сетевой части для запроса, выполняемого в текущей задаче
+_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+class CircuitOpenError(Exception):
+    """
+    Circuit breaker разомкнут: запросы к адресу временно не выполняются.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker с состояниями "замкнут", "разомкнут" и "полуоткрыт".
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """
+        Проверяет, можно ли выполнить запрос.
+
+        Returns:
+            bool: True, если запрос пробный (breaker полуоткрыт).
+
+        Raises:
+            CircuitOpenError: Если breaker разомкнут или пробный запрос уже выполняется.
+        """
+        if self._opened_at is None:
+            return False
+
+        if time.monotonic() - self._opened_at < self.reset_timeout or self._probe_in_flight:
+            raise CircuitOpenError(f"Circuit breaker '{self.name}' разомкнут")
+
+        # Полуоткрытое состояние: пропускается один пробный запрос
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """
+        Снимает отметку пробного запроса, завершившегося без результата
+        (отмена или неучитываемая ошибка): следующий запрос снова станет пробным.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Circuit breaker '%s' замкнут", self.name)
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probe_in_flight or (
+            self._opened_at is None and self._failures >= self.failure_threshold
+        ):
+            logger.warning(
+                "Circuit breaker '%s' разомкнут после %d ошибок подряд на %.0f с",
+                self.name, self._failures, self.reset_timeout
+            )
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Скользящее окно времени ответа для оценки перцентилей.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Возвращает q-перцентиль (0..1) или None, пока данных недостаточно.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FetchPolicy:
+    """
+    Выполняет запросы с повторами, circuit breaker'ом и дублирующими запросами.
+
+    Пример:
+
+        policy = FetchPolicy()
+        data = await policy.call("card.wb.ru", lambda: get_json(url))
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = FETCH_MAX_ATTEMPTS,
+        backoff_base: float = FETCH_BACKOFF_BASE,
+        backoff_max: float = FETCH_BACKOFF_MAX,
+        hedge: bool = FETCH_HEDGE_ENABLED,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.hedged_requests = 0
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(
+                endpoint, self._failure_threshold, self._reset_timeout
+            )
+        return self._breakers[endpoint]
+
+    def latency(self, endpoint: str) -> LatencyTracker:
+        if endpoint not in self._latency:
+            self._latency[endpoint] = LatencyTracker()
+        return self._latency[endpoint]
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Пауза перед повтором: случайная величина от 0 до base * 2^attempt (full jitter).
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, endpoint: str, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет запрос по политике.
+
+        Args:
+            endpoint (str): Адрес, для которого ведутся circuit breaker и статистика.
+            request (Callable[[], Awaitable[T]]): Фабрика корутины запроса.
+
+        Returns:
+            T: Результат первого успешного запроса.
+
+        Raises:
+            CircuitOpenError: Если breaker разомкнут.
+            Exception: Ошибка последней попытки.
+        """
+        breaker = self.breaker(endpoint)
+
+        for attempt in range(self.max_attempts):
+            is_probe = breaker.before_call()
+            try:
+                if self.hedge:
+                    result = await self._hedged(endpoint, request)
+                else:
+                    result = await request()
+            except RETRYABLE_ERRORS as e:
+                breaker.record_failure()
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    "Ошибка запроса к %s: %r, повтор через %.2f с (попытка %d/%d)",
+                    endpoint, e, delay, attempt + 1, self.max_attempts
+                )
+                await asyncio.sleep(delay)
+            except ThrottledError:
+                breaker.record_failure()
+                raise
+            else:
+                breaker.record_success()
+                return result
+            finally:
+                # Пробный запрос, отмененный или завершившийся неучитываемой
+                # ошибкой, не должен оставить breaker разомкнутым навсегда
+                if is_probe:
+                    breaker.release_probe()
+
+        raise RuntimeError("Недостижимое состояние политики запросов")
+
+    @contextmanager
+    def measure(self, endpoint: str) -> Iterator[None]:
+        """
+        Отмечает сетевую часть запроса: ее длительность попадает в статистику
+        времени ответа, а ожидание дублирующего запроса отсчитывается от ее начала.
+
+        Пример:
+
+            async def get_body(url):
+                with policy.measure(host):
+                    async with session.get(url) as response:
+                        return await response.read()
+        """
+        timing = _request_timing.get()
+        start = time.monotonic()
+        if timing is not None:
+            timing.begin(start)
+        try:
+            yield
+        finally:
+            if timing is not None:
+                timing.end()
+        self.latency(endpoint).add(time.monotonic() - start)
+
+    async def _hedged(self, endpoint: str, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Отправляет запрос и, если его сетевая часть не завершилась за p95,
+        дублирующий. Возвращает первый успешный результат, остальные запросы
+        отменяет (в том числе при отмене вызывающей задачи).
+        """
+        hedge_delay = self.latency(endpoint).percentile(0.95)
+        timing = RequestTiming()
+        token = _request_timing.set(timing)
+        try:
+            first = asyncio.ensure_future(request())
+        finally:
+            _request_timing.reset(token)
+
+        pending = {first}
+        try:
+            if hedge_delay is None:
+                return await first
+
+            # Ожидание в очереди планировщика и паузы после троттлинга не считаются
+            while not first.done():
+                if timing.started_at is None:
+                    waiter = asyncio.ensure_future(timing.started.wait())
+                    try:
+                        await asyncio.wait({first, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        waiter.cancel()
+                    continue
+                remaining = timing.started_at + hedge_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.wait({first}, timeout=remaining)
+
+            if first.done():
+                return first.result()
+
+            self.hedged_requests += 1
+            logger.debug("Запрос к %s дольше p95 (%.3f с), отправлен дублирующий", endpoint, hedge_delay)
+            pending.add(asyncio.ensure_future(request()))
+            last_error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -1,23 +1,40 @@
+import argparse
 import asyncio
 import json
 import logging
 import os
+import signal
 import sys
 import time
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 
 
 PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_PATH)
 
 
-from config import CURRENCY, DEST, PRICE_CHECKER_LOG_FILE_PATH
-from database.database import get_book_data
-from rabbitmq import send_message
+from analytics import PriceSanityGuard
+from config import (
+    PRICE_BATCH_SIZE,
+    PRICE_CHECKER_LOG_FILE_PATH,
+    PRICE_FETCH_BACKEND,
+    PRICE_SOURCE_ID,
+    SCHEDULER_MAX_CONCURRENCY,
+    SELENIUM_PAGE_TIMEOUT,
+    SELENIUM_POOL_SIZE,
+)
+from database.database import close_pool, init_pool, iter_book_data
+from parser.change_detector import PriceChangeDetector
+from parser.daemon import PriceCheckDaemon
+from parser.driver_pool import close_driver_pool, get_driver_pool
+from parser.http_fetcher import HttpPriceFetcher
+from parser.scheduler import PriceCheckScheduler
+from parser.wb_api import achunked, build_detail_url, split_products
+from rabbitmq import PriceUpdate, close_publisher, get_publisher, send_updates
 
 
 def setup_price_checker_logging() -> logging.Logger:
@@ -66,138 +83,254 @@ def setup_price_checker_logging() -> logging.Logger:
 logger = setup_price_checker_logging()
 
 
-def get_price_with_selenium(vendor_code: str) -> Optional[float]:
+def get_prices_with_selenium(vendor_codes: List[str]) -> Dict[str, Optional[float]]:
     """
-    Синхронная функция для получения цены через Selenium.
+    Синхронная функция для получения цен через Selenium.
+
+    Все артикулы запрашиваются одной страницей (параметр nm через ";").
     
     Args:
-        vendor_code (str): Артикул книги.
+        vendor_codes (List[str]): Артикулы книг.
         
     Returns:
-        Optional[float]: Цена товара или None в случае ошибки.
+        Dict[str, Optional[float]]: Цена по строковому артикулу
+        (None - нет в наличии). При ошибке возвращается пустой словарь.
     """
-    driver = create_driver()
+    pool = get_driver_pool()
     
     try:
-        logger.debug("Запуск Selenium для артикула: %s", vendor_code)
-        
-        url = (
-            f"https://card.wb.ru/cards/v4/detail?appType=1&curr={CURRENCY}"
-            f"&dest={DEST}&spp=30&ab_testing=false&lang=ru&nm={vendor_code}"
-        )
-        
-        logger.debug("Открытие URL: %s", url)
-        driver.get(url)
-        time.sleep(5)  # Ожидание загрузки страницы
-        
-        # Получение данных из элемента pre
-        data_element = driver.find_element(By.TAG_NAME, "pre")
-        json_data = json.loads(data_element.text)
-        
-        # Извлечение цены
-        product_info = json_data["products"][0]
-        price_info = product_info["sizes"][0]["price"]
+        with pool.driver() as driver:
+            logger.debug("Запуск Selenium для артикулов: %s", vendor_codes)
+            
+            url = build_detail_url(vendor_codes)
+            
+            logger.debug("Открытие URL: %s", url)
+            driver.get(url)
+            
+            # Ожидание загрузки страницы и получение данных из элемента pre
+            data_element = WebDriverWait(driver, SELENIUM_PAGE_TIMEOUT).until(
+                expected_conditions.presence_of_element_located((By.TAG_NAME, "pre"))
+            )
+            json_data = json.loads(data_element.text)
         
-        # Вычисление итоговой цены
-        price = (price_info["product"] + price_info["logistics"]) / 100
-        logger.info("Получена цена для артикула %s: %s", vendor_code, price)
+        # Извлечение итоговых цен
+        prices = split_products(json_data, vendor_codes)
+        logger.info("Получены цены через Selenium: %s", prices)
         
-        return price
+        return prices
         
     except Exception as e:
         logger.error(
-            "Ошибка при получении цены для артикула %s: %s",
-            vendor_code, e,
+            "Ошибка при получении цен для артикулов %s: %s",
+            vendor_codes, e,
             exc_info=True
         )
-        return None
-        
-    finally:
-        driver.close()
-        driver.quit()
-        logger.debug("Драйвер Selenium закрыт для артикула %s", vendor_code)
+        return {}
 
 
-def create_driver() -> webdriver.Chrome:
+async def fetch_prices(
+    vendor_codes: List[str],
+    fetcher: Optional[HttpPriceFetcher] = None,
+) -> Dict[str, Optional[float]]:
     """
-    Создает и настраивает экземпляр веб-драйвера Chrome для Selenium.
+    Получает цены товаров выбранным в конфигурации способом (PRICE_FETCH_BACKEND).
+
+    Args:
+        vendor_codes (List[str]): Артикулы книг.
+        fetcher (Optional[HttpPriceFetcher]): HTTP-клиент для бэкенда "aiohttp".
+
+    Returns:
+        Dict[str, Optional[float]]: Цена по строковому артикулу.
     """
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        logger.debug("Создан новый Chrome driver")
-        return driver
-        
-    except Exception as e:
-        logger.critical("Ошибка создания Chrome driver: %s", e, exc_info=True)
-        raise
+    if PRICE_FETCH_BACKEND == "selenium" or fetcher is None:
+        # Запуск Selenium в потоке пула драйверов: потоков столько же, сколько браузеров
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_driver_pool().executor, get_prices_with_selenium, vendor_codes
+        )
+
+    return await fetcher.fetch_prices(vendor_codes)
 
 
-async def process_single_book(book_data: dict) -> None:
+async def publish_prices(
+    prices: Dict[str, Optional[float]],
+    detector: Optional[PriceChangeDetector] = None,
+    price_guard: Optional[PriceSanityGuard] = None,
+) -> None:
     """
-    Асинхронно обрабатывает один товар: получает цену и отправляет в RabbitMQ.
+    Отправляет цены товаров в RabbitMQ одним пакетом.
+
+    Если передан detector, неизменившиеся цены не публикуются.
+    Если передан price_guard, неправдоподобные цены (скачок относительно
+    медианы истории) задерживаются в карантине до подтверждения.
     """
-    vendor_code = book_data["book_id"]
-    book_name = book_data.get("book_name", "Unknown")
-    
-    try:
-        logger.info("Обработка книги: %s (%s)", book_name, vendor_code)
-        
-        # Запуск Selenium в отдельном потоке
-        loop = asyncio.get_event_loop()
-        price = await loop.run_in_executor(
-            None, get_price_with_selenium, vendor_code
-        )
-        
-        # Формирование данных для отправки
-        price_display = "Нет в наличии" if price is None else price
-        data = {
-            "book_id": vendor_code,
-            "price": price_display
+    if price_guard is not None:
+        prices = await price_guard.check(prices)
+
+    if detector is not None:
+        changed = {
+            code: price for code, price in prices.items()
+            if detector.should_publish(code, price)
         }
-        
-        # Асинхронная отправка сообщение в RabbitMQ
-        await send_message(data)
-        logger.info("Сообщение отправлено в RabbitMQ для артикула %s", vendor_code)
+        if len(changed) < len(prices):
+            logger.debug(
+                "Цены артикулов не изменились, публикация пропущена: %s",
+                [code for code in prices if code not in changed]
+            )
+        prices = changed
+
+    if not prices:
+        return
+
+    try:
+        updates = [
+            PriceUpdate.from_price(vendor_code, price, source_id=PRICE_SOURCE_ID)
+            for vendor_code, price in prices.items()
+        ]
+
+        # Асинхронная отправка сообщения в RabbitMQ
+        await send_updates(updates)
+        logger.info("Сообщение отправлено в RabbitMQ для артикулов %s", list(prices))
+
+        if detector is not None:
+            for vendor_code, price in prices.items():
+                detector.mark_published(vendor_code, price)
         
     except Exception as e:
         logger.error(
-            "Ошибка при обработке артикула %s: %s",
-            vendor_code, e,
+            "Ошибка при обработке артикулов %s: %s",
+            list(prices), e,
             exc_info=True
         )
 
 
+async def publish_price(
+    vendor_code: str,
+    price: Optional[float],
+    detector: Optional[PriceChangeDetector] = None,
+    price_guard: Optional[PriceSanityGuard] = None,
+) -> None:
+    """
+    Отправляет цену одного товара в RabbitMQ.
+
+    Если передан detector, неизменившаяся цена не публикуется.
+    """
+    await publish_prices({str(vendor_code): price}, detector, price_guard)
+
+
+async def process_books_batch(
+    books_batch: Sequence[dict],
+    fetcher: Optional[HttpPriceFetcher] = None,
+    detector: Optional[PriceChangeDetector] = None,
+    price_guard: Optional[PriceSanityGuard] = None,
+) -> List[str]:
+    """
+    Асинхронно обрабатывает группу товаров: получает цены одним запросом
+    и отправляет изменившиеся в RabbitMQ.
+
+    Returns:
+        List[str]: Артикулы, цену которых получить не удалось.
+    """
+    vendor_codes = [str(book_data["book_id"]) for book_data in books_batch]
+    logger.info("Обработка группы из %d книг: %s", len(vendor_codes), vendor_codes)
+
+    prices = await fetch_prices(vendor_codes, fetcher)
+
+    # Книги, цену которых получить не удалось, не публикуются: в БД остается прежняя цена
+    failed = [code for code in vendor_codes if code not in prices]
+    if failed:
+        logger.warning("Не удалось получить цены, публикация пропущена: %s", failed)
+
+    await publish_prices(prices, detector, price_guard)
+    return failed
+
+
+async def batch_worker(
+    batches: "asyncio.Queue[Optional[List[dict]]]",
+    fetcher: Optional[HttpPriceFetcher] = None,
+    detector: Optional[PriceChangeDetector] = None,
+    price_guard: Optional[PriceSanityGuard] = None,
+) -> None:
+    """
+    Обработчик очереди групп книг. Завершается, получив None.
+    """
+    while True:
+        books_batch = await batches.get()
+        if books_batch is None:
+            return
+
+        try:
+            await process_books_batch(books_batch, fetcher, detector, price_guard)
+        except Exception as e:
+            logger.error("Ошибка при обработке группы книг: %s", e, exc_info=True)
+
+
 async def get_books_id() -> None:
     """
-    Основная асинхронная функция: получает данные из БД и обрабатывает книги.
+    Основная асинхронная функция: читает книги из БД и обрабатывает их.
+
+    Книги читаются курсором порциями и передаются обработчикам через
+    ограниченную очередь: пока обработчики заняты, чтение из БД
+    приостанавливается, поэтому расход памяти не зависит от размера каталога.
     """
     try:
         logger.info("Запуск процесса проверки цен")
         start_time = time.time()
+        logger.info("Способ получения цен: %s", PRICE_FETCH_BACKEND)
+
+        if PRICE_FETCH_BACKEND == "selenium":
+            # Запуск браузеров до начала обработки
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, get_driver_pool().warm_up)
+            workers_count = SELENIUM_POOL_SIZE
+        else:
+            workers_count = SCHEDULER_MAX_CONCURRENCY
         
-        # Асинхронное получение данных из БД
-        books_data = await get_book_data()
+        # Последние известные цены: публикуются только изменения
+        detector = PriceChangeDetector()
+        await detector.warm_up()
         
-        if not books_data:
-            logger.warning("Не удалось получить данные из базы данных")
-            return
+        # Статистика истории цен для отбраковки неправдоподобных цен
+        price_guard = PriceSanityGuard()
+        await price_guard.load()
         
-        logger.info("Найдено %d книг для обработки", len(books_data))
+        # Планировщик ограничивает параллельность и частоту запросов к API
+        scheduler = PriceCheckScheduler()
         
-        # Создание задачи для параллельной обработки
-        tasks = [
-            process_single_book(book_data) 
-            for book_data in books_data
-        ]
+        batches: "asyncio.Queue[Optional[List[dict]]]" = asyncio.Queue(maxsize=workers_count * 2)
+        books_count = 0
+        
+        # Одно соединение с RabbitMQ на весь запуск
+        await get_publisher()
+        
+        async with HttpPriceFetcher(scheduler=scheduler) as fetcher:
+            workers = [
+                asyncio.create_task(batch_worker(batches, fetcher, detector, price_guard))
+                for _ in range(workers_count)
+            ]
+            try:
+                # Асинхронное чтение книг из БД порциями
+                async for books_batch in achunked(iter_book_data(), PRICE_BATCH_SIZE):
+                    books_count += len(books_batch)
+                    await batches.put(books_batch)
+                
+                for _ in workers:
+                    await batches.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await close_publisher()
+        
+        if not books_count:
+            logger.warning("Не удалось получить данные из базы данных")
+            return
         
-        await asyncio.gather(*tasks)
+        logger.info("Обработано %d книг", books_count)
+        if PRICE_FETCH_BACKEND != "selenium":
+            scheduler.log_stats()
+            fetcher.cache.log_stats()
+        detector.log_stats()
         
         end_time = time.time()
         logger.info(
@@ -214,12 +347,69 @@ async def get_books_id() -> None:
         raise
 
 
+async def run_daemon() -> None:
+    """
+    Запускает проверку цен в режиме демона: процесс работает постоянно и
+    проверяет каждую книгу по собственному адаптивному расписанию.
+    """
+    detector = PriceChangeDetector()
+    await detector.warm_up()
+    # Статистика перезагружается в фоне, пока демон работает
+    price_guard = PriceSanityGuard()
+    await price_guard.load()
+    scheduler = PriceCheckScheduler()
+    
+    # Одно соединение с RabbitMQ на все время работы демона
+    await get_publisher()
+    
+    async with HttpPriceFetcher(scheduler=scheduler) as fetcher:
+        daemon = PriceCheckDaemon(
+            fetch_prices=lambda vendor_codes: fetch_prices(vendor_codes, fetcher),
+            publish_price=lambda vendor_code, price: publish_price(
+                vendor_code, price, detector, price_guard
+            ),
+        )
+        
+        # Корректная остановка по SIGTERM/SIGINT
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, daemon.stop)
+        
+        try:
+            await daemon.run()
+        finally:
+            await close_publisher()
+    
+    if PRICE_FETCH_BACKEND != "selenium":
+        scheduler.log_stats()
+    detector.log_stats()
+
+
+async def main(daemon: bool = False) -> None:
+    """
+    Открывает пул соединений с БД на время работы и запускает проверку цен.
+    """
+    await init_pool()
+    try:
+        await (run_daemon() if daemon else get_books_id())
+    finally:
+        await close_pool()
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Проверка цен книг на WildBerries")
+    arg_parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Работать постоянно, проверяя книги по адаптивному расписанию",
+    )
+    args = arg_parser.parse_args()
+    
     try:
         start_time = time.time()
         logger.info("Запуск скрипта проверки цен. Время начала: %s", time.time())
         
-        asyncio.run(get_books_id())
+        asyncio.run(main(args.daemon))
         
         end_time = time.time()
         logger.info(
@@ -236,4 +426,8 @@ if __name__ == "__main__":
             e,
             exc_info=True
         )
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+    finally:
+        # Закрытие браузеров Selenium, если они запускались
+        close_driver_pool()
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Модуль parser.http_fetcher
+
+Асинхронное получение цен напрямую из API карточек WildBerries через aiohttp,
+без запуска браузера. Одна HTTP-сессия с пулом соединений переиспользуется
+на протяжении всего запуска проверки цен.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import HTTP_CONNECTION_LIMIT, HTTP_FETCH_TIMEOUT, PRICE_BATCH_SIZE, WB_CARD_URL
+from parser.fetch_policy import CircuitOpenError, FetchPolicy
+from parser.response_cache import CacheMissError, ResponseCache, cache_key
+from parser.scheduler import PriceCheckScheduler, ThrottledError
+from parser.wb_api import build_detail_url, chunked, split_products
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.http_fetcher")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
+)
+
+
+class HttpPriceFetcher:
+    """
+    Клиент API карточек товаров на базе aiohttp.
+
+    Используется как асинхронный контекстный менеджер:
+
+        async with HttpPriceFetcher() as fetcher:
+            prices = await fetcher.fetch_prices(["6034394", "6411515"])
+    """
+
+    def __init__(
+        self,
+        base_url: str = WB_CARD_URL,
+        timeout: float = HTTP_FETCH_TIMEOUT,
+        connection_limit: int = HTTP_CONNECTION_LIMIT,
+        batch_size: int = PRICE_BATCH_SIZE,
+        scheduler: Optional[PriceCheckScheduler] = None,
+        policy: Optional[FetchPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Args:
+            base_url (str): Адрес API карточек.
+            timeout (float): Таймаут одного запроса, сек.
+            connection_limit (int): Максимальное число одновременных соединений.
+            batch_size (int): Количество артикулов в одном запросе.
+            scheduler (Optional[PriceCheckScheduler]): Планировщик, ограничивающий
+                параллельность и частоту запросов. Без него запросы не ограничиваются.
+            policy (Optional[FetchPolicy]): Политика повторов, circuit breaker и
+                дублирующих запросов. По умолчанию создается из настроек config.
+            cache (Optional[ResponseCache]): Дисковый кэш ответов. По умолчанию
+                создается из настроек config (RESPONSE_CACHE_MODE).
+        """
+        self.base_url = base_url
+        self.host = urlsplit(base_url).netloc
+        self.batch_size = batch_size
+        self.scheduler = scheduler
+        self.policy = policy if policy is not None else FetchPolicy()
+        self.cache = cache if cache is not None else ResponseCache()
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._connection_limit = connection_limit
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "HttpPriceFetcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """
+        Создает HTTP-сессию, если она еще не создана.
+        """
+        if self._session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self._connection_limit,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self._timeout,
+            headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+        )
+        logger.debug("HTTP-сессия создана: %s", self.base_url)
+
+    async def close(self) -> None:
+        """
+        Закрывает HTTP-сессию.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.debug("HTTP-сессия закрыта")
+
+    async def fetch_price(self, vendor_code: str) -> Optional[float]:
+        """
+        Получает цену одного товара по артикулу.
+
+        Args:
+            vendor_code (str): Артикул книги.
+
+        Returns:
+            Optional[float]: Цена товара или None, если товара нет в наличии
+            или цену получить не удалось.
+        """
+        prices = await self.fetch_prices([vendor_code])
+        return prices.get(str(vendor_code))
+
+    async def fetch_prices(self, vendor_codes: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Получает цены товаров, упаковывая артикулы в запросы по batch_size штук.
+
+        Части отправляются параллельно в пределах лимита соединений сессии.
+
+        Args:
+            vendor_codes (Iterable[str]): Артикулы книг.
+
+        Returns:
+            Dict[str, Optional[float]]: Цена по строковому артикулу
+            (None - нет в наличии). Артикулы, цену которых получить не удалось
+            из-за ошибки запроса, в результат не попадают.
+        """
+        codes = [str(code) for code in vendor_codes]
+        results = await asyncio.gather(
+            *(self._fetch_chunk(chunk) for chunk in chunked(codes, self.batch_size))
+        )
+
+        prices: Dict[str, Optional[float]] = {}
+        for chunk_prices in results:
+            prices.update(chunk_prices)
+        return prices
+
+    async def _fetch_chunk(self, vendor_codes: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Выполняет один запрос карточек для части артикулов.
+        """
+        await self.start()
+        codes = list(vendor_codes)
+        url = build_detail_url(codes, self.base_url)
+
+        key = cache_key(codes)
+
+        try:
+            body = None
+            if self.cache.readable:
+                body = await asyncio.to_thread(self.cache.get, key)
+
+            from_cache = body is not None
+            if not from_cache:
+                body = await self.policy.call(
+                    self.host, lambda: self._request(url, len(codes))
+                )
+
+            json_data = json.loads(body)
+
+            if not from_cache and self.cache.writable:
+                await asyncio.to_thread(self.cache.put, key, body)
+
+            prices = split_products(json_data, codes)
+            missing = [code for code, price in prices.items() if price is None]
+            if missing:
+                logger.warning("Нет цены в ответе API для артикулов: %s", missing)
+            logger.info("Получены цены для %d артикулов одним запросом", len(codes))
+            return prices
+
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            CacheMissError,
+            CircuitOpenError,
+            ThrottledError,
+            ValueError,
+        ) as e:
+            # Ошибка запроса не означает отсутствия товара: цены не возвращаются,
+            # чтобы не опубликовать ложное "Нет в наличии"
+            logger.error(
+                "Ошибка при получении цен для артикулов %s: %r",
+                codes, e,
+            )
+            return {}
+
+    async def _request(self, url: str, items: int) -> bytes:
+        """
+        Выполняет запрос через планировщик, если он задан.
+        """
+        if self.scheduler is not None:
+            return await self.scheduler.submit(
+                self.host, lambda: self._get_body(url), items=items
+            )
+        return await self._get_body(url)
+
+    async def _get_body(self, url: str) -> bytes:
+        """
+        Выполняет GET-запрос и возвращает тело ответа.
+
+        Raises:
+            ThrottledError: Если сервис ответил 429 или 5xx.
+        """
+        with self.policy.measure(self.host):
+            async with self._session.get(url) as response:
+                if response.status == 429 or response.status >= 500:
+                    retry_after = response.headers.get("Retry-After")
+                    raise ThrottledError(
+                        response.status,
+                        float(retry_after) if retry_after and retry_after.isdigit() else None,
+                    )
+                response.raise_for_status()
+                return await response.read()
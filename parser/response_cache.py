@@ -0,0 +1,241 @@
+"""
+Модуль parser.response_cache
+
+Дисковый кэш "сырых" ответов API карточек WB.
+
+Ключ записи - SHA-256 от отсортированного списка артикулов, пункта выдачи
+и валюты, поэтому одинаковые запросы попадают в одну запись независимо от
+порядка артикулов. Запись хранится в файле <ключ>.bin: 8 байт времени
+сохранения и тело ответа, сжатое zlib. Время последнего обращения хранится
+в mtime файла и используется для вытеснения (LRU) при превышении размера.
+
+Режимы (RESPONSE_CACHE_MODE):
+    off    - кэш не используется;
+    on     - свежие записи отдаются из кэша, остальные запрашиваются и сохраняются;
+    record - все запросы идут в сеть, ответы сохраняются (запись трафика);
+    replay - ответы отдаются только из кэша без учета TTL, сеть не используется.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterable, Optional
+
+from config import (
+    CURRENCY,
+    DEST,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MODE,
+    RESPONSE_CACHE_TTL,
+)
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.response_cache")
+
+CACHE_MODES = ("off", "on", "record", "replay")
+
+# Заголовок записи: время сохранения (unix time, double)
+HEADER = struct.Struct("<d")
+
+
+class CacheMissError(Exception):
+    """
+    В режиме replay запрошенного ответа нет в кэше.
+    """
+
+
+def cache_key(vendor_codes: Iterable[str], dest: str = DEST, currency: str = CURRENCY) -> str:
+    """
+    Вычисляет ключ записи по артикулам, пункту выдачи и валюте.
+    """
+    nm = ";".join(sorted(str(code) for code in vendor_codes))
+    return hashlib.sha256(f"{nm}|{dest}|{currency}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов с TTL и ограничением размера.
+
+    Методы синхронные (работа с файлами); из асинхронного кода их следует
+    вызывать через asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        mode: str = RESPONSE_CACHE_MODE,
+        directory: str = RESPONSE_CACHE_DIR,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        """
+        Args:
+            mode (str): Режим работы ("off", "on", "record", "replay").
+            directory (str): Каталог для файлов кэша.
+            ttl (float): Время жизни записи в режиме "on", сек.
+            max_bytes (int): Максимальный суммарный размер файлов, байт.
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Неизвестный режим кэша: {mode}, допустимые: {CACHE_MODES}")
+
+        self.mode = mode
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def readable(self) -> bool:
+        return self.mode in ("on", "replay")
+
+    @property
+    def writable(self) -> bool:
+        return self.mode in ("on", "record")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Возвращает тело ответа из кэша или None.
+
+        Raises:
+            CacheMissError: Если записи нет, а кэш работает в режиме replay.
+        """
+        if not self.readable:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                stored_at, = HEADER.unpack(cache_file.read(HEADER.size))
+                payload = cache_file.read()
+        except FileNotFoundError:
+            return self._miss(key)
+        except (OSError, struct.error) as e:
+            logger.warning("Поврежденная запись кэша %s: %s", path, e)
+            self._discard(path)
+            return self._miss(key)
+
+        if self.mode == "on" and time.time() - stored_at > self.ttl:
+            self._discard(path)
+            return self._miss(key)
+
+        try:
+            body = zlib.decompress(payload)
+        except zlib.error as e:
+            logger.warning("Поврежденная запись кэша %s: %s", path, e)
+            self._discard(path)
+            return self._miss(key)
+
+        try:
+            # Обновление времени обращения для LRU
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        """
+        Сохраняет тело ответа в кэш и при необходимости вытесняет старые записи.
+        """
+        if not self.writable:
+            return
+
+        path = self._path(key)
+        data = HEADER.pack(time.time()) + zlib.compress(body, 6)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as cache_file:
+                cache_file.write(data)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            # Атомарная замена: читатель не увидит недописанный файл
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Не удалось сохранить запись кэша %s: %s", path, e)
+            return
+
+        with self._lock:
+            self._size += len(data) - previous_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def log_stats(self) -> None:
+        if self.enabled:
+            logger.info(
+                "Кэш ответов (%s): попаданий %d, промахов %d",
+                self.mode, self.hits, self.misses
+            )
+
+    def _miss(self, key: str) -> None:
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"Нет записи {key} в кэше")
+        return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".bin"):
+                    yield entry
+
+    def _evict(self) -> None:
+        """
+        Удаляет давно не использованные записи, пока размер не станет меньше 90% лимита.
+        """
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()),
+        )
+        # Размер сверяется с диском: учет не расходится с файлами со временем
+        self._size = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, _, path in entries:
+            if self._size <= target:
+                break
+            size = self._remove(path)
+            if size is not None:
+                self._size -= size
+                removed += 1
+        logger.info("Из кэша ответов вытеснено записей: %d", removed)
+
+    def _discard(self, path: str) -> None:
+        """
+        Удаляет устаревшую или поврежденную запись и уменьшает учтенный размер.
+        """
+        size = self._remove(path)
+        if size is not None:
+            with self._lock:
+                self._size = max(0, self._size - size)
+
+    @staticmethod
+    def _remove(path: str) -> Optional[int]:
+        """
+        Удаляет файл записи.
+
+        Returns:
+            Optional[int]: Размер удаленного файла или None, если удалить не удалось.
+        """
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return None
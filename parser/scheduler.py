@@ -0,0 +1,256 @@
+"""
+Модуль parser.scheduler
+
+Планировщик запросов к API карточек WB: ограничивает число одновременных
+запросов и их частоту для каждого хоста, а при ответах 429/5xx снижает
+нагрузку по схеме AIMD (аддитивное увеличение, мультипликативное уменьшение)
+и делает паузу перед повтором.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from config import (
+    SCHEDULER_BACKOFF_BASE,
+    SCHEDULER_BURST,
+    SCHEDULER_MAX_CONCURRENCY,
+    SCHEDULER_MAX_RETRIES,
+    SCHEDULER_MIN_CONCURRENCY,
+    SCHEDULER_RATE_PER_HOST,
+)
+
+
+logger = logging.getLogger("wb_check_price_bot.price_checker.scheduler")
+
+T = TypeVar("T")
+
+
+class ThrottledError(Exception):
+    """
+    Сервис ответил статусом 429 или 5xx: нагрузку нужно снизить.
+    """
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов по алгоритму token bucket.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate (float): Пополнение корзины, токенов в секунду.
+            capacity (int): Емкость корзины (допустимый всплеск).
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Запрещает выдачу токенов на seconds секунд (пауза после троттлинга).
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        """
+        Ожидает и забирает один токен.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Ограничитель числа одновременных запросов с адаптивным лимитом (AIMD).
+
+    Каждый успешный запрос увеличивает лимит на 1/limit (то есть примерно на 1
+    за "окно" из limit запросов), троттлинг уменьшает его в decrease_factor раз,
+    но не чаще одного раза за cooldown секунд.
+    """
+
+    def __init__(
+        self,
+        max_limit: int = SCHEDULER_MAX_CONCURRENCY,
+        min_limit: int = SCHEDULER_MIN_CONCURRENCY,
+        decrease_factor: float = 0.5,
+        cooldown: float = SCHEDULER_BACKOFF_BASE,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.limit = float(self.max_limit)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        logger.warning("Троттлинг API: лимит параллельных запросов снижен до %d", int(self.limit))
+
+
+class PriceCheckScheduler:
+    """
+    Планировщик запросов одного запуска проверки цен.
+
+    Пример:
+
+        scheduler = PriceCheckScheduler()
+        data = await scheduler.submit("card.wb.ru", request, items=100)
+        scheduler.log_stats()
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = SCHEDULER_MAX_CONCURRENCY,
+        min_concurrency: int = SCHEDULER_MIN_CONCURRENCY,
+        rate_per_host: float = SCHEDULER_RATE_PER_HOST,
+        burst: int = SCHEDULER_BURST,
+        max_retries: int = SCHEDULER_MAX_RETRIES,
+        backoff_base: float = SCHEDULER_BACKOFF_BASE,
+    ):
+        self.limiter = AdaptiveConcurrencyLimiter(
+            max_limit=max_concurrency,
+            min_limit=min_concurrency,
+            cooldown=backoff_base,
+        )
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.started_at = time.monotonic()
+        self.items_done = 0
+        self.requests_done = 0
+        self.throttled = 0
+
+    def bucket(self, host: str) -> TokenBucket:
+        """
+        Возвращает ограничитель частоты для хоста.
+        """
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    async def submit(
+        self,
+        host: str,
+        request: Callable[[], Awaitable[T]],
+        items: int = 1,
+    ) -> T:
+        """
+        Выполняет запрос с учетом лимитов, повторяя его после троттлинга.
+
+        Args:
+            host (str): Хост, к которому обращается запрос.
+            request (Callable[[], Awaitable[T]]): Фабрика корутины запроса.
+                Должна выбрасывать ThrottledError на ответы 429/5xx.
+            items (int): Количество товаров в запросе (для статистики).
+
+        Returns:
+            T: Результат запроса.
+
+        Raises:
+            ThrottledError: Если повторы исчерпаны.
+        """
+        bucket = self.bucket(host)
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                await bucket.acquire()
+                result = await request()
+            except ThrottledError as e:
+                self.throttled += 1
+                self.limiter.on_throttle()
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = self.backoff_base * 2 ** attempt * random.uniform(0.5, 1.5)
+                if e.retry_after:
+                    delay = max(delay, e.retry_after)
+                bucket.pause(delay)
+                logger.warning(
+                    "Хост %s ответил %s, повтор через %.1f с (попытка %d/%d)",
+                    host, e.status, delay, attempt + 1, self.max_retries
+                )
+            else:
+                self.limiter.on_success()
+                self.requests_done += 1
+                self.items_done += items
+                return result
+            finally:
+                await self.limiter.release()
+
+        raise RuntimeError("Недостижимое состояние планировщика")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Возвращает статистику запуска: обработанные товары, запросы и скорость.
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "items": self.items_done,
+            "requests": self.requests_done,
+            "throttled": self.throttled,
+            "elapsed": elapsed,
+            "items_per_sec": self.items_done / elapsed,
+            "concurrency": int(self.limiter.limit),
+        }
+
+    def log_stats(self) -> None:
+        """
+        Записывает статистику запуска в лог.
+        """
+        stats = self.stats()
+        logger.info(
+            "Получено цен: %d за %.2f с (%.1f товаров/с), запросов: %d, "
+            "ответов 429/5xx: %d, текущий лимит параллельности: %d",
+            stats["items"], stats["elapsed"], stats["items_per_sec"],
+            stats["requests"], stats["throttled"], stats["concurrency"]
+        )
@@ -0,0 +1,123 @@
+"""
+Модуль parser.wb_api
+
+Общие функции для работы с API карточек товаров WildBerries:
+формирование URL запроса и извлечение цен из ответа. Используются
+как aiohttp-, так и Selenium-вариантом получения цен.
+"""
+
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+from urllib.parse import urlencode
+
+from config import CURRENCY, DEST, WB_CARD_URL
+
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """
+    Разбивает последовательность на части не длиннее size элементов.
+    """
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def achunked(items: AsyncIterable[T], size: int) -> AsyncIterator[List[T]]:
+    """
+    Асинхронный аналог chunked: группирует элементы асинхронного итератора
+    в списки не длиннее size элементов.
+    """
+    size = max(1, size)
+    chunk: List[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_detail_url(vendor_codes: Iterable[str], base_url: str = WB_CARD_URL) -> str:
+    """
+    Формирует URL запроса карточек товаров.
+
+    Несколько артикулов передаются одним запросом через ";" в параметре nm.
+
+    Args:
+        vendor_codes (Iterable[str]): Артикулы книг.
+        base_url (str): Адрес API карточек.
+
+    Returns:
+        str: URL запроса.
+    """
+    params = {
+        "appType": 1,
+        "curr": CURRENCY,
+        "dest": DEST,
+        "spp": 30,
+        "ab_testing": "false",
+        "lang": "ru",
+        "nm": ";".join(str(code) for code in vendor_codes),
+    }
+    return f"{base_url}?{urlencode(params, safe=';')}"
+
+
+def extract_price(product: Dict[str, Any]) -> Optional[float]:
+    """
+    Извлекает итоговую цену товара из элемента массива products.
+
+    Итоговая цена = стоимость товара + стоимость логистики (в рублях).
+
+    Args:
+        product (Dict[str, Any]): Описание товара из ответа API.
+
+    Returns:
+        Optional[float]: Цена товара или None, если цены в карточке нет.
+    """
+    try:
+        price_info = product["sizes"][0]["price"]
+        return (price_info["product"] + price_info["logistics"]) / 100
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def split_products(
+    json_data: Dict[str, Any],
+    vendor_codes: Iterable[str],
+) -> Dict[str, Optional[float]]:
+    """
+    Раскладывает массив products ответа API по запрошенным артикулам.
+
+    Артикулы, которых нет в ответе или у которых нет цены, получают None
+    (отображаются как "Нет в наличии").
+
+    Args:
+        json_data (Dict[str, Any]): Ответ API карточек.
+        vendor_codes (Iterable[str]): Запрошенные артикулы.
+
+    Returns:
+        Dict[str, Optional[float]]: Цена по строковому артикулу.
+    """
+    prices: Dict[str, Optional[float]] = {str(code): None for code in vendor_codes}
+    products: List[Dict[str, Any]] = json_data.get("products") or []
+
+    for product in products:
+        vendor_code = str(product.get("id"))
+        if vendor_code in prices:
+            prices[vendor_code] = extract_price(product)
+
+    return prices
@@ -0,0 +1,202 @@
+"""
+Модуль parser.worker
+
+Обработчик распределенной проверки цен. Забирает задания из очереди
+PRICE_TASKS_QUEUE (их публикует parser/coordinator.py), проверяет цены книг
+задания и подтверждает его. Книги, цену которых получить не удалось,
+возвращаются в очередь отдельным заданием (до SHARD_TASK_MAX_ATTEMPTS
+попыток); когда задание завершено, в очередь PRICE_TASKS_DONE_QUEUE
+отправляется отметка для координатора. Обработчиков можно запускать
+сколько угодно на разных ядрах и машинах, подключать и останавливать
+в любой момент:
+неподтвержденные задания остановленного обработчика RabbitMQ возвращает
+в очередь.
+
+Запуск:
+    python parser/worker.py
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+from functools import partial
+from typing import Optional, Set
+
+import aio_pika
+from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
+
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_PATH)
+
+from analytics import PriceSanityGuard
+from config import (
+    DB_CONN,
+    PRICE_FETCH_BACKEND,
+    PRICE_TASKS_DONE_QUEUE,
+    PRICE_TASKS_QUEUE,
+    RABBIT_LOGIN,
+    RABBIT_PASSWORD,
+    SHARD_TASK_MAX_ATTEMPTS,
+    SHARD_WORKER_PREFETCH,
+    SHARD_WORKER_SHUTDOWN_TIMEOUT,
+)
+from database.database import close_pool, init_pool
+from parser.driver_pool import close_driver_pool
+from parser.get_price import logger, process_books_batch
+from parser.http_fetcher import HttpPriceFetcher
+from parser.scheduler import PriceCheckScheduler
+from rabbitmq import close_publisher, get_publisher
+
+
+async def publish_task_message(channel: AbstractChannel, queue_name: str, payload: dict) -> None:
+    """
+    Публикует устойчивое сообщение с JSON-телом в очередь.
+    """
+    await channel.default_exchange.publish(
+        Message(
+            body=json.dumps(payload).encode(),
+            content_type="application/json",
+            delivery_mode=DeliveryMode.PERSISTENT,
+        ),
+        routing_key=queue_name,
+    )
+
+
+async def handle_task(
+    message: AbstractIncomingMessage,
+    channel: AbstractChannel,
+    fetcher: Optional[HttpPriceFetcher] = None,
+    price_guard: Optional[PriceSanityGuard] = None,
+) -> None:
+    """
+    Обрабатывает одно задание. Подтверждение отправляется после проверки всех
+    книг; при сбое задание возвращается в очередь.
+
+    Книги, цену которых получить не удалось, публикуются новым заданием того же
+    цикла и группы; отметка о завершении группы отправляется, только когда
+    повторять больше нечего.
+
+    Отбор изменившихся цен (PriceChangeDetector) здесь не применяется: задания
+    одной книги попадают к разным обработчикам, и последняя цена, известная
+    обработчику, устаревает после публикации другим. Неизменившиеся цены
+    отбрасывает consumer при записи в books.
+    """
+    try:
+        task = json.loads(message.body)
+        books = task["books"]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        # Повреждённое задание повторять бессмысленно
+        logger.error("Некорректное задание %s: %s", message.message_id, e)
+        await message.reject(requeue=False)
+        return
+
+    async with message.process(requeue=True, ignore_processed=True):
+        logger.info(
+            "Задание %s: проверка %d книг",
+            message.message_id, len(books)
+        )
+        failed = set(await process_books_batch(books, fetcher, price_guard=price_guard))
+
+        attempt = task.get("attempt", 1)
+        if failed and attempt < SHARD_TASK_MAX_ATTEMPTS:
+            retry_books = [book for book in books if str(book["book_id"]) in failed]
+            await publish_task_message(channel, PRICE_TASKS_QUEUE, {
+                **task, "books": retry_books, "attempt": attempt + 1,
+            })
+            logger.warning(
+                "Задание %s: %d книг возвращено в очередь (попытка %d из %d)",
+                message.message_id, len(retry_books), attempt + 1, SHARD_TASK_MAX_ATTEMPTS
+            )
+            return
+
+        if failed:
+            logger.error(
+                "Задание %s: цены не получены после %d попыток: %s",
+                message.message_id, attempt, sorted(failed)
+            )
+        await publish_task_message(channel, PRICE_TASKS_DONE_QUEUE, {
+            "run_id": task.get("run_id"), "shard": task.get("shard"),
+        })
+
+
+async def main() -> None:
+    """
+    Подключается к очереди заданий и обрабатывает их до сигнала остановки.
+    """
+    logger.info("Запуск обработчика заданий проверки цен...")
+
+    connection_url = f"amqp://{RABBIT_LOGIN}:{RABBIT_PASSWORD}@{DB_CONN[0]}/"
+    connection = await aio_pika.connect_robust(connection_url)
+    await init_pool()
+
+    price_guard = PriceSanityGuard()
+    await price_guard.load()
+    scheduler = PriceCheckScheduler()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    # Соединение для публикации цен открывается один раз на время работы обработчика
+    await get_publisher()
+
+    async with connection, HttpPriceFetcher(scheduler=scheduler) as fetcher:
+        channel = await connection.channel()
+        # Ограничение числа неподтвержденных заданий на обработчик
+        await channel.set_qos(prefetch_count=SHARD_WORKER_PREFETCH)
+
+        queue = await channel.declare_queue(PRICE_TASKS_QUEUE, durable=True)
+        await channel.declare_queue(PRICE_TASKS_DONE_QUEUE, durable=True)
+        handle = partial(handle_task, channel=channel, fetcher=fetcher, price_guard=price_guard)
+        # Выполняющиеся обработки заданий, чтобы дождаться их при остановке
+        handlers: Set[asyncio.Task] = set()
+
+        async def on_message(message: AbstractIncomingMessage) -> None:
+            task = asyncio.current_task()
+            handlers.add(task)
+            try:
+                await handle(message)
+            finally:
+                handlers.discard(task)
+
+        consumer_tag = await queue.consume(on_message)
+        logger.info("Ожидаю задания из очереди '%s'...", PRICE_TASKS_QUEUE)
+
+        try:
+            await stop_event.wait()
+            # Новые задания больше не принимаются
+            await queue.cancel(consumer_tag)
+        finally:
+            # Взятые задания дорабатывают с открытыми пулом и публикатором;
+            # не успевшие за отведенное время вернутся в очередь
+            if handlers:
+                logger.info("Ожидание завершения %d заданий...", len(handlers))
+                _, pending = await asyncio.wait(handlers, timeout=SHARD_WORKER_SHUTDOWN_TIMEOUT)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            try:
+                await close_publisher()
+            finally:
+                await close_pool()
+            logger.info("Обработчик остановлен")
+
+    if PRICE_FETCH_BACKEND != "selenium":
+        scheduler.log_stats()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Завершение работы по запросу пользователя")
+    except Exception as e:
+        logger.critical("Критическая ошибка обработчика: %s", e, exc_info=True)
+        sys.exit(1)
+    finally:
+        close_driver_pool()
@@ -1 +1,13 @@
-from rabbitmq.producer import send_message
\ No newline at end of file
+from rabbitmq.producer import (
+    RabbitPublisher,
+    close_publisher,
+    get_publisher,
+    send_message,
+    send_updates,
+)
+from rabbitmq.wire import (
+    PriceUpdate,
+    WireFormatError,
+    decode_message,
+    encode_batch,
+)
\ No newline at end of file
@@ -1,18 +1,37 @@
 import asyncio
-import json
 import logging
 import os
 import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import aio_pika
-from aio_pika.abc import AbstractIncomingMessage
+from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
+from aio_pika.exceptions import CONNECTION_EXCEPTIONS
 
 
 PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_PATH)
 
-from config import DB_CONN, RABBIT_LOGIN, RABBIT_PASSWORD, CONSUMER_LOG_FILE_PATH
-from database.database import upd_book_data
+from config import (
+    DB_CONN,
+    RABBIT_LOGIN,
+    RABBIT_PASSWORD,
+    CONSUMER_LOG_FILE_PATH,
+    PRICE_UPDATES_QUEUE,
+    CONSUMER_BATCH_SIZE,
+    CONSUMER_BATCH_TIMEOUT_MS,
+    CONSUMER_MAX_ATTEMPTS,
+    CONSUMER_RETRY_DELAY,
+    CONSUMER_RETRY_MAX_DELAY,
+    PRICE_UPDATES_DEAD_LETTER_QUEUE,
+    PRICE_HISTORY_MAINTENANCE_INTERVAL,
+)
+from database.database import check_database, close_pool, init_pool, upd_books_data
+from database.queries import BookPriceUpdate
+from models.price_history import ensure_history_partitions, maintain_price_history
+from rabbitmq.wire import PriceUpdate, WireFormatError, decode_message
 
 
 def setup_consumer_logging() -> logging.Logger:
@@ -59,32 +78,296 @@ def setup_consumer_logging() -> logging.Logger:
 logger = setup_consumer_logging()
 
 
-async def process_message(message: AbstractIncomingMessage) -> None:
+def coalesce_updates(updates: Iterable[PriceUpdate]) -> Dict[int, PriceUpdate]:
     """
-    Асинхронная функция для обработки входящих сообщений из очереди RabbitMQ.
+    Оставляет по одному обновлению на книгу: с наибольшим временем,
+    при равном времени - полученное последним.
     """
-    async with message.process():
-        body = message.body.decode()
-        try:
-            message_data = json.loads(body)
-            # Обновление данных книги в базе данных
-            await upd_book_data(
-                str(message_data["price"]), 
-                int(message_data["book_id"])
+    latest: Dict[int, PriceUpdate] = {}
+    for update in updates:
+        current = latest.get(update.book_id)
+        if current is None or update.timestamp >= current.timestamp:
+            latest[update.book_id] = update
+    return latest
+
+
+class PriceUpdateBatcher:
+    """
+    Накапливает сообщения и записывает их в БД пачками: пачка сбрасывается,
+    когда набрано batch_size сообщений или прошло batch_timeout секунд
+    с первого сообщения пачки.
+
+    Для каждой книги в БД записывается только последнее обновление пачки.
+    После записи вся пачка подтверждается одним ack(multiple=True),
+    при ошибке БД возвращается в очередь одним nack(multiple=True).
+
+    Незаписанная пачка возвращается в очередь после паузы, которая
+    удваивается при каждой ошибке подряд (до retry_max_delay): пока пачка
+    не подтверждена, брокер не выдает сообщений сверх prefetch, и consumer
+    не нагружает недоступную БД. Если БД доступна, а пачка не записывается,
+    попытки считаются по сообщениям: пачка, сообщения которой исчерпали
+    max_attempts попыток, записывается по одному сообщению, а сообщения,
+    которые не записываются и поодиночке, переносятся в очередь
+    dead_letter_queue, чтобы не блокировать очередь навсегда.
+
+    Номера доставки действуют только в канале, из которого пришли сообщения:
+    сообщения закрытого канала (например, до переподключения) не
+    подтверждаются, а отбрасываются - брокер доставит их повторно.
+    """
+
+    def __init__(
+        self,
+        channel: Optional[AbstractChannel] = None,
+        batch_size: int = CONSUMER_BATCH_SIZE,
+        batch_timeout: float = CONSUMER_BATCH_TIMEOUT_MS / 1000,
+        retry_delay: float = CONSUMER_RETRY_DELAY,
+        retry_max_delay: float = CONSUMER_RETRY_MAX_DELAY,
+        max_attempts: int = CONSUMER_MAX_ATTEMPTS,
+        dead_letter_queue: str = PRICE_UPDATES_DEAD_LETTER_QUEUE,
+    ):
+        """
+        Args:
+            channel (Optional[AbstractChannel]): Канал для публикации в очередь ошибок
+                (None - сообщения не переносятся, а возвращаются в очередь).
+            batch_size (int): Максимальное количество сообщений в пачке.
+            batch_timeout (float): Максимальное время ожидания пачки, сек.
+            retry_delay (float): Начальная пауза перед возвратом пачки в очередь, сек.
+            retry_max_delay (float): Максимальная пауза перед возвратом пачки в очередь, сек.
+            max_attempts (int): Количество попыток записи сообщения при доступной БД.
+            dead_letter_queue (str): Очередь сообщений, которые не удалось записать.
+        """
+        self.channel = channel
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_queue = dead_letter_queue
+        self._messages: List[AbstractIncomingMessage] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Количество ошибок записи подряд (для паузы перед повтором)
+        self._failures = 0
+        # Неудачные попытки записи при доступной БД по телу сообщения
+        self._attempts: Dict[bytes, int] = {}
+
+    async def __call__(self, message: AbstractIncomingMessage) -> None:
+        """
+        Обработчик входящего сообщения для queue.consume.
+        """
+        self._messages.append(message)
+        if len(self._messages) >= self.batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.batch_timeout, lambda: asyncio.ensure_future(self._flush_on_timer())
+            )
+
+    def on_channel_close(self, *args) -> None:
+        """
+        Отбрасывает накопленные сообщения закрытого канала (для close_callbacks).
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._messages:
+            logger.warning(
+                "Канал закрыт, %d неподтвержденных сообщений будут доставлены повторно",
+                len(self._messages)
             )
+            self._messages = []
+
+    async def _flush_on_timer(self) -> None:
+        # Ошибку фоновой записи некому обработать: она только логируется
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Ошибка записи пачки по таймеру: %s", e, exc_info=True)
+
+    async def flush(self) -> None:
+        """
+        Записывает накопленную пачку в БД и подтверждает ее.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        messages, self._messages = self._messages, []
+        if not messages:
+            return
+
+        # Пачки подтверждаются по порядку: ack(multiple=True) последнего
+        # сообщения не должен захватить сообщения еще не записанной пачки
+        async with self._flush_lock:
+            live = [message for message in messages if not message.channel.is_closed]
+            if len(live) < len(messages):
+                logger.warning(
+                    "Отброшено %d сообщений закрытого канала, они будут доставлены повторно",
+                    len(messages) - len(live)
+                )
+            messages = live
+            if not messages:
+                return
+
+            written = await self._write(messages)
+            if written is None:
+                await self._retry(messages)
+                return
+
+            self._failures = 0
+            self._forget(messages)
+            if not await self._settle(messages[-1], ack=True):
+                return
             logger.info(
-                "Обработано сообщение: book_id=%s, price=%s",
-                message_data["book_id"], message_data["price"]
+                "Обработана пачка: сообщений %d, обновлений %d, записано книг %d",
+                len(messages), *written
+            )
+
+    @staticmethod
+    async def _write(messages: List[AbstractIncomingMessage]) -> Optional[Tuple[int, int]]:
+        """
+        Записывает в БД последние обновления книг из сообщений.
+
+        Returns:
+            Optional[Tuple[int, int]]: Количество обновлений и записанных книг,
+            None - если записать не удалось.
+        """
+        updates: List[PriceUpdate] = []
+        for message in messages:
+            try:
+                updates.extend(decode_message(message.body, message.content_type))
+            except WireFormatError as e:
+                # Повторная обработка не поможет: сообщение подтверждается вместе с пачкой
+                logger.error("Ошибка декодирования сообщения: %s, body: %r", e, message.body[:256])
+
+        latest = coalesce_updates(updates)
+        rows = [
+            BookPriceUpdate(
+                book_id=update.book_id,
+                price_kopecks=update.price_kopecks if update.in_stock else None,
+                in_stock=update.in_stock,
+                ts=datetime.fromtimestamp(update.timestamp, timezone.utc),
+                price=update.stored_price,
+            )
+            for update in latest.values()
+        ]
+        saved = (
+            await ensure_history_partitions(row.ts for row in rows)
+            and await upd_books_data(rows)
+        )
+        return (len(updates), len(latest)) if saved else None
+
+    async def _retry(self, messages: List[AbstractIncomingMessage]) -> None:
+        """
+        Возвращает незаписанную пачку в очередь после паузы или, если ее
+        сообщения исчерпали попытки, записывает их по одному.
+        """
+        delay = min(self.retry_max_delay, self.retry_delay * 2 ** min(self._failures, 16))
+        self._failures += 1
+        logger.error(
+            "Не удалось записать пачку из %d сообщений, возврат в очередь через %.1f с",
+            len(messages), delay
+        )
+        await asyncio.sleep(delay)
+
+        # Пока БД недоступна, ошибка не зависит от сообщений и попытки не считаются
+        if not await check_database():
+            logger.warning("База данных недоступна, пачка будет записана после ее восстановления")
+        else:
+            for message in messages:
+                self._attempts[message.body] = self._attempts.get(message.body, 0) + 1
+            if self.channel is not None and any(
+                self._attempts[message.body] >= self.max_attempts for message in messages
+            ):
+                await self._write_separately(messages)
+                return
+
+        await self._settle(messages[-1], ack=False)
+
+    async def _write_separately(self, messages: List[AbstractIncomingMessage]) -> None:
+        """
+        Записывает сообщения по одному: записанные подтверждаются,
+        исчерпавшие попытки переносятся в очередь ошибок, остальные
+        возвращаются в очередь.
+        """
+        for message in messages:
+            if await self._write([message]) is not None:
+                self._failures = 0
+                self._forget([message])
+                settled = await self._settle(message, ack=True, multiple=False)
+            elif self._attempts.get(message.body, 0) >= self.max_attempts:
+                settled = await self._dead_letter(message)
+            else:
+                settled = await self._settle(message, ack=False, multiple=False)
+            if not settled:
+                return
+
+    async def _dead_letter(self, message: AbstractIncomingMessage) -> bool:
+        """
+        Переносит сообщение в очередь ошибок и подтверждает его.
+
+        Returns:
+            bool: False, если канал закрылся: брокер доставит сообщение повторно.
+        """
+        attempts = self._attempts.get(message.body, 0)
+        try:
+            await self.channel.default_exchange.publish(
+                Message(
+                    body=message.body,
+                    content_type=message.content_type,
+                    delivery_mode=DeliveryMode.PERSISTENT,
+                    headers={"x-attempts": attempts},
+                ),
+                routing_key=self.dead_letter_queue,
+            )
+        except CONNECTION_EXCEPTIONS as e:
+            logger.warning("Не удалось перенести сообщение в очередь ошибок: %r", e)
+            return False
+
+        logger.error(
+            "Сообщение не записано за %d попыток и перенесено в очередь '%s': %r",
+            attempts, self.dead_letter_queue, message.body[:256]
+        )
+        self._forget([message])
+        return await self._settle(message, ack=True, multiple=False)
+
+    def _forget(self, messages: List[AbstractIncomingMessage]) -> None:
+        for message in messages:
+            self._attempts.pop(message.body, None)
+
+    @staticmethod
+    async def _settle(message: AbstractIncomingMessage, ack: bool, multiple: bool = True) -> bool:
+        """
+        Подтверждает (ack) или возвращает в очередь (nack) сообщения пачки
+        до message включительно (multiple=False - только message).
+
+        Returns:
+            bool: False, если канал закрылся: брокер доставит сообщения повторно.
+        """
+        try:
+            if ack:
+                await message.ack(multiple=multiple)
+            else:
+                await message.nack(multiple=multiple, requeue=True)
+            return True
+        except CONNECTION_EXCEPTIONS as e:
+            logger.warning(
+                "Не удалось %s пачку, канал закрыт; сообщения будут доставлены повторно: %r",
+                "подтвердить" if ack else "вернуть в очередь", e
             )
-                  
-        except json.JSONDecodeError:
-            logger.error("Ошибка декодирования JSON: %s", body)
-        except KeyError as e:
-            logger.error("Отсутствует обязательное поле %s в сообщении: %s", e, body)
-        except ValueError as e:
-            logger.error("Ошибка преобразования данных: %s, body: %s", e, body)
+            return False
+
+
+async def history_maintenance_loop(interval: float = PRICE_HISTORY_MAINTENANCE_INTERVAL) -> None:
+    """
+    Периодически создает будущие секции истории цен и удаляет устаревшие.
+    """
+    while True:
+        try:
+            await maintain_price_history()
         except Exception as e:
-            logger.error("Неожиданная ошибка при обработке сообщения: %s, body: %s", e, body)
+            logger.error("Ошибка обслуживания истории цен: %s", e, exc_info=True)
+        await asyncio.sleep(interval)
 
 
 async def main() -> None:
@@ -96,6 +379,7 @@ async def main() -> None:
     connection_string = f"amqp://{RABBIT_LOGIN}:{RABBIT_PASSWORD}@{DB_CONN[0]}/"
     
     try:
+        await init_pool()
         connection = await aio_pika.connect_robust(connection_string)
         logger.info("Подключение к RabbitMQ установлено")
         
@@ -103,17 +387,25 @@ async def main() -> None:
             channel = await connection.channel()
             logger.debug("Канал RabbitMQ создан")
             
+            # Брокер выдает не больше двух пачек неподтвержденных сообщений
+            await channel.set_qos(prefetch_count=CONSUMER_BATCH_SIZE * 2)
+            
             # Создание очереди
-            queue = await channel.declare_queue("my_queue",)
-            logger.info("Очередь 'my_queue' объявлена")
+            queue = await channel.declare_queue(PRICE_UPDATES_QUEUE)
+            logger.info("Очередь '%s' объявлена", PRICE_UPDATES_QUEUE)
+            await channel.declare_queue(PRICE_UPDATES_DEAD_LETTER_QUEUE, durable=True)
             
-            await queue.consume(process_message)
+            batcher = PriceUpdateBatcher(channel)
+            # Сообщения закрытого канала не подтверждаются в новом
+            channel.close_callbacks.add(batcher.on_channel_close)
+            await queue.consume(batcher)
             logger.info("Подписка на очередь оформлена")
             
-            logger.info("Ожидаю сообщения из очереди 'my_queue'...")
+            logger.info("Ожидаю сообщения из очереди '%s'...", PRICE_UPDATES_QUEUE)
             print("Consumer запущен. Ожидаю сообщения...")
             
-            await asyncio.Future()
+            # Работает, пока consumer не остановлен
+            await history_maintenance_loop()
             
     except ConnectionError as e:
         logger.critical("Ошибка подключения к RabbitMQ: %s", e)
@@ -121,6 +413,8 @@ async def main() -> None:
     except Exception as e:
         logger.critical("Неожиданная ошибка: %s", e, exc_info=True)
         raise
+    finally:
+        await close_pool()
 
 
 if __name__ == "__main__":
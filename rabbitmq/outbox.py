@@ -0,0 +1,145 @@
+"""
+Модуль rabbitmq.outbox
+
+Локальная очередь (outbox) сообщений, которые не удалось доставить в RabbitMQ.
+
+Сообщения дописываются в конец файла по одному JSON на строку, поэтому
+при сбое процесса теряется не больше недописанной строки. После
+восстановления соединения publisher читает файл с начала, публикует
+сообщения в исходном порядке и удаляет из файла подтвержденные брокером.
+
+Методы синхронные и не содержат точек переключения, поэтому вызываются
+прямо из цикла событий: запись не перемешивается с чтением и сжатием файла.
+
+Каждый процесс работает со своим файлом: если файл уже занят другим
+процессом (например, вторым обработчиком parser/worker.py), используется
+следующий свободный <path>.1, <path>.2 и т.д. Номера повторяются между
+запусками, поэтому сообщения остановленного процесса отправит тот, кто
+займет его файл следующим.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки файлов не используются
+    fcntl = None
+
+
+logger = logging.getLogger("wb_check_price_bot.rabbitmq.outbox")
+
+# Максимальное количество процессов с отдельными файлами outbox
+MAX_OUTBOX_SLOTS = 64
+
+
+class Outbox:
+    """
+    Файл сообщений, ожидающих отправки в RabbitMQ.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Путь к файлу outbox.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path, self._lock_file = self._acquire_slot(path)
+        self._file = open(self.path, "ab")
+
+    @property
+    def pending(self) -> bool:
+        """
+        Есть ли в outbox неотправленные сообщения.
+        """
+        return self._file.tell() > 0
+
+    def append(self, message_data: Dict[str, Any]) -> None:
+        """
+        Дописывает сообщение в конец outbox.
+        """
+        line = json.dumps(message_data, ensure_ascii=False).encode() + b"\n"
+        self._file.write(line)
+        self._file.flush()
+
+    def read(self, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Читает до limit первых сообщений.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: Сообщения и смещение в файле
+            сразу после последнего из них (для consume).
+        """
+        messages: List[Dict[str, Any]] = []
+        offset = 0
+        with open(self.path, "rb") as outbox_file:
+            for line in outbox_file:
+                if not line.endswith(b"\n"):
+                    # Недописанная строка после сбоя процесса
+                    break
+                offset += len(line)
+                try:
+                    messages.append(json.loads(line))
+                except ValueError:
+                    logger.error("Поврежденная запись outbox пропущена: %r", line)
+                    continue
+                if len(messages) >= limit:
+                    break
+        return messages, offset
+
+    def consume(self, offset: int) -> None:
+        """
+        Удаляет из outbox сообщения до смещения offset (уже доставленные).
+        """
+        with open(self.path, "rb") as outbox_file:
+            outbox_file.seek(offset)
+            rest = outbox_file.read()
+
+        self._file.close()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as tmp_file:
+            tmp_file.write(rest)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        # Атомарная замена: при сбое остается либо старый, либо новый файл
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "ab")
+
+    def close(self) -> None:
+        """
+        Сбрасывает данные на диск, закрывает файл и освобождает его для других процессов.
+        """
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    @staticmethod
+    def _acquire_slot(path: str):
+        """
+        Находит первый не занятый другим процессом файл outbox.
+
+        Returns:
+            Путь к файлу и открытый файл блокировки (None без fcntl).
+        """
+        if fcntl is None:
+            return path, None
+
+        for slot in range(MAX_OUTBOX_SLOTS):
+            slot_path = path if slot == 0 else f"{path}.{slot}"
+            lock_file = open(f"{slot_path}.lock", "wb")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            if slot:
+                logger.info("Файл outbox %s занят, используется %s", path, slot_path)
+            return slot_path, lock_file
+
+        raise RuntimeError(f"Все {MAX_OUTBOX_SLOTS} файлов outbox {path} заняты")
@@ -1,19 +1,43 @@
-import json
+import asyncio
 import logging
 import os
 import sys
-from typing import Dict, Any
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import aio_pika
-from aio_pika import Message
+from aio_pika import DeliveryMode, Message
 from aio_pika.abc import AbstractRobustConnection
+from aio_pika.exceptions import CONNECTION_EXCEPTIONS
+from aio_pika.pool import Pool
 
 
 PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_PATH)
 
 
-from config import DB_CONN, RABBIT_LOGIN, RABBIT_PASSWORD, PRODUCER_LOG_FILE_PATH
+from config import (
+    DB_CONN,
+    RABBIT_LOGIN,
+    RABBIT_PASSWORD,
+    PRODUCER_LOG_FILE_PATH,
+    PRICE_UPDATES_QUEUE,
+    RABBIT_CHANNEL_POOL_SIZE,
+    RABBIT_CONFIRM_WINDOW,
+    RABBIT_CONFIRM_TIMEOUT,
+    RABBIT_OUTBOX_PATH,
+    RABBIT_RECONNECT_DELAY,
+    PRICE_WIRE_FORMAT,
+)
+from rabbitmq.outbox import Outbox
+from rabbitmq.wire import (
+    JSON_CONTENT_TYPE,
+    MAX_RECORDS,
+    PRICE_CONTENT_TYPE,
+    PriceUpdate,
+    encode_batch,
+    encode_json,
+)
 
 
 def setup_producer_logging() -> logging.Logger:
@@ -61,52 +85,390 @@ def setup_producer_logging() -> logging.Logger:
 # Инициализация логгера
 logger = setup_producer_logging()
 
+# Ошибки, после которых сообщение сохраняется в outbox
+PUBLISH_ERRORS = (*CONNECTION_EXCEPTIONS, asyncio.TimeoutError)
 
-async def send_message(message_data: Dict[str, Any]) -> None:
+WIRE_FORMATS = ("binary", "json")
+
+
+class RabbitPublisher:
     """
-    Асинхронная функция для отправки сообщения в очередь RabbitMQ.
-    
-    Args:
-        message_data: Словарь с данными для отправки
+    Долгоживущий publisher: одно устойчивое (robust) соединение с RabbitMQ
+    и небольшой пул каналов. Очередь объявляется один раз при запуске.
+
+    Сообщения публикуются с подтверждениями брокера (publisher confirms).
+    publish() не ждет подтверждения: одновременно без подтверждения может
+    находиться до confirm_window сообщений, поэтому скорость отправки не
+    ограничена временем ответа брокера. Сообщения, которые брокер не
+    подтвердил или не смог принять, сохраняются в outbox и отправляются
+    повторно в исходном порядке после восстановления соединения.
+
+    Пример:
+
+        async with RabbitPublisher() as publisher:
+            await publisher.publish(PriceUpdate.from_price(6034394, 1234.0))
     """
-    try:
-        # Формирование строки подключения к RabbitMQ
-        connection_url = f"amqp://{RABBIT_LOGIN}:{RABBIT_PASSWORD}@{DB_CONN[0]}/"
-        
-        logger.debug("Подключение к RabbitMQ: %s", connection_url)
-        
-        # Использование context manager для автоматического управления соединением
-        connection: AbstractRobustConnection = await aio_pika.connect_robust(connection_url)
-        
-        async with connection:
-            channel = await connection.channel()
-            logger.debug("Канал RabbitMQ создан")
-            
-            # Объявление очереди
-            queue = await channel.declare_queue(
-                "my_queue",
+
+    def __init__(
+        self,
+        connection_url: Optional[str] = None,
+        queue_name: str = PRICE_UPDATES_QUEUE,
+        channel_pool_size: int = RABBIT_CHANNEL_POOL_SIZE,
+        confirm_window: int = RABBIT_CONFIRM_WINDOW,
+        confirm_timeout: float = RABBIT_CONFIRM_TIMEOUT,
+        outbox_path: str = RABBIT_OUTBOX_PATH,
+        reconnect_delay: float = RABBIT_RECONNECT_DELAY,
+        wire_format: str = PRICE_WIRE_FORMAT,
+    ):
+        """
+        Args:
+            connection_url (Optional[str]): Строка подключения к RabbitMQ.
+            queue_name (str): Очередь, в которую публикуются сообщения.
+            channel_pool_size (int): Максимальное количество каналов.
+            confirm_window (int): Максимальное количество неподтвержденных сообщений.
+            confirm_timeout (float): Время ожидания подтверждения, сек.
+            outbox_path (str): Файл outbox для недоставленных сообщений.
+            reconnect_delay (float): Пауза между попытками подключения, сек.
+            wire_format (str): Формат сообщений: "binary" или "json".
+        """
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Неизвестный формат сообщений: {wire_format}, допустимые: {WIRE_FORMATS}")
+
+        self.connection_url = (
+            connection_url or f"amqp://{RABBIT_LOGIN}:{RABBIT_PASSWORD}@{DB_CONN[0]}/"
+        )
+        self.queue_name = queue_name
+        self.channel_pool_size = channel_pool_size
+        self.confirm_window = max(1, confirm_window)
+        self.confirm_timeout = confirm_timeout
+        self.reconnect_delay = reconnect_delay
+        self.wire_format = wire_format
+        self.outbox = Outbox(outbox_path)
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._channel_pool: Optional[Pool] = None
+        self._start_lock = asyncio.Lock()
+        self._replay_lock = asyncio.Lock()
+        self._window = asyncio.Semaphore(self.confirm_window)
+        self._in_flight: Set[asyncio.Task] = set()
+        self._replay_task: Optional[asyncio.Task] = None
+        self._next_connect_at = 0.0
+        self.confirmed = 0
+        self.spooled = 0
+
+    async def __aenter__(self) -> "RabbitPublisher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @property
+    def is_started(self) -> bool:
+        return self._connection is not None
+
+    async def start(self) -> None:
+        """
+        Открывает соединение, создает пул каналов, объявляет очередь
+        и запускает отправку сообщений из outbox.
+        """
+        async with self._start_lock:
+            if self._connection is not None:
+                return
+
+            logger.debug("Подключение к RabbitMQ: %s", self.connection_url)
+            connection = await aio_pika.connect_robust(self.connection_url)
+            channel_pool = Pool(
+                partial(connection.channel, publisher_confirms=True),
+                max_size=self.channel_pool_size,
             )
-            logger.debug("Очередь 'my_queue' объявлена")
-            
-            # Преобразование данных в JSON
-            message_text = json.dumps(message_data)
-            
-            # Создание сообщения
-            message = Message(
-                body=message_text.encode(),
+
+            async with channel_pool.acquire() as channel:
+                await channel.declare_queue(self.queue_name)
+
+            # После восстановления соединения отправляются накопленные в outbox сообщения
+            connection.reconnect_callbacks.add(lambda *_: self._schedule_replay())
+            self._connection = connection
+            self._channel_pool = channel_pool
+
+            logger.info(
+                "Publisher RabbitMQ запущен: очередь '%s', каналов до %d, "
+                "окно подтверждений %d",
+                self.queue_name, self.channel_pool_size, self.confirm_window
             )
-            logger.debug("Сообщение создано")
-            
-            # Публикация сообщение в очередь
-            await channel.default_exchange.publish(
-                message, 
-                routing_key=queue.name
+
+        self._schedule_replay()
+
+    async def close(self) -> None:
+        """
+        Дожидается подтверждения отправленных сообщений, закрывает пул
+        каналов, соединение и outbox.
+        """
+        await self.flush()
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            await asyncio.gather(self._replay_task, return_exceptions=True)
+            self._replay_task = None
+
+        if self._connection is not None:
+            await self._channel_pool.close()
+            await self._connection.close()
+            self._channel_pool = None
+            self._connection = None
+
+        self.outbox.close()
+        logger.info(
+            "Publisher RabbitMQ остановлен: подтверждено %d, сохранено в outbox %d",
+            self.confirmed, self.spooled
+        )
+
+    async def flush(self) -> None:
+        """
+        Дожидается подтверждения (или сохранения в outbox) всех отправленных сообщений.
+        """
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def publish(self, update: PriceUpdate) -> None:
+        """
+        Публикует одно обновление цены.
+
+        Args:
+            update: Обновление цены книги
+        """
+        await self.publish_many([update])
+
+    async def publish_many(self, updates: Iterable[PriceUpdate]) -> None:
+        """
+        Публикует обновления цен.
+
+        В двоичном формате обновления упаковываются в одно сообщение
+        (крупные пакеты сжимаются), в JSON - по сообщению на обновление.
+        Возвращается, как только сообщения отправлены брокеру или сохранены
+        в outbox; подтверждения ожидаются в фоне. Если окно подтверждений
+        заполнено, ждет освобождения места.
+
+        Args:
+            updates: Обновления цен
+        """
+        updates = list(updates)
+        if not updates:
+            return
+
+        started = await self.try_start()
+        # Пока outbox не пуст, новые сообщения встают за ним, чтобы сохранить порядок
+        if not started or self.outbox.pending:
+            self._spool(updates)
+            self._schedule_replay()
+            return
+
+        for message, message_updates in self._build_messages(updates):
+            await self._window.acquire()
+            task = asyncio.create_task(self._publish_confirmed(message, message_updates))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def try_start(self) -> bool:
+        """
+        Подключается к брокеру, если соединения еще нет.
+        Повторная попытка выполняется не чаще раза в reconnect_delay секунд.
+
+        Returns:
+            bool: Есть ли соединение.
+        """
+        if self._connection is not None:
+            return True
+
+        loop = asyncio.get_running_loop()
+        if loop.time() < self._next_connect_at:
+            return False
+
+        try:
+            await self.start()
+        except PUBLISH_ERRORS as e:
+            self._next_connect_at = loop.time() + self.reconnect_delay
+            logger.warning("RabbitMQ недоступен, сообщения сохраняются в outbox: %s", e)
+            return False
+        return True
+
+    def _build_messages(self, updates: List[PriceUpdate]) -> List[Tuple[Message, List[PriceUpdate]]]:
+        """
+        Кодирует обновления в сообщения согласно wire_format.
+        """
+        if self.wire_format == "json":
+            return [
+                (
+                    Message(
+                        body=encode_json(update),
+                        content_type=JSON_CONTENT_TYPE,
+                        delivery_mode=DeliveryMode.PERSISTENT,
+                    ),
+                    [update],
+                )
+                for update in updates
+            ]
+
+        return [
+            (
+                Message(
+                    body=encode_batch(batch),
+                    content_type=PRICE_CONTENT_TYPE,
+                    delivery_mode=DeliveryMode.PERSISTENT,
+                ),
+                batch,
             )
-            
-            logger.info(
-                "Отправлено сообщение: book_id=%s, price=%s",
-                message_data.get("book_id"), message_data.get("price")
+            for batch in (
+                updates[start:start + MAX_RECORDS]
+                for start in range(0, len(updates), MAX_RECORDS)
             )
+        ]
+
+    async def _send(self, message: Message, channel=None) -> None:
+        """
+        Отправляет сообщение и ждет подтверждения брокера.
+        """
+        if channel is None:
+            async with self._channel_pool.acquire() as channel:
+                await self._send(message, channel)
+            return
+
+        await channel.default_exchange.publish(
+            message,
+            routing_key=self.queue_name,
+            timeout=self.confirm_timeout,
+        )
+
+    async def _publish_confirmed(self, message: Message, updates: List[PriceUpdate]) -> None:
+        try:
+            await self._send(message)
+        except PUBLISH_ERRORS as e:
+            logger.warning(
+                "Брокер не подтвердил сообщение (%d обновлений цен), сохранено в outbox: %r",
+                len(updates), e
+            )
+            self._spool(updates)
+        else:
+            self.confirmed += len(updates)
+            for update in updates:
+                logger.info(
+                    "Отправлено сообщение: book_id=%s, price=%s",
+                    update.book_id, update.stored_price
+                )
+        finally:
+            self._window.release()
+
+    def _spool(self, updates: Iterable[PriceUpdate]) -> None:
+        for update in updates:
+            self.outbox.append(update.to_dict())
+            self.spooled += 1
+
+    def _schedule_replay(self) -> None:
+        """
+        Запускает отправку outbox в фоне, если она еще не идет.
+        """
+        if not self.outbox.pending or self._connection is None:
+            return
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = asyncio.create_task(self._replay())
+
+    @staticmethod
+    def _decode_outbox(messages: List[Dict[str, Any]]) -> List[PriceUpdate]:
+        """
+        Разбирает сообщения outbox. Некорректные записи пропускаются, чтобы
+        одна поврежденная строка не остановила отправку остальных.
+        """
+        updates = []
+        for message_data in messages:
+            try:
+                updates.append(PriceUpdate.from_dict(message_data))
+            except (KeyError, ValueError, TypeError, OverflowError) as e:
+                logger.error("Некорректная запись outbox пропущена: %r (%r)", message_data, e)
+        return updates
+
+    async def _replay(self) -> None:
+        """
+        Отправляет сообщения из outbox в исходном порядке частями по
+        confirm_window сообщений. Часть удаляется из outbox только после
+        подтверждения всех ее сообщений; при ошибке отправка прекращается
+        до следующего восстановления соединения.
+        """
+        async with self._replay_lock:
+            replayed = 0
+            while self.outbox.pending:
+                messages, offset = self.outbox.read(self.confirm_window)
+                updates = self._decode_outbox(messages)
+                if updates:
+                    try:
+                        # Сообщения одной части идут в один канал и сохраняют порядок
+                        async with self._channel_pool.acquire() as channel:
+                            await asyncio.gather(*(
+                                self._send(message, channel)
+                                for message, _ in self._build_messages(updates)
+                            ))
+                    except PUBLISH_ERRORS as e:
+                        logger.warning(
+                            "Отправка outbox прервана, повтор после восстановления соединения: %r", e
+                        )
+                        return
+                if not offset:
+                    # В outbox только недописанная строка
+                    return
+                self.outbox.consume(offset)
+                replayed += len(updates)
+                self.confirmed += len(updates)
+
+            if replayed:
+                logger.info("Из outbox отправлено обновлений цен: %d", replayed)
+
+
+# Общий для процесса publisher: создается при первой отправке
+_publisher: Optional[RabbitPublisher] = None
+
+
+async def get_publisher() -> RabbitPublisher:
+    """
+    Возвращает общий publisher процесса и подключает его к брокеру.
+    Если брокер недоступен, publisher все равно возвращается: сообщения
+    будут сохраняться в outbox до восстановления соединения.
+    """
+    global _publisher
+    if _publisher is None:
+        _publisher = RabbitPublisher()
+    await _publisher.try_start()
+    return _publisher
+
+
+async def close_publisher() -> None:
+    """
+    Останавливает общий publisher процесса, если он был запущен.
+    """
+    global _publisher
+    if _publisher is not None:
+        await _publisher.close()
+        _publisher = None
+
+
+async def send_message(update: PriceUpdate) -> None:
+    """
+    Асинхронная функция для отправки обновления цены в очередь RabbitMQ
+    через общий publisher процесса.
+    
+    Args:
+        update: Обновление цены книги
+    """
+    await send_updates([update])
+
+
+async def send_updates(updates: Iterable[PriceUpdate]) -> None:
+    """
+    Отправляет несколько обновлений цен через общий publisher процесса.
+
+    Args:
+        updates: Обновления цен
+    """
+    updates = list(updates)
+    try:
+        publisher = await get_publisher()
+        await publisher.publish_many(updates)
             
     except ConnectionError as e:
         logger.error("Ошибка подключения к RabbitMQ: %s", e, exc_info=True)
@@ -114,8 +476,8 @@ async def send_message(message_data: Dict[str, Any]) -> None:
         
     except Exception as e:
         logger.error(
-            "Ошибка при отправке сообщения %s: %s",
-            message_data, e,
+            "Ошибка при отправке обновлений цен %s: %s",
+            updates, e,
             exc_info=True
         )
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,225 @@
+"""
+Модуль rabbitmq.wire
+
+Формат сообщений об обновлении цен (parser -> rabbitmq/consumer.py).
+
+Двоичный формат (content_type PRICE_CONTENT_TYPE), версия 1:
+
+    заголовок   <BBH   версия, флаги, количество записей
+    записи      <QIIHB артикул, цена в копейках, время (unix, сек.),
+                       id источника, признаки (бит 0 - товар в наличии)
+
+Одно сообщение может содержать несколько записей. При флаге FLAG_ZLIB
+записи после заголовка сжаты zlib (используется для крупных пакетов).
+Запись занимает 19 байт против ~45 байт JSON.
+
+Для перехода между форматами decode_message принимает и старый JSON
+{"book_id": ..., "price": ...}, где price - число или "Нет в наличии".
+"""
+
+import json
+import struct
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+WIRE_VERSION = 1
+
+PRICE_CONTENT_TYPE = "application/x-wb-price"
+JSON_CONTENT_TYPE = "application/json"
+
+HEADER = struct.Struct("<BBH")
+RECORD = struct.Struct("<QIIHB")
+
+# Флаги заголовка
+FLAG_ZLIB = 0x01
+
+# Признаки записи
+IN_STOCK = 0x01
+
+# Пакеты от стольких записей сжимаются
+COMPRESS_MIN_RECORDS = 16
+
+# Максимальное количество записей в одном сообщении (ограничение поля count)
+MAX_RECORDS = 0xFFFF
+
+OUT_OF_STOCK = "Нет в наличии"
+
+
+class WireFormatError(ValueError):
+    """
+    Сообщение не удалось разобрать.
+    """
+
+
+class PriceUpdate(NamedTuple):
+    """
+    Обновление цены одной книги.
+    """
+
+    book_id: int
+    price_kopecks: int
+    in_stock: bool
+    timestamp: int
+    source_id: int = 0
+
+    @classmethod
+    def from_price(
+        cls,
+        book_id: Any,
+        price: Optional[float],
+        source_id: int = 0,
+        timestamp: Optional[int] = None,
+    ) -> "PriceUpdate":
+        """
+        Создает обновление из цены в рублях (None - нет в наличии).
+        """
+        return cls(
+            book_id=int(book_id),
+            price_kopecks=0 if price is None else round(price * 100),
+            in_stock=price is not None,
+            timestamp=int(time.time()) if timestamp is None else timestamp,
+            source_id=source_id,
+        )
+
+    @property
+    def price(self) -> Optional[float]:
+        """
+        Цена в рублях или None, если товара нет в наличии.
+        """
+        return self.price_kopecks / 100 if self.in_stock else None
+
+    @property
+    def stored_price(self) -> str:
+        """
+        Цена в виде, в котором она хранится в колонке books.price.
+        """
+        return OUT_OF_STOCK if not self.in_stock else str(self.price_kopecks / 100)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Представление в старом JSON-формате с дополнительными полями.
+        """
+        return {
+            "book_id": self.book_id,
+            "price": OUT_OF_STOCK if not self.in_stock else self.price_kopecks / 100,
+            "ts": self.timestamp,
+            "source": self.source_id,
+        }
+
+    @classmethod
+    def from_dict(cls, message_data: Dict[str, Any]) -> "PriceUpdate":
+        """
+        Разбирает сообщение в JSON-формате.
+
+        Raises:
+            KeyError: Нет обязательного поля.
+            ValueError: Некорректное значение поля.
+        """
+        price = message_data["price"]
+        if price == OUT_OF_STOCK:
+            price = None
+        elif price is not None:
+            price = float(price)
+        return cls.from_price(
+            message_data["book_id"],
+            price,
+            source_id=int(message_data.get("source", 0)),
+            timestamp=int(message_data["ts"]) if "ts" in message_data else None,
+        )
+
+
+def encode_batch(
+    updates: Iterable[PriceUpdate],
+    compress: Optional[bool] = None,
+) -> bytes:
+    """
+    Кодирует обновления в одно двоичное сообщение.
+
+    Args:
+        updates (Iterable[PriceUpdate]): Обновления (не больше MAX_RECORDS).
+        compress (Optional[bool]): Сжимать ли записи; None - сжимать пакеты
+            от COMPRESS_MIN_RECORDS записей.
+
+    Returns:
+        bytes: Тело сообщения.
+    """
+    updates = list(updates)
+    if len(updates) > MAX_RECORDS:
+        raise ValueError(f"В сообщении не может быть больше {MAX_RECORDS} записей")
+
+    records = b"".join(
+        RECORD.pack(
+            update.book_id,
+            update.price_kopecks,
+            update.timestamp,
+            update.source_id,
+            IN_STOCK if update.in_stock else 0,
+        )
+        for update in updates
+    )
+
+    if compress is None:
+        compress = len(updates) >= COMPRESS_MIN_RECORDS
+    flags = 0
+    if compress:
+        records = zlib.compress(records)
+        flags |= FLAG_ZLIB
+
+    return HEADER.pack(WIRE_VERSION, flags, len(updates)) + records
+
+
+def encode_json(update: PriceUpdate) -> bytes:
+    """
+    Кодирует обновление в JSON-формат (для consumer'ов старой версии).
+    """
+    return json.dumps(update.to_dict(), ensure_ascii=False).encode()
+
+
+def decode_message(body: bytes, content_type: Optional[str] = None) -> List[PriceUpdate]:
+    """
+    Разбирает тело сообщения в любом из поддерживаемых форматов.
+
+    Формат определяется по content_type, а если он не указан - по первому
+    байту: JSON-сообщения начинаются с "{".
+
+    Raises:
+        WireFormatError: Если сообщение не удалось разобрать.
+    """
+    if content_type == PRICE_CONTENT_TYPE or (
+        content_type != JSON_CONTENT_TYPE and body[:1] != b"{"
+    ):
+        return _decode_binary(body)
+
+    try:
+        return [PriceUpdate.from_dict(json.loads(body))]
+    except (ValueError, KeyError, TypeError) as e:
+        raise WireFormatError(f"Некорректное JSON-сообщение: {e!r}") from e
+
+
+def _decode_binary(body: bytes) -> List[PriceUpdate]:
+    try:
+        version, flags, count = HEADER.unpack_from(body)
+    except struct.error as e:
+        raise WireFormatError(f"Короткое сообщение: {len(body)} байт") from e
+
+    if version != WIRE_VERSION:
+        raise WireFormatError(f"Неподдерживаемая версия формата: {version}")
+
+    records = body[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            records = zlib.decompress(records)
+        except zlib.error as e:
+            raise WireFormatError(f"Ошибка распаковки: {e}") from e
+
+    if len(records) != count * RECORD.size:
+        raise WireFormatError(
+            f"Ожидалось {count} записей ({count * RECORD.size} байт), получено {len(records)} байт"
+        )
+
+    return [
+        PriceUpdate(book_id, price_kopecks, bool(record_flags & IN_STOCK), timestamp, source_id)
+        for book_id, price_kopecks, timestamp, source_id, record_flags in RECORD.iter_unpack(records)
+    ]
@@ -1,10 +1,19 @@
+import hashlib
+import logging
 import os
 import sys
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
 
 project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_path)
 
-from aiogram.types import FSInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, Message
+
+from database.database import delete_image_file_id, get_image_file_ids, save_image_file_id
+
+
+logger = logging.getLogger("wb_check_price_bot.resources.images")
 
 # Определение базового каталога для изображений
 IMAGES_DIR = os.path.join(project_path, 'data', 'images')
@@ -22,4 +31,87 @@ images = {
   "5417786": img_clean_architecture,
   "12989895": img_clean_agile,
   "94341513": img_ideal_job
-}
\ No newline at end of file
+}
+
+
+class BookImageRegistry:
+    """
+    Реестр изображений книг, загруженных в Telegram.
+
+    Каждое изображение загружается один раз: file_id из ответа Telegram
+    сохраняется в таблице book_images по book_id и хэшу файла, и дальше
+    изображение отправляется по file_id. Измененный файл получает новый хэш
+    и загружается заново. Если Telegram отклоняет file_id, изображение
+    загружается повторно, а новый file_id заменяет старый.
+    """
+
+    def __init__(self, files: Dict[str, FSInputFile]):
+        """
+        Args:
+            files (Dict[str, FSInputFile]): Файлы изображений по book_id.
+        """
+        self.files = files
+        self._hashes: Dict[str, str] = {}
+        self._file_ids: Dict[Tuple[str, str], str] = {}
+
+    async def load(self) -> None:
+        """
+        Загружает сохраненные file_id из БД.
+        """
+        rows = await get_image_file_ids()
+        if rows is None:
+            logger.warning("Не удалось загрузить file_id изображений, они будут загружены заново")
+            return
+        self._file_ids.update(((str(row.book_id), row.file_hash), row.file_id) for row in rows)
+        logger.info("Загружено file_id изображений: %d", len(rows))
+
+    def file_hash(self, book_id: str) -> str:
+        """
+        Хэш файла изображения книги (вычисляется один раз за время работы).
+        """
+        if book_id not in self._hashes:
+            with open(self.files[book_id].path, "rb") as f:
+                self._hashes[book_id] = hashlib.sha256(f.read()).hexdigest()
+        return self._hashes[book_id]
+
+    async def send(
+        self,
+        book_id: str,
+        send_photo: Callable[[Union[str, FSInputFile]], Awaitable[Message]],
+    ) -> Optional[Message]:
+        """
+        Отправляет изображение книги по file_id, а если его нет или Telegram
+        его отклонил - загружает файл и запоминает новый file_id.
+
+        Args:
+            book_id (str): Артикул книги.
+            send_photo (Callable): Отправка фото, например
+                lambda photo: message.answer_photo(photo=photo, ...).
+
+        Returns:
+            Optional[Message]: Отправленное сообщение или None, если изображения книги нет.
+        """
+        if book_id not in self.files:
+            return None
+
+        key = (book_id, self.file_hash(book_id))
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            try:
+                return await send_photo(file_id)
+            except TelegramBadRequest as e:
+                logger.warning("Telegram отклонил file_id изображения книги %s: %s", book_id, e)
+                self._file_ids.pop(key, None)
+                await delete_image_file_id(int(book_id), key[1], file_id)
+
+        message = await send_photo(self.files[book_id])
+        if message.photo:
+            # Последний размер - исходное изображение
+            file_id = message.photo[-1].file_id
+            self._file_ids[key] = file_id
+            await save_image_file_id(int(book_id), key[1], file_id)
+            logger.info("Изображение книги %s загружено в Telegram", book_id)
+        return message
+
+
+image_registry = BookImageRegistry(images)
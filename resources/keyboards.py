@@ -1,24 +1,148 @@
-from aiogram.types import InlineKeyboardButton
+import asyncio
+from typing import Dict, Optional, Sequence, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from database.database import get_book_data
+from database.catalog_cache import CatalogPage, get_books_page, get_catalog_cache
+from database.queries import BookItem
+
+
+# Префикс callback_data кнопок перехода по страницам: page_<a|b|f>_<book_id>
+PAGE_CALLBACK_PREFIX = "page_"
+PAGE_DIRECTIONS = {"a": "after", "b": "before", "f": "from"}
+
+# Максимальное количество готовых страниц в кэше клавиатур
+MAX_CACHED_PAGES = 1024
+
+# Страница каталога: направление и граничная книга
+PageKey = Tuple[str, Optional[int]]
 
 
-async def creating_book_kb() -> InlineKeyboardBuilder:
+def page_callback_data(direction: str, book_id: int) -> str:
     """
-    Асинхронная функция для создания встроенной клавиатуры (Inline Keyboard) с кнопками,
-    представляющими книги.
+    callback_data кнопки перехода на страницу (укладывается в 64 байта Telegram).
     """
-    books_data = await get_book_data()
+    code = next(code for code, name in PAGE_DIRECTIONS.items() if name == direction)
+    return f"{PAGE_CALLBACK_PREFIX}{code}_{book_id}"
+
 
+def parse_page_callback_data(data: str) -> PageKey:
+    """
+    Разбирает callback_data кнопки перехода на страницу.
+
+    Raises:
+        ValueError: Если callback_data некорректна.
+    """
+    code, _, book_id = data[len(PAGE_CALLBACK_PREFIX):].partition("_")
+    if code not in PAGE_DIRECTIONS:
+        raise ValueError(f"Неизвестное направление страницы: {data}")
+    return PAGE_DIRECTIONS[code], int(book_id)
+
+
+def creating_book_kb(books_data: Sequence[BookItem], page: Optional[CatalogPage] = None) -> InlineKeyboardBuilder:
+    """
+    Функция для создания встроенной клавиатуры (Inline Keyboard) с кнопками,
+    представляющими книги.
+
+    Args:
+        books_data (Sequence[BookItem]): Книги для кнопок.
+        page (Optional[CatalogPage]): Страница каталога; если передана,
+            добавляются кнопки перехода на соседние страницы.
+    """
     books_btns = []
 
     for item in books_data:
-        btn_books = InlineKeyboardButton(text=f'{item[1]}', callback_data=f'book_id_{item[0]}')
+        btn_books = InlineKeyboardButton(text=f'{item.book_name}', callback_data=f'book_id_{item.book_id}')
         books_btns.append(btn_books)
 
     books_kb = InlineKeyboardBuilder()
     books_kb.add(*books_btns)
     books_kb.adjust(1)
 
-    return books_kb
\ No newline at end of file
+    if page is not None:
+        nav_btns = []
+        if page.prev_cursor is not None:
+            nav_btns.append(InlineKeyboardButton(
+                text='« Назад', callback_data=page_callback_data("before", page.prev_cursor)
+            ))
+        if page.next_cursor is not None:
+            nav_btns.append(InlineKeyboardButton(
+                text='Вперед »', callback_data=page_callback_data("after", page.next_cursor)
+            ))
+        if nav_btns:
+            books_kb.row(*nav_btns)
+
+    return books_kb
+
+
+class BookKeyboardCache:
+    """
+    Готовые страницы клавиатуры каталога, общие для всех пользователей.
+
+    Страницы сохраняются для текущей версии кэша каталога и сбрасываются,
+    когда версия меняется. Одновременные запросы одной страницы во время
+    сборки ждут одну и ту же сборку. Пока кэш каталога не готов, страницы
+    не сохраняются: без версии нельзя узнать, что они устарели.
+    """
+
+    def __init__(self):
+        # Кэш каталога и его версия, по которым собраны страницы
+        self._version: Optional[tuple] = None
+        self._markups: Dict[PageKey, InlineKeyboardMarkup] = {}
+        self._building: Dict[Tuple[Optional[tuple], PageKey], asyncio.Future] = {}
+
+    async def get(self, direction: str = "first", book_id: Optional[int] = None) -> InlineKeyboardMarkup:
+        """
+        Возвращает страницу клавиатуры каталога
+        (см. database.catalog_cache.get_books_page).
+        """
+        key = (direction, book_id)
+        cache = get_catalog_cache()
+        version = None
+        if cache is not None and cache.ready:
+            version = (cache, cache.version)
+            if self._version != version:
+                self._version, self._markups = version, {}
+            markup = self._markups.get(key)
+            if markup is not None:
+                return markup
+
+        # Сборка для устаревшей версии каталога не переиспользуется
+        build_key = (version, key)
+        building = self._building.get(build_key)
+        if building is None:
+            building = asyncio.ensure_future(self._build(version, key))
+            self._building[build_key] = building
+            building.add_done_callback(lambda future: self._building.pop(build_key, None))
+        return await asyncio.shield(building)
+
+    async def _build(self, version: Optional[tuple], key: PageKey) -> InlineKeyboardMarkup:
+        page = await get_books_page(*key)
+        if page is None:
+            raise RuntimeError("Не удалось получить страницу каталога")
+        markup = creating_book_kb(page.books, page).as_markup()
+
+        # Сохраняется, только если каталог не изменился за время сборки
+        if version is not None and self._version == version:
+            if len(self._markups) >= MAX_CACHED_PAGES:
+                self._markups.clear()
+            self._markups[key] = markup
+        return markup
+
+
+book_keyboard = BookKeyboardCache()
+
+
+async def get_book_markup(direction: str = "first", book_id: Optional[int] = None) -> InlineKeyboardMarkup:
+    """
+    Возвращает готовую страницу клавиатуры каталога (см. BookKeyboardCache).
+    """
+    return await book_keyboard.get(direction, book_id)
+
+
+def search_results_markup(books_data: Sequence[BookItem]) -> InlineKeyboardMarkup:
+    """
+    Клавиатура с результатами поиска по названию.
+    """
+    return creating_book_kb(books_data).as_markup()
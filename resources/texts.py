@@ -1,3 +1,4 @@
 welcome_text = """Привет! Я помогу узнать актуальную стоимость книг Роберта Мартина ("Дядюшки Боба"). 
 Просто нажмит кнопку с соответстующим названием и я отправлю тебе стоимость книги в рублях
-с маркетплейса WildBerries, актуальную для центральной части Москвы."""
\ No newline at end of file
+с маркетплейса WildBerries, актуальную для центральной части Москвы.
+Чтобы найти книгу по названию, отправь мне часть названия."""
\ No newline at end of file
@@ -12,35 +12,103 @@ logger = setup_logging("INFO")
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.bot import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
-from config import TOKEN
-from handlers import commands_handler, users_handler
+from config import BOT_MODE, TELEGRAM_API_URL, TOKEN
+from handlers import commands_handler, inline_handler, users_handler
+from database.catalog_cache import start_catalog_cache, stop_catalog_cache
+from database.catalog_index import catalog_index
+from database.database import close_pool, init_pool
 from models import create_models
+from resources import image_registry
+
+
+def create_bot() -> Bot:
+    """
+    Создает экземпляр бота; если задан TELEGRAM_API_URL, запросы к Bot API
+    идут на этот сервер (локальный Bot API или заглушка для тестов).
+    """
+    session = None
+    if TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+    return Bot(
+        token=TOKEN,
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+    )
+
+
+async def on_startup() -> None:
+    """
+    Подготавливает процесс бота к обработке обновлений.
+
+    Вызывается диспетчером при запуске polling или сервера вебхука
+    (в каждом процессе-обработчике отдельно).
+    """
+    # Общий пул соединений с БД на все время работы процесса
+    await init_pool()
+
+    # Кэш каталога, обновляемый по уведомлениям об изменениях books,
+    # и индекс для inline-запросов поверх него
+    catalog_index.attach(start_catalog_cache())
+
+    # Изображения книг, уже загруженные в Telegram
+    await image_registry.load()
+    logger.info("Процесс бота %d готов к обработке обновлений", os.getpid())
+
+
+async def on_shutdown() -> None:
+    """
+    Освобождает ресурсы процесса бота при остановке диспетчера.
+    """
+    await stop_catalog_cache()
+    await close_pool()
+    logger.info("Процесс бота %d завершил работу", os.getpid())
+
+
+def create_dispatcher() -> Dispatcher:
+    """
+    Создает диспетчер с роутерами и хуками запуска и остановки.
+    """
+    dp = Dispatcher()
+
+    # Регистрация роутеров
+    dp.include_routers(
+        commands_handler.router,
+        users_handler.router,
+        inline_handler.router,
+    )
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+async def prepare_database() -> None:
+    """
+    Создает таблицы в БД. Выполняется один раз до запуска обработчиков.
+    """
+    await init_pool()
+    try:
+        await create_models()
+        logger.debug("Модели базы данных созданы")
+    finally:
+        await close_pool()
 
 
 async def main():
     """
-    Инициализирует и запускает Telegram-бота.
+    Инициализирует и запускает Telegram-бота в режиме polling.
     """
     logger.info("Запуск инициализации бота...")
     
     try:
-        bot = Bot(
-            token=TOKEN,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-        )
-        dp = Dispatcher()
-
-        # Регистрация роутеров
-        dp.include_routers(
-            commands_handler.router,
-            users_handler.router,
-        )
-
-        # Создаются таблицы в БД
-        await create_models()
-        logger.debug("Модели базы данных созданы")
+        bot = create_bot()
+        dp = create_dispatcher()
+
+        await prepare_database()
         
         # Очистка вебхуков
         await bot.delete_webhook(drop_pending_updates=True)
@@ -48,18 +116,29 @@ async def main():
         
         # Запуск бота
         logger.info("Запуск polling...")
-        try:
-            await dp.start_polling(bot)
-        finally:
-            logger.info("Бот завершил работу")
+        await dp.start_polling(bot)
+        logger.info("Бот завершил работу")
         
     except Exception as e:
         logger.critical(f"Ошибка при запуске бота: {e}", exc_info=True)
         raise
 
 
+def run() -> None:
+    """
+    Запускает бота в режиме, заданном BOT_MODE: "polling" или "webhook".
+    """
+    if BOT_MODE == "webhook":
+        from webhook_server import run_webhook
+        run_webhook()
+    elif BOT_MODE == "polling":
+        asyncio.run(main())
+    else:
+        raise ValueError(f"Неизвестный режим работы бота BOT_MODE={BOT_MODE!r}")
+
+
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run()
     except Exception as e:
-        logger.critical(f"Критическая ошибка: {e}", exc_info=True)
\ No newline at end of file
+        logger.critical(f"Критическая ошибка: {e}", exc_info=True)
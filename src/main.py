@@ -1,12 +1,11 @@
-import asyncio
-
-from init_bot import main
+from init_bot import run
 
 
 if __name__ == "__main__":
     """
     Точка входа в приложение.
 
-    Запускает асинхронную функцию `main` из модуля `init_bot` с использованием `asyncio.run`.
+    Запускает бота функцией `run` из модуля `init_bot` в режиме, заданном
+    переменной окружения BOT_MODE (polling или webhook).
     """
-    asyncio.run(main())
+    run()
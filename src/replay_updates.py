@@ -0,0 +1,189 @@
+"""
+Модуль replay_updates.py
+
+Сквозная проверка и замер режима вебхука: отправляет записанные обновления
+Telegram (файл WEBHOOK_RECORD_PATH, по одному JSON в строке) или
+сгенерированные обновления на локальный сервер вебхука и выводит скорость
+приема и задержки ответов.
+
+Ответы бота не должны уходить в настоящий Telegram, поэтому скрипт может
+поднять заглушку Bot API, которую сервер вебхука использует через
+TELEGRAM_API_URL.
+
+Запуск:
+    python src/replay_updates.py --serve-stub --stub-port 8082   # только заглушка Bot API
+    TELEGRAM_API_URL=http://127.0.0.1:8082 BOT_MODE=webhook WEBHOOK_WORKERS=4 python src/main.py
+    python src/replay_updates.py --file updates.jsonl --concurrency 50
+    python src/replay_updates.py --generate 5000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import List
+
+import aiohttp
+from aiohttp import web
+
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_PATH)
+
+from config import WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET
+
+
+STUB_USER = {"id": 1, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}
+
+
+def load_updates(path: str) -> List[bytes]:
+    """
+    Читает записанные обновления (по одному JSON в строке).
+    """
+    with open(path, "rb") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def generate_updates(count: int) -> List[bytes]:
+    """
+    Формирует обновления, похожие на трафик бота: /start, поиск по
+    названию и inline-запросы от разных пользователей.
+    """
+    texts = ["/start", "чистый", "архитектура", "идеальный программист"]
+    updates = []
+    for update_id in range(1, count + 1):
+        user = {"id": 100000 + update_id % 1000, "is_bot": False, "first_name": f"User{update_id % 1000}"}
+        if update_id % 5 == 0:
+            update = {
+                "update_id": update_id,
+                "inline_query": {
+                    "id": str(update_id), "from": user, "query": texts[update_id % len(texts)][:4], "offset": "",
+                },
+            }
+        else:
+            update = {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id, "date": int(time.time()), "from": user,
+                    "chat": {"id": user["id"], "type": "private"},
+                    "text": texts[update_id % len(texts)],
+                },
+            }
+        updates.append(json.dumps(update, ensure_ascii=False).encode())
+    return updates
+
+
+async def stub_api_handler(request: web.Request) -> web.Response:
+    """
+    Обработчик заглушки Bot API: отвечает успехом на любой метод.
+    """
+    method = request.match_info["method"]
+    request.app["calls"][method] += 1
+    if request.app["delay"]:
+        await asyncio.sleep(request.app["delay"])
+
+    if method.lower() == "getme":
+        return web.json_response({"ok": True, "result": STUB_USER})
+    if method.startswith(("send", "edit")):
+        params = await request.post()
+        message = {
+            "message_id": request.app["calls"][method],
+            "date": int(time.time()),
+            "chat": {"id": int(params.get("chat_id") or 0), "type": "private"},
+            "from": STUB_USER,
+        }
+        if method == "sendPhoto":
+            message["photo"] = [{"file_id": "stub", "file_unique_id": "stub", "width": 1, "height": 1}]
+        return web.json_response({"ok": True, "result": message})
+    return web.json_response({"ok": True, "result": True})
+
+
+def create_stub_app(delay: float = 0.0) -> web.Application:
+    """
+    Создает aiohttp-приложение заглушки Bot API (адрес для TELEGRAM_API_URL).
+
+    Args:
+        delay (float): Искусственная задержка ответа, сек.
+    """
+    app = web.Application()
+    app["delay"] = delay
+    app["calls"] = Counter()
+    app.router.add_post("/bot{token}/{method}", stub_api_handler)
+    return app
+
+
+async def replay(args: argparse.Namespace) -> None:
+    """
+    Отправляет обновления на сервер вебхука и выводит результаты замера.
+    """
+    updates = load_updates(args.file) if args.file else generate_updates(args.generate)
+    if not updates:
+        print("Нет обновлений для отправки")
+        return
+
+    headers = {"Content-Type": "application/json"}
+    if args.secret:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = args.secret
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for body in updates:
+        queue.put_nowait(body)
+
+    async def sender(session: aiohttp.ClientSession) -> None:
+        while not queue.empty():
+            body = queue.get_nowait()
+            start_time = time.perf_counter()
+            try:
+                async with session.post(args.url, data=body, headers=headers) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start_time)
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start_time = time.perf_counter()
+        await asyncio.gather(*(sender(session) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    print(f"Адрес: {args.url}")
+    print(f"Обновлений: {len(updates)}, одновременно: {args.concurrency}, ответы: {dict(statuses)}")
+    print(f"Время: {elapsed:.3f} с, {len(updates) / elapsed:.1f} обновлений/с")
+    print(f"Задержка, мс: p50 {percentile(0.5):.2f}, p90 {percentile(0.9):.2f}, "
+          f"p99 {percentile(0.99):.2f}, max {latencies[-1] * 1000:.2f}")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Воспроизведение обновлений Telegram на сервере вебхука")
+    arg_parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}",
+                            help="Адрес вебхука")
+    arg_parser.add_argument("--file", default=None, help="Файл с записанными обновлениями (JSON lines)")
+    arg_parser.add_argument("--generate", type=int, default=1000,
+                            help="Количество сгенерированных обновлений, если --file не задан")
+    arg_parser.add_argument("--concurrency", type=int, default=50, help="Одновременных запросов")
+    arg_parser.add_argument("--secret", default=WEBHOOK_SECRET, help="Секретный токен вебхука")
+    arg_parser.add_argument("--serve-stub", action="store_true", help="Только запустить заглушку Bot API")
+    arg_parser.add_argument("--stub-port", type=int, default=8082, help="Порт заглушки для --serve-stub")
+    arg_parser.add_argument("--delay", type=float, default=0.0, help="Задержка ответа заглушки, сек.")
+    args = arg_parser.parse_args()
+
+    if args.serve_stub:
+        web.run_app(create_stub_app(args.delay), host="127.0.0.1", port=args.stub_port)
+        return
+
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
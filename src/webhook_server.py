@@ -0,0 +1,201 @@
+"""
+Модуль webhook_server.py
+
+Режим вебхука: обновления принимает aiohttp-сервер на базе интеграции
+aiogram (SimpleRequestHandler) вместо long polling.
+
+Родительский процесс один раз создает таблицы и регистрирует вебхук в
+Telegram, затем запускает WEBHOOK_WORKERS процессов-обработчиков. Каждый
+обработчик слушает один и тот же порт (сокет с SO_REUSEPORT, соединения
+распределяет ядро) и при запуске открывает свой пул соединений с БД и кэш
+каталога (хуки on_startup/on_shutdown диспетчера из init_bot.py).
+
+Запуск:
+    BOT_MODE=webhook WEBHOOK_URL=https://bot.example.com python src/main.py
+    python src/webhook_server.py --workers 4 --port 8080
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from typing import List, Optional
+
+from aiohttp import web
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from init_bot import create_bot, create_dispatcher, prepare_database
+from config import (
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_RECORD_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    WEBHOOK_WORKERS,
+)
+
+
+logger = logging.getLogger("wb_check_price_bot.webhook")
+
+
+def record_updates_middleware(path: str):
+    """
+    Middleware, дописывающее тела входящих обновлений в файл (по одному JSON
+    в строке) для последующего воспроизведения скриптом replay_updates.py.
+    """
+    record_file = open(path, "ab", buffering=0)
+
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        if request.method == "POST" and request.path == WEBHOOK_PATH:
+            body = await request.read()
+            # Переводы строк в JSON возможны только между токенами
+            record_file.write(body.replace(b"\r", b"").replace(b"\n", b"") + b"\n")
+        return await handler(request)
+
+    return middleware
+
+
+def create_app(record_path: str = WEBHOOK_RECORD_PATH) -> web.Application:
+    """
+    Создает aiohttp-приложение, принимающее обновления на WEBHOOK_PATH.
+
+    Args:
+        record_path (str): Файл для записи входящих обновлений; пустой - не записывать.
+    """
+    bot = create_bot()
+    dp = create_dispatcher()
+
+    middlewares = [record_updates_middleware(record_path)] if record_path else []
+    app = web.Application(middlewares=middlewares)
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET or None,
+    ).register(app, path=WEBHOOK_PATH)
+
+    # Хуки диспетчера выполняются при запуске и остановке приложения
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+def create_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    """
+    Создает слушающий сокет; с reuse_port несколько процессов могут
+    слушать один порт.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(host: str, port: int, reuse_port: bool) -> None:
+    """
+    Запускает сервер вебхука в текущем процессе до получения SIGINT/SIGTERM.
+    """
+    sock = create_socket(host, port, reuse_port)
+    logger.info("Обработчик вебхука %d слушает %s:%d%s", os.getpid(), host, port, WEBHOOK_PATH)
+    web.run_app(create_app(), sock=sock, print=None, handle_signals=True)
+
+
+async def register_webhook() -> None:
+    """
+    Создает таблицы и регистрирует вебхук в Telegram, если задан WEBHOOK_URL.
+    """
+    await prepare_database()
+    if not WEBHOOK_URL:
+        logger.warning("WEBHOOK_URL не задан, вебхук в Telegram не регистрируется")
+        return
+
+    bot = create_bot()
+    try:
+        await bot.set_webhook(
+            url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=create_dispatcher().resolve_used_update_types(),
+        )
+        logger.info("Вебхук зарегистрирован: %s%s", WEBHOOK_URL.rstrip("/"), WEBHOOK_PATH)
+    finally:
+        await bot.session.close()
+
+
+def run_webhook(
+    host: str = WEBHOOK_HOST,
+    port: int = WEBHOOK_PORT,
+    workers: int = WEBHOOK_WORKERS,
+    register: bool = True,
+) -> None:
+    """
+    Запускает бота в режиме вебхука с workers процессами-обработчиками.
+
+    Args:
+        host (str): Адрес сервера.
+        port (int): Порт сервера.
+        workers (int): Количество процессов-обработчиков.
+        register (bool): Создать таблицы и зарегистрировать вебхук перед запуском.
+    """
+    if register:
+        asyncio.run(register_webhook())
+
+    workers = max(1, workers)
+    if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT не поддерживается, запускается один обработчик")
+        workers = 1
+    if workers == 1:
+        run_worker(host, port, reuse_port=False)
+        return
+
+    # spawn: обработчики не наследуют состояние родителя (циклы событий, пулы)
+    context = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.Process] = [
+        context.Process(target=run_worker, args=(host, port, True), name=f"webhook-worker-{i}")
+        for i in range(workers)
+    ]
+
+    def stop(signum: int, frame: Optional[object]) -> None:
+        logger.info("Остановка обработчиков вебхука (сигнал %d)...", signum)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for process in processes:
+            process.start()
+        logger.info("Запущено обработчиков вебхука: %d", workers)
+
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                logger.error("Обработчик %s завершился с кодом %s", process.name, process.exitcode)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    logger.info("Сервер вебхука остановлен")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сервер вебхука бота")
+    parser.add_argument("--host", default=WEBHOOK_HOST, help="адрес сервера")
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT, help="порт сервера")
+    parser.add_argument("--workers", type=int, default=WEBHOOK_WORKERS,
+                        help="количество процессов-обработчиков")
+    parser.add_argument("--no-register", action="store_true",
+                        help="не создавать таблицы и не регистрировать вебхук")
+    args = parser.parse_args()
+
+    run_webhook(args.host, args.port, args.workers, register=not args.no_register)
+
+
+if __name__ == "__main__":
+    main()